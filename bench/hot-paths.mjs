@@ -0,0 +1,363 @@
+/**
+ * Tiger 900 - Client Hot Path Benchmarks (Node)
+ *
+ * Times the client code paths that dominate interaction cost, using the
+ * real modules from docs/assets/js:
+ *
+ * - parseGPX            largest GPX file under docs/
+ * - createImageVersions one decode -> thumbnail/medium/original (gallery path)
+ * - compressImage / createThumbnail (legacy per-version decode)
+ * - Store bulk reads    PhotosStore.getPage / getAll over a seeded store
+ * - processQueue        sync queue drain over a large queue
+ *
+ * The modules target the browser, so the DOM, IndexedDB and canvas APIs come
+ * from optional packages installed next to this file. A benchmark whose APIs
+ * are missing is reported as skipped:
+ *
+ *   npm ci --prefix bench   (packages pinned in bench/package.json)
+ *   node bench/hot-paths.mjs [--json] [--iterations 20] [--only parseGPX]
+ *
+ * bench/perf_budget.py runs this with --json and checks the results against
+ * bench/budgets.json.
+ */
+
+import { readFile, readdir } from 'node:fs/promises';
+import { createRequire } from 'node:module';
+import { fileURLToPath, pathToFileURL } from 'node:url';
+import path from 'node:path';
+import { performance } from 'node:perf_hooks';
+
+const ROOT = path.resolve(path.dirname(fileURLToPath(import.meta.url)), '..');
+const DOCS = path.join(ROOT, 'docs');
+const JS = path.join(DOCS, 'assets/js');
+
+// Optional packages resolve from bench/node_modules
+const require = createRequire(import.meta.url);
+
+const CONFIG = {
+  iterations: 20,
+  warmup: 3,
+  photo: 'assets/images/tiger-900/tiger-900-rally-pro-action-2.jpg',
+  photoCount: 2000,
+  pageSize: 60,
+  queueSize: 1000,
+  imageVersions: {
+    thumbnail: { maxWidth: 200, maxHeight: 200, quality: 0.7 },
+    medium: { maxWidth: 800, maxHeight: 800, quality: 0.8 },
+    original: { maxWidth: 2000, maxHeight: 2000, quality: 0.8 }
+  }
+};
+
+/* ============================================
+   ENVIRONMENT
+   ============================================ */
+
+/**
+ * Import an optional package from bench/node_modules
+ * @returns {Promise<Object|null>}
+ */
+async function optional(name) {
+  try {
+    return await import(pathToFileURL(require.resolve(name)).href);
+  } catch (error) {
+    return null;
+  }
+}
+
+/**
+ * Expose the browser APIs the modules use, from whatever is installed
+ * @returns {Promise<Object<string, string|null>>} Missing package per API
+ */
+async function setupEnvironment() {
+  const missing = {};
+
+  if (typeof navigator === 'undefined') {
+    globalThis.navigator = {};
+  }
+  if (!('onLine' in navigator)) {
+    Object.defineProperty(navigator, 'onLine', { value: true, configurable: true });
+  }
+
+  const jsdom = await optional('jsdom');
+  if (jsdom) {
+    const { window } = new jsdom.JSDOM('');
+    globalThis.DOMParser = window.DOMParser;
+  }
+  missing.DOMParser = typeof DOMParser === 'undefined' ? 'jsdom' : null;
+
+  await optional('fake-indexeddb/auto');
+  missing.indexedDB = typeof indexedDB === 'undefined' ? 'fake-indexeddb' : null;
+
+  const canvas = await optional('@napi-rs/canvas');
+  if (canvas && typeof OffscreenCanvas === 'undefined') {
+    globalThis.createImageBitmap = async (blob) => {
+      const image = await canvas.loadImage(Buffer.from(await blob.arrayBuffer()));
+      image.close = () => {};
+      return image;
+    };
+    globalThis.OffscreenCanvas = class {
+      constructor(width, height) {
+        this.canvas = canvas.createCanvas(width, height);
+      }
+
+      getContext(type) {
+        return this.canvas.getContext(type);
+      }
+
+      async convertToBlob({ type = 'image/png', quality = 0.92 } = {}) {
+        const format = type.replace('image/', '');
+        const body = await this.canvas.encode(format, Math.round(quality * 100));
+        return new Blob([body], { type });
+      }
+    };
+  }
+  missing.canvas = typeof OffscreenCanvas === 'undefined' || typeof createImageBitmap === 'undefined'
+    ? '@napi-rs/canvas'
+    : null;
+
+  // compressImage() decodes through HTMLImageElement + object URLs
+  missing.Image = typeof Image === 'undefined' || typeof document === 'undefined'
+    ? 'a browser (HTMLImageElement and <canvas>); see bench/photo-pipeline.html'
+    : null;
+
+  return missing;
+}
+
+/* ============================================
+   TIMING
+   ============================================ */
+
+/**
+ * Run fn repeatedly and summarise the timings
+ * @param {Function} fn - Work to time
+ * @param {Object} [options]
+ * @param {Function} [options.setup] - Untimed preparation before each run
+ * @returns {Promise<Object>}
+ */
+async function measure(fn, { iterations, warmup = CONFIG.warmup, setup } = {}) {
+  const samples = [];
+
+  for (let i = 0; i < warmup + iterations; i++) {
+    const input = setup ? await setup() : undefined;
+    const start = performance.now();
+    await fn(input);
+    const elapsed = performance.now() - start;
+    if (i >= warmup) {
+      samples.push(elapsed);
+    }
+  }
+
+  samples.sort((a, b) => a - b);
+  const round = (ms) => Math.round(ms * 1000) / 1000;
+  const at = (p) => samples[Math.min(samples.length - 1, Math.floor(samples.length * p))];
+
+  return {
+    iterations: samples.length,
+    meanMs: round(samples.reduce((sum, ms) => sum + ms, 0) / samples.length),
+    medianMs: round(at(0.5)),
+    p95Ms: round(at(0.95)),
+    minMs: round(samples[0]),
+    maxMs: round(samples[samples.length - 1])
+  };
+}
+
+/* ============================================
+   BENCHMARKS
+   ============================================ */
+
+/**
+ * Largest GPX file under docs/
+ * @private
+ */
+async function largestGPX() {
+  const files = [];
+  const walk = async (dir) => {
+    for (const entry of await readdir(dir, { withFileTypes: true })) {
+      const full = path.join(dir, entry.name);
+      if (entry.isDirectory()) {
+        await walk(full);
+      } else if (entry.name.toLowerCase().endsWith('.gpx')) {
+        files.push(full);
+      }
+    }
+  };
+  await walk(DOCS);
+
+  let largest = null;
+  for (const file of files) {
+    const content = await readFile(file, 'utf8');
+    if (!largest || content.length > largest.content.length) {
+      largest = { file: path.relative(ROOT, file), content };
+    }
+  }
+  return largest;
+}
+
+/**
+ * Import a module from docs/assets/js
+ * @private
+ */
+function load(module) {
+  return import(pathToFileURL(path.join(JS, module)).href);
+}
+
+async function photoBlob() {
+  return new Blob([await readFile(path.join(DOCS, CONFIG.photo))], { type: 'image/jpeg' });
+}
+
+const BENCHMARKS = [
+  {
+    name: 'parseGPX',
+    requires: ['DOMParser'],
+    async run({ iterations }) {
+      const { parseGPX } = await load('core/utils.js');
+      const gpx = await largestGPX();
+      const points = parseGPX(gpx.content).points.length;
+      const stats = await measure(() => parseGPX(gpx.content), { iterations });
+      return { ...stats, input: gpx.file, bytes: gpx.content.length, points };
+    }
+  },
+  {
+    name: 'createImageVersions',
+    requires: ['canvas'],
+    async run({ iterations }) {
+      const { createImageVersions } = await load('core/utils.js');
+      const blob = await photoBlob();
+      const stats = await measure(() => createImageVersions(blob, CONFIG.imageVersions), {
+        iterations: Math.max(1, Math.ceil(iterations / 4)),
+        warmup: 1
+      });
+      return { ...stats, input: CONFIG.photo, bytes: blob.size };
+    }
+  },
+  {
+    name: 'compressImage',
+    requires: ['Image'],
+    async run({ iterations }) {
+      const { compressImage } = await load('core/utils.js');
+      const blob = await photoBlob();
+      const stats = await measure(() => compressImage(blob, CONFIG.imageVersions.medium), { iterations });
+      return { ...stats, input: CONFIG.photo, bytes: blob.size };
+    }
+  },
+  {
+    name: 'createThumbnail',
+    requires: ['Image'],
+    async run({ iterations }) {
+      const { createThumbnail } = await load('core/utils.js');
+      const blob = await photoBlob();
+      const stats = await measure(() => createThumbnail(blob), { iterations });
+      return { ...stats, input: CONFIG.photo, bytes: blob.size };
+    }
+  },
+  {
+    name: 'storeBulkRead',
+    requires: ['indexedDB'],
+    async run({ iterations }) {
+      const { PhotosStore } = await load('core/store.js');
+
+      const thumbnail = new Blob([new Uint8Array(8 * 1024)], { type: 'image/webp' });
+      const photos = Array.from({ length: CONFIG.photoCount }, (_, i) => ({
+        id: `bench-${i}`,
+        dayId: `2026-01-${String(19 + (i % 12)).padStart(2, '0')}`,
+        timestamp: Date.UTC(2026, 0, 19) + i * 60000,
+        caption: `Foto ${i}`,
+        versions: { thumbnail }
+      }));
+      for (let i = 0; i < photos.length; i += 500) {
+        await PhotosStore.saveMany(photos.slice(i, i + 500));
+      }
+
+      return {
+        photos: CONFIG.photoCount,
+        firstPage: await measure(() => PhotosStore.getPage({ limit: CONFIG.pageSize }), { iterations }),
+        dayPage: await measure(() => PhotosStore.getPage({ dayId: '2026-01-24', limit: CONFIG.pageSize }), { iterations }),
+        all: await measure(() => PhotosStore.getAll(), { iterations: Math.max(1, Math.ceil(iterations / 4)), warmup: 1 })
+      };
+    }
+  },
+  {
+    name: 'processQueue',
+    requires: ['indexedDB'],
+    async run({ iterations }) {
+      const { Store } = await load('core/store.js');
+      const { processQueue, registerSyncHandler } = await load('core/sync.js');
+
+      registerSyncHandler('bench', 'add', async () => {});
+      const seed = () => Store.putMany('syncQueue', Array.from({ length: CONFIG.queueSize }, (_, i) => ({
+        action: 'add',
+        entity: 'bench',
+        data: { index: i },
+        createdAt: new Date(),
+        attempts: 0,
+        lastAttempt: null
+      })));
+
+      const stats = await measure(processQueue, {
+        iterations: Math.max(1, Math.ceil(iterations / 4)),
+        warmup: 1,
+        setup: seed
+      });
+      return { ...stats, queueSize: CONFIG.queueSize };
+    }
+  }
+];
+
+/* ============================================
+   CLI
+   ============================================ */
+
+function parseArgs(argv) {
+  const args = { json: false, iterations: CONFIG.iterations, only: [] };
+  for (let i = 0; i < argv.length; i++) {
+    if (argv[i] === '--json') {
+      args.json = true;
+    } else if (argv[i] === '--iterations') {
+      args.iterations = Number(argv[++i]);
+    } else if (argv[i] === '--only') {
+      args.only.push(argv[++i]);
+    }
+  }
+  return args;
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const missing = await setupEnvironment();
+  const log = args.json ? () => {} : (...line) => process.stdout.write(`${line.join(' ')}\n`);
+
+  // The modules log through console; keep --json output clean
+  if (args.json) {
+    console.log = () => {};
+    console.warn = () => {};
+  }
+
+  const results = {};
+  for (const benchmark of BENCHMARKS) {
+    if (args.only.length && !args.only.includes(benchmark.name)) continue;
+
+    const needs = benchmark.requires.map(api => missing[api]).filter(Boolean);
+    if (needs.length) {
+      results[benchmark.name] = { skipped: `needs ${needs.join(', ')}` };
+      log(`${benchmark.name}: skipped (${results[benchmark.name].skipped})`);
+      continue;
+    }
+
+    try {
+      results[benchmark.name] = await benchmark.run(args);
+      log(`${benchmark.name}: ${JSON.stringify(results[benchmark.name])}`);
+    } catch (error) {
+      results[benchmark.name] = { error: error.message || String(error) };
+      log(`${benchmark.name}: error ${results[benchmark.name].error}`);
+    }
+  }
+
+  if (args.json) {
+    process.stdout.write(JSON.stringify({ runtime: `node ${process.version}`, benchmarks: results }));
+  }
+}
+
+main().then(() => process.exit(0), (error) => {
+  process.stderr.write(`${error.stack || error}\n`);
+  process.exit(1);
+});
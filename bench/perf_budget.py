@@ -0,0 +1,437 @@
+"""
+Tiger 900 - Performance Budget Harness
+
+Run after ``mkdocs build`` to see whether a change made the site slower:
+
+- **Pages**: bytes each built page pulls in on a cold load, split into HTML,
+  CSS, JS, images and other. It covers the page itself, stylesheets,
+  scripts, module preloads and ``<img>`` sources. Text assets are counted
+  gzipped (what GitHub Pages sends); images as stored.
+- **Precache**: total size and entry count of ``precache-manifest.json``
+  (hooks/precache_manifest.py).
+- **Build**: wall time of ``mkdocs build`` with ``--build``, otherwise the
+  total from the incremental build report (hooks/incremental_build.py).
+- **Client hot paths**: ``bench/hot-paths.mjs`` under Node
+  (parseGPX, image versions, Store bulk reads, sync processQueue).
+
+Every run writes the results to ``--output`` (default
+``.cache/perf-report.json``) so they can be compared from commit to commit,
+and exits with status 1 when a budget in ``bench/budgets.json`` is
+exceeded::
+
+    mkdocs build && python bench/perf_budget.py
+    python bench/perf_budget.py --build --no-js
+
+The benchmarks need the packages pinned in ``bench/package.json``
+(``npm ci --prefix bench``). A benchmark with a budget that is skipped or
+fails counts as a violation; ``--no-js`` leaves the benchmark budgets out.
+
+Budgets (all optional)::
+
+    {
+      "build":      {"totalMs": 30000},
+      "precache":   {"totalBytes": 8000000, "entries": 200},
+      "pages":      {"*": {"total": 2000000, "js": 600000},
+                     "viagens/*/roteiro/": {"total": 1500000}},
+      "benchmarks": {"parseGPX": {"medianMs": 200},
+                     "storeBulkRead.firstPage": {"medianMs": 20}}
+    }
+
+Page patterns are ``fnmatch`` globs over the page URL; every matching
+pattern applies, later ones overriding earlier ones; the homepage URL is
+``""``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import gzip
+import json
+import logging
+import re
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+log = logging.getLogger("perf_budget")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULTS = {
+    "site_dir": ROOT / "site",
+    "budgets": ROOT / "bench" / "budgets.json",
+    "output": ROOT / ".cache" / "perf-report.json",
+    "build_report": ROOT / ".cache" / "build-report.json",
+    "precache_manifest": "precache-manifest.json",
+    "benchmarks": ROOT / "bench" / "hot-paths.mjs",
+}
+
+KINDS = {
+    "html": {".html", ".htm"},
+    "css": {".css"},
+    "js": {".js", ".mjs"},
+    "image": {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".ico"},
+}
+
+# url(...) in inline styles, e.g. hero background images
+CSS_URL_PATTERN = re.compile(r"""url\(\s*['"]?([^'")]+)['"]?\s*\)""")
+
+# Served compressed by the host
+COMPRESSIBLE = {".html", ".htm", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt"}
+
+
+# ============================================
+# PAGE WEIGHT
+# ============================================
+
+class ResourceParser(HTMLParser):
+    """Collect the URLs a page loads during a cold load."""
+
+    def __init__(self):
+        super().__init__()
+        self.urls: list[str] = []
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("script", "img") and attrs.get("src"):
+            self.urls.append(attrs["src"])
+        elif tag == "link" and attrs.get("href"):
+            rel = set((attrs.get("rel") or "").lower().split())
+            if rel & {"stylesheet", "modulepreload", "preload", "icon"}:
+                self.urls.append(attrs["href"])
+        elif tag == "style":
+            self._in_style = True
+
+        if attrs.get("srcset"):
+            # Browsers fetch one candidate; count the first
+            self.urls.append(attrs["srcset"].split(",")[0].split()[0])
+        if attrs.get("style"):
+            self.urls += CSS_URL_PATTERN.findall(attrs["style"])
+
+    def handle_endtag(self, tag):
+        if tag == "style":
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            self.urls += CSS_URL_PATTERN.findall(data)
+
+
+def kind_of(path: str) -> str:
+    suffix = Path(path).suffix.lower()
+    for kind, suffixes in KINDS.items():
+        if suffix in suffixes:
+            return kind
+    return "other"
+
+
+def transfer_size(path: Path, cache: dict) -> int:
+    """Bytes on the wire: gzip level 6 for text, stored size otherwise."""
+    if path not in cache:
+        content = path.read_bytes()
+        if path.suffix.lower() in COMPRESSIBLE:
+            cache[path] = len(gzip.compress(content, compresslevel=6))
+        else:
+            cache[path] = len(content)
+    return cache[path]
+
+
+def resolve(url: str, page: Path, site_dir: Path) -> Path | None:
+    """Map a URL found in ``page`` to a file in ``site_dir`` (None if external)."""
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+
+    target = unquote(parts.path)
+    if target.startswith("/"):
+        # Absolute URLs carry the site base path (e.g. /tiger-900/); match
+        # them by their longest existing suffix
+        segments = target.strip("/").split("/")
+        for start in range(len(segments)):
+            candidate = site_dir.joinpath(*segments[start:])
+            if candidate.is_file():
+                return candidate
+        return None
+
+    candidate = (page.parent / target).resolve()
+    if candidate.is_dir():
+        candidate = candidate / "index.html"
+    return candidate if candidate.is_file() else None
+
+
+def page_url(page: Path, site_dir: Path) -> str:
+    relative = page.relative_to(site_dir).as_posix()
+    if relative == "index.html":
+        return ""
+    return relative[: -len("index.html")] if relative.endswith("/index.html") else relative
+
+
+def measure_pages(site_dir: Path) -> dict:
+    """Cold-load weight of every built page."""
+    sizes: dict = {}
+    pages = {}
+
+    for page in sorted(site_dir.rglob("*.html")):
+        parser = ResourceParser()
+        parser.feed(page.read_text(encoding="utf-8", errors="replace"))
+
+        totals = {"html": transfer_size(page, sizes), "css": 0, "js": 0, "image": 0, "other": 0}
+        external = []
+        largest = []
+        seen = set()
+
+        for url in parser.urls:
+            target = resolve(url, page, site_dir)
+            if target is None:
+                if urlsplit(url).netloc and url not in external:
+                    external.append(url)
+                continue
+            if target in seen:
+                continue
+            seen.add(target)
+
+            size = transfer_size(target, sizes)
+            totals[kind_of(target.name)] += size
+            largest.append((size, target.relative_to(site_dir).as_posix()))
+
+        totals["total"] = sum(totals.values())
+        largest.sort(reverse=True)
+        pages[page_url(page, site_dir)] = {
+            "bytes": totals,
+            "requests": len(seen) + 1,
+            "largest": [{"path": path, "bytes": size} for size, path in largest[:3]],
+            "external": external,
+        }
+
+    return pages
+
+
+# ============================================
+# PRECACHE AND BUILD
+# ============================================
+
+def measure_precache(site_dir: Path, manifest_name: str) -> dict | None:
+    manifest_path = site_dir / manifest_name
+    if not manifest_path.is_file():
+        return None
+
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    assets = manifest.get("assets", {})
+    largest = sorted(assets.items(), key=lambda item: item[1]["size"], reverse=True)
+    return {
+        "revision": manifest.get("revision"),
+        "totalBytes": manifest.get("totalBytes", sum(a["size"] for a in assets.values())),
+        "entries": len(assets),
+        "largest": [{"url": url, "bytes": asset["size"]} for url, asset in largest[:5]],
+    }
+
+
+def run_build(config_file: Path) -> dict:
+    """Time a clean ``mkdocs build``."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "mkdocs", "build", "--quiet", "--config-file", str(config_file)],
+        cwd=config_file.parent,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    if completed.returncode:
+        raise SystemExit(f"mkdocs build failed with status {completed.returncode}")
+    return {"totalMs": round(elapsed, 1), "source": "mkdocs build"}
+
+
+def read_build_report(report_path: Path) -> dict | None:
+    if not report_path.is_file():
+        return None
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    return {
+        "totalMs": report.get("totalMs"),
+        "source": report_path.relative_to(ROOT).as_posix() if report_path.is_relative_to(ROOT) else str(report_path),
+        "pages": report.get("pages"),
+    }
+
+
+# ============================================
+# JS BENCHMARKS
+# ============================================
+
+def run_benchmarks(script: Path, node: str, iterations: int) -> dict:
+    if not shutil.which(node):
+        return {"skipped": f"{node} not found"}
+
+    completed = subprocess.run(
+        [node, str(script), "--json", "--iterations", str(iterations)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if completed.returncode:
+        return {"error": completed.stderr.strip() or f"exit status {completed.returncode}"}
+    return json.loads(completed.stdout)
+
+
+# ============================================
+# BUDGETS
+# ============================================
+
+def lookup(results: dict, dotted: str):
+    value = results
+    for key in dotted.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def page_budget(url: str, budgets: dict) -> dict:
+    merged: dict = {}
+    for pattern, limits in budgets.items():
+        if fnmatch.fnmatch(url, pattern):
+            merged.update(limits)
+    return merged
+
+
+def check_budgets(report: dict, budgets: dict) -> list[dict]:
+    """Every measured value above its budget."""
+    violations = []
+
+    def check(metric: str, value, limit) -> None:
+        if value is not None and limit is not None and value > limit:
+            violations.append({"metric": metric, "value": value, "budget": limit})
+
+    for section in ("build", "precache"):
+        for key, limit in (budgets.get(section) or {}).items():
+            check(f"{section}.{key}", lookup(report.get(section) or {}, key), limit)
+
+    for url, page in report["pages"].items():
+        for key, limit in page_budget(url, budgets.get("pages") or {}).items():
+            check(f"pages[{url or '/'}].{key}", page["bytes"].get(key), limit)
+
+    # --no-js opts out of the benchmark budgets; otherwise a budgeted
+    # benchmark that didn't run fails instead of passing unchecked
+    run = report.get("benchmarks")
+    if run is not None:
+        benchmarks = run.get("benchmarks") or {}
+        for name, limits in (budgets.get("benchmarks") or {}).items():
+            result = benchmarks.get(name.split(".")[0]) or run
+            reason = result.get("skipped") or result.get("error")
+            if reason or lookup(benchmarks, name) is None:
+                violations.append({
+                    "metric": f"benchmarks.{name}",
+                    "value": None,
+                    "budget": limits,
+                    "reason": reason or "no result",
+                })
+                continue
+            for key, limit in limits.items():
+                check(f"benchmarks.{name}.{key}", lookup(benchmarks, f"{name}.{key}"), limit)
+
+    return violations
+
+
+# ============================================
+# CLI
+# ============================================
+
+def format_bytes(size: int) -> str:
+    return f"{size / 1024:.1f} KB"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the built site and check performance budgets.")
+    parser.add_argument("--site-dir", type=Path, default=DEFAULTS["site_dir"])
+    parser.add_argument("--budgets", type=Path, default=DEFAULTS["budgets"])
+    parser.add_argument("--output", type=Path, default=DEFAULTS["output"])
+    parser.add_argument("--build", action="store_true", help="Run and time mkdocs build first")
+    parser.add_argument("--config-file", type=Path, default=ROOT / "mkdocs.yml")
+    parser.add_argument("--build-report", type=Path, default=DEFAULTS["build_report"])
+    parser.add_argument("--no-js", action="store_true", help="Skip the Node micro-benchmarks")
+    parser.add_argument("--node", default="node")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    build = run_build(args.config_file) if args.build else read_build_report(args.build_report)
+
+    if not args.site_dir.is_dir():
+        log.error("%s not found; run mkdocs build first", args.site_dir)
+        return 2
+
+    report = {
+        "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_head(),
+        "build": build,
+        "precache": measure_precache(args.site_dir, DEFAULTS["precache_manifest"]),
+        "pages": measure_pages(args.site_dir),
+        "benchmarks": None if args.no_js else run_benchmarks(DEFAULTS["benchmarks"], args.node, args.iterations),
+    }
+
+    budgets = json.loads(args.budgets.read_text(encoding="utf-8")) if args.budgets.is_file() else {}
+    report["violations"] = check_budgets(report, budgets)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print_summary(report)
+    log.info("Report written to %s", args.output)
+
+    for violation in report["violations"]:
+        if "reason" in violation:
+            log.error("Budgeted benchmark did not run: %s (%s)", violation["metric"], violation["reason"])
+        else:
+            log.error("Over budget: %s = %s (budget %s)", violation["metric"], violation["value"], violation["budget"])
+    return 1 if report["violations"] else 0
+
+
+def git_head() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(report: dict) -> None:
+    build = report["build"]
+    if build:
+        log.info("Build: %.0f ms (%s)", build["totalMs"], build["source"])
+
+    precache = report["precache"]
+    if precache:
+        log.info("Precache: %d entries, %s", precache["entries"], format_bytes(precache["totalBytes"]))
+        for asset in precache["largest"][:3]:
+            log.info("  %s: %s", asset["url"], format_bytes(asset["bytes"]))
+
+    heaviest = sorted(report["pages"].items(), key=lambda item: item[1]["bytes"]["total"], reverse=True)
+    for url, page in heaviest[:5]:
+        sizes = page["bytes"]
+        log.info(
+            "Page /%s: %s (html %s, css %s, js %s, images %s)",
+            url, format_bytes(sizes["total"]), format_bytes(sizes["html"]), format_bytes(sizes["css"]),
+            format_bytes(sizes["js"]), format_bytes(sizes["image"]),
+        )
+
+    benchmarks = report["benchmarks"]
+    if benchmarks:
+        if "benchmarks" not in benchmarks:
+            log.warning("JS benchmarks: %s", benchmarks.get("skipped") or benchmarks.get("error"))
+        for name, result in (benchmarks.get("benchmarks") or {}).items():
+            if "medianMs" in result:
+                log.info("Bench %s: median %.2f ms, p95 %.2f ms", name, result["medianMs"], result["p95Ms"])
+            elif "skipped" in result or "error" in result:
+                log.info("Bench %s: %s", name, result.get("skipped") or result.get("error"))
+            else:
+                for case, stats in result.items():
+                    if isinstance(stats, dict) and "medianMs" in stats:
+                        log.info("Bench %s.%s: median %.2f ms", name, case, stats["medianMs"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+/**
+ * Tiger 900 - Photo Pipeline Benchmark
+ *
+ * Compares the old serial upload path (three compressImage() decodes per
+ * photo on the main thread) with the worker-pool pipeline used by the
+ * gallery. Reports wall time, photos per second and the longest main-thread
+ * stall (largest gap between animation frames) for each.
+ *
+ * Serve the repository root and open bench/photo-pipeline.html:
+ *
+ *   python -m http.server 8000
+ *   # http://localhost:8000/bench/photo-pipeline.html
+ */
+
+import { compressImage, createThumbnail, extractGPSFromImage } from '../docs/assets/js/core/utils.js';
+import { processImages, getPoolSize, isWorkerPipelineSupported } from '../docs/assets/js/core/image-pipeline.js';
+
+/**
+ * Same sizes the gallery uses
+ */
+const VERSIONS = {
+  thumbnail: { maxWidth: 200, maxHeight: 200, quality: 0.7 },
+  medium: { maxWidth: 800, maxHeight: 800, quality: 0.8 },
+  original: { maxWidth: 2000, maxHeight: 2000, quality: 0.8 }
+};
+
+/**
+ * Generate camera-sized JPEGs with enough detail to be expensive to encode
+ * @param {number} count - Number of photos
+ * @param {number} width - Width in pixels
+ * @param {number} height - Height in pixels
+ * @returns {Promise<File[]>}
+ */
+export async function generatePhotos(count, width = 4000, height = 3000) {
+  const canvas = new OffscreenCanvas(width, height);
+  const ctx = canvas.getContext('2d');
+  const files = [];
+
+  for (let i = 0; i < count; i++) {
+    const gradient = ctx.createLinearGradient(0, 0, width, height);
+    gradient.addColorStop(0, `hsl(${(i * 37) % 360}, 60%, 40%)`);
+    gradient.addColorStop(1, `hsl(${(i * 37 + 180) % 360}, 60%, 60%)`);
+    ctx.fillStyle = gradient;
+    ctx.fillRect(0, 0, width, height);
+
+    for (let j = 0; j < 400; j++) {
+      ctx.fillStyle = `hsla(${Math.random() * 360}, 70%, 50%, 0.4)`;
+      ctx.beginPath();
+      ctx.arc(Math.random() * width, Math.random() * height, Math.random() * 200, 0, Math.PI * 2);
+      ctx.fill();
+    }
+
+    const blob = await canvas.convertToBlob({ type: 'image/jpeg', quality: 0.9 });
+    files.push(new File([blob], `bench-${i + 1}.jpg`, { type: 'image/jpeg' }));
+  }
+
+  return files;
+}
+
+/**
+ * Track the longest gap between animation frames while a task runs
+ * @private
+ */
+async function measure(task) {
+  let longestFrame = 0;
+  let last = performance.now();
+  let running = true;
+
+  const tick = (now) => {
+    longestFrame = Math.max(longestFrame, now - last);
+    last = now;
+    if (running) requestAnimationFrame(tick);
+  };
+  requestAnimationFrame(tick);
+
+  const start = performance.now();
+  await task();
+  const elapsed = performance.now() - start;
+  running = false;
+
+  return { ms: elapsed, longestFrameMs: longestFrame };
+}
+
+/**
+ * Previous gallery behaviour: one photo at a time, three decodes each
+ * @private
+ */
+async function runSerial(files) {
+  for (const file of files) {
+    await extractGPSFromImage(file);
+    await createThumbnail(file, VERSIONS.thumbnail.maxWidth);
+    await compressImage(file, VERSIONS.medium);
+    await compressImage(file, VERSIONS.original);
+  }
+}
+
+/**
+ * Run both paths over the same files
+ * @param {File[]} files - Photos to process
+ * @param {Function} [log] - Line logger
+ * @returns {Promise<Object>} Results per path
+ */
+export async function runBenchmark(files, log = console.log) {
+  log(`${files.length} photos, pool size ${getPoolSize()}, workers ${isWorkerPipelineSupported() ? 'on' : 'off'}`);
+
+  const results = {};
+  for (const [name, task] of [
+    ['serial', () => runSerial(files)],
+    ['pipeline', () => processImages(files, VERSIONS)]
+  ]) {
+    const { ms, longestFrameMs } = await measure(task);
+    results[name] = {
+      ms: Math.round(ms),
+      photosPerSecond: +(files.length / (ms / 1000)).toFixed(2),
+      longestFrameMs: Math.round(longestFrameMs)
+    };
+    log(`${name}: ${results[name].ms} ms, ${results[name].photosPerSecond} photos/s, longest frame ${results[name].longestFrameMs} ms`);
+  }
+
+  log(`speedup: ${(results.serial.ms / results.pipeline.ms).toFixed(2)}x`);
+  return results;
+}
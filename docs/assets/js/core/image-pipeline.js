@@ -0,0 +1,311 @@
+/**
+ * Tiger 900 - Image Pipeline Module
+ *
+ * Processes batches of photos off the main thread:
+ * - Worker pool sized to navigator.hardwareConcurrency
+ * - One decode per photo (createImageBitmap), all versions rendered from it
+ * - Progress and cancellation (AbortSignal) per batch
+ * - Main-thread fallback when module workers or OffscreenCanvas are missing
+ *
+ * @module core/image-pipeline
+ */
+
+import { createImageVersions, extractGPSFromImage } from './utils.js';
+
+/**
+ * Pipeline configuration
+ */
+const CONFIG = {
+  workerUrl: new URL('./image-worker.js', import.meta.url),
+  // Each worker holds a full-size decoded bitmap (~48MB for 12MP), so the
+  // pool is capped even on many-core devices
+  maxWorkers: 4,
+  idleTimeout: 30 * 1000
+};
+
+/**
+ * Worker pool state
+ */
+const pool = {
+  slots: [],
+  queue: [],
+  disabled: false,
+  idleTimer: null
+};
+
+let nextJobId = 1;
+
+/**
+ * Check whether photos can be processed in workers
+ * @returns {boolean}
+ */
+export function isWorkerPipelineSupported() {
+  return !pool.disabled &&
+    typeof Worker !== 'undefined' &&
+    typeof OffscreenCanvas !== 'undefined' &&
+    typeof OffscreenCanvas.prototype.convertToBlob === 'function' &&
+    typeof createImageBitmap === 'function';
+}
+
+/**
+ * Number of workers the pool will use on this device
+ * @returns {number}
+ */
+export function getPoolSize() {
+  const cores = navigator.hardwareConcurrency || 2;
+  // Leave one core for the main thread
+  return Math.max(1, Math.min(cores - 1, CONFIG.maxWorkers));
+}
+
+/**
+ * Terminate all idle workers (busy ones finish their job first)
+ */
+export function terminateImagePool() {
+  clearTimeout(pool.idleTimer);
+  pool.slots = pool.slots.filter((slot) => {
+    if (slot.job) return true;
+    slot.worker.terminate();
+    return false;
+  });
+}
+
+/**
+ * Create an AbortError compatible with fetch()-style cancellation
+ * @private
+ */
+function abortError() {
+  return new DOMException('Processamento cancelado', 'AbortError');
+}
+
+/**
+ * Process a photo on the main thread (fallback path)
+ * @private
+ */
+async function processOnMainThread(file, versions) {
+  const [gps, images] = await Promise.all([
+    extractGPSFromImage(file),
+    createImageVersions(file, versions)
+  ]);
+  return { ...images, gps };
+}
+
+/**
+ * Start a worker slot
+ * @private
+ */
+function createSlot() {
+  const worker = new Worker(CONFIG.workerUrl, { type: 'module' });
+  const slot = { worker, job: null, ready: false };
+
+  worker.addEventListener('message', ({ data }) => {
+    const job = slot.job;
+    slot.job = null;
+    slot.ready = true;
+
+    if (job && job.id === data.id) {
+      if (data.ok) {
+        job.resolve(data.result);
+      } else {
+        job.reject(new Error(data.error));
+      }
+    }
+
+    dispatch();
+  });
+
+  worker.addEventListener('error', (event) => {
+    event.preventDefault?.();
+    const job = slot.job;
+    removeSlot(slot);
+
+    // A worker that fails before its first reply cannot load (no module
+    // worker support): switch to the main thread for good
+    if (!slot.ready) {
+      console.warn('[ImagePipeline] Workers unavailable, processing on main thread');
+      pool.disabled = true;
+    }
+
+    if (job) {
+      if (pool.disabled) {
+        processOnMainThread(job.file, job.versions).then(job.resolve, job.reject);
+      } else {
+        job.reject(new Error(event.message || 'Falha no processamento da imagem'));
+      }
+    }
+
+    dispatch();
+  });
+
+  pool.slots.push(slot);
+  return slot;
+}
+
+/**
+ * Terminate and forget a worker slot
+ * @private
+ */
+function removeSlot(slot) {
+  slot.worker.terminate();
+  pool.slots = pool.slots.filter((s) => s !== slot);
+}
+
+/**
+ * Hand queued jobs to idle workers
+ * @private
+ */
+function dispatch() {
+  clearTimeout(pool.idleTimer);
+
+  while (pool.queue.length) {
+    if (pool.disabled) {
+      const job = pool.queue.shift();
+      processOnMainThread(job.file, job.versions).then(job.resolve, job.reject);
+      continue;
+    }
+
+    let slot = pool.slots.find((s) => !s.job);
+    if (!slot && pool.slots.length < getPoolSize()) {
+      slot = createSlot();
+    }
+    if (!slot) break;
+
+    const job = pool.queue.shift();
+    slot.job = job;
+    job.slot = slot;
+    slot.worker.postMessage({ id: job.id, file: job.file, versions: job.versions });
+  }
+
+  if (!pool.queue.length && pool.slots.every((s) => !s.job)) {
+    pool.idleTimer = setTimeout(terminateImagePool, CONFIG.idleTimeout);
+  }
+}
+
+/**
+ * Queue a photo for a worker
+ * @private
+ */
+function runInWorker(file, versions, batch) {
+  return new Promise((resolve, reject) => {
+    const job = { id: nextJobId++, file, versions, slot: null };
+    const settle = (fn) => (value) => {
+      batch.delete(job);
+      fn(value);
+    };
+    job.resolve = settle(resolve);
+    job.reject = settle(reject);
+
+    batch.add(job);
+    pool.queue.push(job);
+    dispatch();
+  });
+}
+
+/**
+ * Cancel a queued or running job
+ * @private
+ */
+function cancelJob(job) {
+  pool.queue = pool.queue.filter((j) => j !== job);
+
+  // A running job can only be stopped by terminating its worker
+  if (job.slot?.job === job) {
+    removeSlot(job.slot);
+  }
+
+  job.reject(abortError());
+}
+
+/**
+ * Process photos in parallel, decoding each once and rendering every version
+ * @param {FileList|File[]} files - Image files
+ * @param {Object<string, {maxWidth: number, maxHeight: number, quality?: number, type?: string}>} versions
+ * @param {Object} [options]
+ * @param {Function} [options.onProgress] - Progress callback({ current, total, filename, phase, error })
+ * @param {Function} [options.onResult] - Called (awaited) with ({ file, result, error }, index) as each photo finishes
+ * @param {AbortSignal} [options.signal] - Cancels queued and running work
+ * @returns {Promise<Array<{file: File, result?: Object, error?: Error}>>} Entries in input order
+ */
+export function processImages(files, versions, options = {}) {
+  const { onProgress, onResult, signal } = options;
+  const list = Array.from(files);
+  const total = list.length;
+  const results = new Array(total);
+  const batch = new Set();
+  const useWorkers = isWorkerPipelineSupported();
+  const lanes = useWorkers ? Math.min(getPoolSize(), total) : 1;
+
+  if (signal?.aborted) {
+    return Promise.reject(abortError());
+  }
+  if (!total) {
+    return Promise.resolve(results);
+  }
+
+  return new Promise((resolve, reject) => {
+    let next = 0;
+    let active = 0;
+    let completed = 0;
+    let cancelled = false;
+
+    const onAbort = () => {
+      cancelled = true;
+      [...batch].forEach(cancelJob);
+      dispatch();
+      onProgress?.({ current: completed, total, filename: '', phase: 'cancelled' });
+      reject(abortError());
+    };
+    signal?.addEventListener('abort', onAbort, { once: true });
+
+    const startNext = () => {
+      if (cancelled) return;
+
+      if (next >= total) {
+        if (!active) {
+          signal?.removeEventListener('abort', onAbort);
+          resolve(results);
+        }
+        return;
+      }
+
+      const index = next++;
+      const file = list[index];
+      active++;
+
+      onProgress?.({ current: completed, total, filename: file.name, phase: 'processing' });
+
+      const work = useWorkers && !pool.disabled
+        ? runInWorker(file, versions, batch)
+        : processOnMainThread(file, versions);
+
+      work
+        .then((result) => ({ file, result }), (error) => ({ file, error }))
+        .then(async (entry) => {
+          if (cancelled) return;
+
+          try {
+            await onResult?.(entry, index);
+          } catch (error) {
+            entry = { file, error };
+          }
+
+          results[index] = entry;
+          completed++;
+          active--;
+
+          onProgress?.({
+            current: completed,
+            total,
+            filename: file.name,
+            phase: entry.error ? 'error' : 'complete',
+            error: entry.error?.message
+          });
+
+          startNext();
+        });
+    };
+
+    for (let i = 0; i < lanes; i++) {
+      startNext();
+    }
+  });
+}
@@ -0,0 +1,28 @@
+/**
+ * Tiger 900 - Image Worker
+ *
+ * Module worker used by the image pipeline. Each job decodes a photo once,
+ * reads its EXIF GPS and renders every requested version off the main thread.
+ *
+ * Message in:  { id, file, versions }
+ * Message out: { id, ok: true, result } | { id, ok: false, error }
+ *
+ * @module core/image-worker
+ */
+
+import { createImageVersions, extractGPSFromImage } from './utils.js';
+
+self.addEventListener('message', async (event) => {
+  const { id, file, versions } = event.data;
+
+  try {
+    const [gps, images] = await Promise.all([
+      extractGPSFromImage(file),
+      createImageVersions(file, versions)
+    ]);
+
+    self.postMessage({ id, ok: true, result: { ...images, gps } });
+  } catch (error) {
+    self.postMessage({ id, ok: false, error: error.message || String(error) });
+  }
+});
@@ -4,11 +4,15 @@
  * Provides a Promise-based wrapper around IndexedDB for structured data storage.
  * Handles photos, routes, weather cache, and sync queue.
  *
+ * Photos are split across stores keyed by photo id: metadata in `photos`,
+ * and each image version as a Blob in its own store, so listing a day only
+ * reads metadata and thumbnails.
+ *
  * @module core/store
  */
 
 const DB_NAME = 'tiger900';
-const DB_VERSION = 1;
+const DB_VERSION = 2;
 
 /**
  * Database schema definition
@@ -19,9 +23,19 @@ const STORES = {
     indexes: [
       { name: 'dayId', keyPath: 'dayId', unique: false },
       { name: 'timestamp', keyPath: 'timestamp', unique: false },
-      { name: 'synced', keyPath: 'synced', unique: false }
+      { name: 'synced', keyPath: 'synced', unique: false },
+      { name: 'dayId_timestamp', keyPath: ['dayId', 'timestamp'], unique: false }
     ]
   },
+  photoThumbnails: {
+    keyPath: 'id'
+  },
+  photoMedium: {
+    keyPath: 'id'
+  },
+  photoOriginals: {
+    keyPath: 'id'
+  },
   routes: {
     keyPath: 'id',
     indexes: [
@@ -43,6 +57,20 @@ const STORES = {
   }
 };
 
+/**
+ * Object store holding each photo version's Blob
+ */
+const PHOTO_VERSION_STORES = {
+  thumbnail: 'photoThumbnails',
+  medium: 'photoMedium',
+  original: 'photoOriginals'
+};
+
+/**
+ * Default page size for photo listings
+ */
+const PHOTO_PAGE_SIZE = 60;
+
 /**
  * Database connection instance
  * @type {IDBDatabase|null}
@@ -78,29 +106,122 @@ function openDatabase() {
 
     request.onupgradeneeded = (event) => {
       const db = event.target.result;
+      const transaction = event.target.transaction;
 
-      // Create object stores
+      // Create object stores, and indexes added to existing stores
       Object.entries(STORES).forEach(([storeName, config]) => {
+        let store;
         if (!db.objectStoreNames.contains(storeName)) {
           const storeOptions = { keyPath: config.keyPath };
           if (config.autoIncrement) {
             storeOptions.autoIncrement = true;
           }
 
-          const store = db.createObjectStore(storeName, storeOptions);
+          store = db.createObjectStore(storeName, storeOptions);
+        } else {
+          store = transaction.objectStore(storeName);
+        }
 
-          // Create indexes
-          if (config.indexes) {
-            config.indexes.forEach(idx => {
+        // Create indexes
+        if (config.indexes) {
+          config.indexes.forEach(idx => {
+            if (!store.indexNames.contains(idx.name)) {
               store.createIndex(idx.name, idx.keyPath, { unique: idx.unique });
-            });
-          }
+            }
+          });
         }
       });
+
+      if (event.oldVersion >= 1 && event.oldVersion < 2) {
+        migratePhotosToV2(transaction);
+      }
     };
   });
 }
 
+/**
+ * Convert a base64 data URL to a Blob (synchronous, usable during upgrades)
+ * @param {string} dataUrl
+ * @returns {Blob|null}
+ */
+function dataUrlToBlob(dataUrl) {
+  const match = /^data:([^;,]*)(;base64)?,(.*)$/s.exec(dataUrl);
+  if (!match) return null;
+
+  const [, type, base64, data] = match;
+  if (!base64) {
+    return new Blob([decodeURIComponent(data)], { type });
+  }
+
+  const binary = atob(data);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return new Blob([bytes], { type });
+}
+
+/**
+ * Normalize a photo and split it into its metadata record and version Blobs
+ *
+ * - `dayDate` (gallery v1) becomes `dayId`
+ * - `timestamp` becomes epoch milliseconds so the indexes sort correctly
+ * - `synced` becomes 0/1 (booleans are not valid IndexedDB keys)
+ * - versions may be Blobs or data URLs, under `versions` or `thumb`/`medium`/`original`
+ *
+ * @param {Object} photo
+ * @returns {{meta: Object, blobs: Object<string, Blob>}}
+ */
+function splitPhoto(photo) {
+  const { versions = {}, thumb, medium, original, dayDate, ...meta } = photo;
+  const sources = {
+    thumbnail: versions.thumbnail ?? thumb,
+    medium: versions.medium ?? medium,
+    original: versions.original ?? original
+  };
+
+  const blobs = {};
+  for (const [name, source] of Object.entries(sources)) {
+    const blob = typeof source === 'string' ? dataUrlToBlob(source) : source;
+    if (blob instanceof Blob) {
+      blobs[name] = blob;
+    }
+  }
+
+  const timestamp = new Date(photo.timestamp ?? Date.now()).getTime();
+
+  meta.dayId = photo.dayId ?? dayDate ?? null;
+  meta.timestamp = Number.isNaN(timestamp) ? Date.now() : timestamp;
+  meta.synced = photo.synced ? 1 : 0;
+
+  return { meta, blobs };
+}
+
+/**
+ * v1 -> v2: move image data out of `photos` records into the Blob stores
+ * @param {IDBTransaction} transaction - The versionchange transaction
+ */
+function migratePhotosToV2(transaction) {
+  const photos = transaction.objectStore('photos');
+  let migrated = 0;
+
+  photos.openCursor().onsuccess = (event) => {
+    const cursor = event.target.result;
+    if (!cursor) {
+      if (migrated) console.log(`[Store] Migrated ${migrated} photos to Blob storage`);
+      return;
+    }
+
+    const { meta, blobs } = splitPhoto(cursor.value);
+    for (const [name, blob] of Object.entries(blobs)) {
+      transaction.objectStore(PHOTO_VERSION_STORES[name]).put({ id: meta.id, blob });
+    }
+    cursor.update(meta);
+    migrated++;
+    cursor.continue();
+  };
+}
+
 /**
  * Gets a transaction and object store
  * @param {string} storeName - Store name
@@ -126,10 +247,143 @@ function promisifyRequest(request) {
   });
 }
 
+/**
+ * Resolves when a transaction commits
+ * @param {IDBTransaction} transaction
+ * @returns {Promise<void>}
+ */
+function promisifyTransaction(transaction) {
+  return new Promise((resolve, reject) => {
+    transaction.oncomplete = () => resolve();
+    transaction.onerror = () => reject(transaction.error);
+    transaction.onabort = () => reject(transaction.error || new Error('Transaction aborted'));
+  });
+}
+
+/**
+ * Read one page of records with a cursor
+ * @param {IDBObjectStore|IDBIndex} source - Store or index to walk
+ * @param {Object} options
+ * @param {IDBKeyRange|IDBValidKey} [options.query] - Key range
+ * @param {IDBCursorDirection} [options.direction] - 'next' or 'prev'
+ * @param {number} [options.limit] - Maximum records
+ * @param {{key: IDBValidKey, primaryKey: IDBValidKey}} [options.after] - Resume after this position
+ * @returns {Promise<{items: Array, next: Object|null}>}
+ */
+function readCursorPage(source, { query = null, direction = 'next', limit = Infinity, after = null } = {}) {
+  return new Promise((resolve, reject) => {
+    const items = [];
+    const request = source.openCursor(query, direction);
+    const reverse = direction.startsWith('prev');
+    let positioned = !after;
+
+    // Position of the cursor relative to `after` in walk order (<= 0: already read)
+    const compare = (cursor) => {
+      const result = indexedDB.cmp(cursor.key, after.key) ||
+        indexedDB.cmp(cursor.primaryKey, after.primaryKey);
+      return reverse ? -result : result;
+    };
+
+    request.onerror = () => reject(request.error);
+    request.onsuccess = () => {
+      const cursor = request.result;
+      if (!cursor) {
+        resolve({ items, next: null });
+        return;
+      }
+
+      if (after) {
+        // Jump straight to the last record of the previous page
+        if (!positioned && compare(cursor) < 0) {
+          positioned = true;
+          if (source instanceof IDBIndex) {
+            cursor.continuePrimaryKey(after.key, after.primaryKey);
+          } else {
+            cursor.continue(after.key);
+          }
+          return;
+        }
+        positioned = true;
+        if (compare(cursor) <= 0) {
+          cursor.continue();
+          return;
+        }
+      }
+
+      items.push(cursor.value);
+      if (items.length >= limit) {
+        resolve({ items, next: { key: cursor.key, primaryKey: cursor.primaryKey } });
+        return;
+      }
+      cursor.continue();
+    };
+  });
+}
+
 /**
  * Store API - CRUD operations for all stores
  */
 export const Store = {
+  /**
+   * Run several operations in one transaction
+   * @param {string[]} storeNames - Stores to include
+   * @param {IDBTransactionMode} mode - Transaction mode
+   * @param {Function} fn - Called with ({ [storeName]: IDBObjectStore }, transaction);
+   *   only IndexedDB requests may be awaited inside it
+   * @returns {Promise<any>} - fn's result, once the transaction has committed
+   */
+  async transaction(storeNames, mode, fn) {
+    const db = await openDatabase();
+    const transaction = db.transaction(storeNames, mode);
+    const done = promisifyTransaction(transaction);
+    const stores = Object.fromEntries(storeNames.map(name => [name, transaction.objectStore(name)]));
+
+    let result;
+    try {
+      result = await fn(stores, transaction);
+    } catch (error) {
+      try {
+        transaction.abort();
+      } catch (e) {
+        // Already finished
+      }
+      done.catch(() => {});
+      throw error;
+    }
+
+    await done;
+    return result;
+  },
+
+  /**
+   * Add or update several items in one transaction
+   * @param {string} storeName - Store name
+   * @param {Object[]} items - Items to store
+   * @returns {Promise<void>}
+   */
+  async putMany(storeName, items) {
+    return Store.transaction([storeName], 'readwrite', (stores) => {
+      items.forEach(item => stores[storeName].put(item));
+    });
+  },
+
+  /**
+   * Read a page of items with a cursor
+   * @param {string} storeName - Store name
+   * @param {Object} [options]
+   * @param {string} [options.index] - Index to walk (default: primary key)
+   * @param {IDBKeyRange|IDBValidKey} [options.query] - Key range
+   * @param {IDBCursorDirection} [options.direction] - 'next' or 'prev'
+   * @param {number} [options.limit] - Page size
+   * @param {Object} [options.after] - `next` value of the previous page
+   * @returns {Promise<{items: Array, next: Object|null}>}
+   */
+  async getPage(storeName, options = {}) {
+    const { store } = await getStore(storeName, 'readonly');
+    const source = options.index ? store.index(options.index) : store;
+    return readCursorPage(source, options);
+  },
+
   /**
    * Add or update an item in a store
    * @param {string} storeName - Store name
@@ -209,46 +463,146 @@ export const Store = {
 
 /**
  * Photos Store - Specialized methods for photo management
+ *
+ * Photo objects look like:
+ *   { id, dayId, timestamp, filename, mimeType, gps, caption, dimensions, synced,
+ *     versions: { thumbnail?: Blob, medium?: Blob, original?: Blob } }
+ * Only the versions asked for are read back.
  */
 export const PhotosStore = {
+  /**
+   * Add or update a photo (metadata plus any Blob versions it carries)
+   * @param {Object} photo - Photo data
+   * @returns {Promise<string>} - Photo ID
+   */
+  async save(photo) {
+    await PhotosStore.saveMany([photo]);
+    return photo.id;
+  },
+
+  /**
+   * Add or update several photos in one transaction
+   * @param {Object[]} photos - Photo data
+   * @returns {Promise<void>}
+   */
+  async saveMany(photos) {
+    const storeNames = ['photos', ...Object.values(PHOTO_VERSION_STORES)];
+
+    return Store.transaction(storeNames, 'readwrite', (stores) => {
+      photos.forEach((photo) => {
+        const { meta, blobs } = splitPhoto(photo);
+        stores.photos.put(meta);
+        Object.entries(blobs).forEach(([name, blob]) => {
+          stores[PHOTO_VERSION_STORES[name]].put({ id: meta.id, blob });
+        });
+      });
+    });
+  },
+
   /**
    * Add a new photo
    * @param {Object} photo - Photo data
-   * @param {string} photo.id - Unique ID (UUID)
-   * @param {string} photo.dayId - Day identifier (e.g., 'day-1')
-   * @param {Blob} photo.thumb - Thumbnail blob
-   * @param {Blob} photo.medium - Medium size blob
-   * @param {Blob} [photo.original] - Original blob (optional)
-   * @param {Object} photo.gps - GPS coordinates { lat, lng }
-   * @param {string} photo.caption - Photo caption
-   * @param {Date} photo.timestamp - Capture timestamp
-   * @param {boolean} photo.synced - Sync status
    * @returns {Promise<string>}
    */
   async add(photo) {
-    const item = {
-      ...photo,
-      timestamp: photo.timestamp || new Date(),
-      synced: photo.synced || false
-    };
-    return Store.put('photos', item);
+    return PhotosStore.save(photo);
+  },
+
+  /**
+   * Get one photo
+   * @param {string} id - Photo ID
+   * @param {Object} [options]
+   * @param {string[]} [options.versions] - Versions to load (e.g. ['medium'])
+   * @returns {Promise<Object|undefined>}
+   */
+  async get(id, { versions = [] } = {}) {
+    const storeNames = ['photos', ...versions.map(name => PHOTO_VERSION_STORES[name])];
+
+    return Store.transaction(storeNames, 'readonly', async (stores) => {
+      const photo = await promisifyRequest(stores.photos.get(id));
+      if (photo) {
+        await attachVersions(stores, [photo], versions);
+      }
+      return photo;
+    });
   },
 
   /**
-   * Get all photos for a specific day
+   * Get one version of a photo
+   * @param {string} id - Photo ID
+   * @param {string} version - 'thumbnail' | 'medium' | 'original'
+   * @returns {Promise<Blob|null>}
+   */
+  async getVersion(id, version) {
+    const record = await Store.get(PHOTO_VERSION_STORES[version], id);
+    return record?.blob || null;
+  },
+
+  /**
+   * Get a page of photos in timestamp order, optionally for one day
+   * @param {Object} [options]
+   * @param {string} [options.dayId] - Day identifier
+   * @param {number} [options.limit] - Page size
+   * @param {Object} [options.after] - `next` value from the previous page
+   * @param {IDBCursorDirection} [options.direction] - 'next' (oldest first) or 'prev'
+   * @param {string[]} [options.versions] - Versions to load (default: thumbnails only)
+   * @returns {Promise<{photos: Array, next: Object|null}>}
+   */
+  async getPage({ dayId, limit = PHOTO_PAGE_SIZE, after = null, direction = 'next', versions = ['thumbnail'] } = {}) {
+    const storeNames = ['photos', ...versions.map(name => PHOTO_VERSION_STORES[name])];
+
+    return Store.transaction(storeNames, 'readonly', async (stores) => {
+      const source = dayId == null
+        ? stores.photos.index('timestamp')
+        : stores.photos.index('dayId_timestamp');
+      const query = dayId == null
+        ? null
+        : IDBKeyRange.bound([dayId, -Infinity], [dayId, Infinity]);
+
+      const { items, next } = await readCursorPage(source, { query, direction, limit, after });
+      await attachVersions(stores, items, versions);
+      return { photos: items, next };
+    });
+  },
+
+  /**
+   * Get all photos for a specific day (metadata and thumbnails)
    * @param {string} dayId - Day identifier
+   * @param {Object} [options] - See getPage()
    * @returns {Promise<Array>}
    */
-  async getByDay(dayId) {
-    return Store.getByIndex('photos', 'dayId', dayId);
+  async getByDay(dayId, options = {}) {
+    return collectPages({ ...options, dayId });
   },
 
   /**
-   * Get unsynced photos
+   * Get all photos (metadata and thumbnails)
+   * @param {Object} [options] - See getPage()
+   * @returns {Promise<Array>}
+   */
+  async getAll(options = {}) {
+    return collectPages(options);
+  },
+
+  /**
+   * Count photos, optionally for one day
+   * @param {string} [dayId] - Day identifier
+   * @returns {Promise<number>}
+   */
+  async count(dayId) {
+    if (dayId == null) {
+      return Store.count('photos');
+    }
+    const { store } = await getStore('photos', 'readonly');
+    return promisifyRequest(store.index('dayId').count(dayId));
+  },
+
+  /**
+   * Get unsynced photos (metadata only)
    * @returns {Promise<Array>}
    */
   async getUnsynced() {
-    return Store.getByIndex('photos', 'synced', false);
+    return Store.getByIndex('photos', 'synced', 0);
   },
 
   /**
@@ -257,11 +611,7 @@ export const PhotosStore = {
    * @returns {Promise<void>}
    */
   async markSynced(id) {
-    const photo = await Store.get('photos', id);
-    if (photo) {
-      photo.synced = true;
-      await Store.put('photos', photo);
-    }
+    return updatePhotoMeta(id, { synced: 1 });
   },
 
   /**
@@ -271,15 +621,79 @@ export const PhotosStore = {
    * @returns {Promise<void>}
    */
   async updateCaption(id, caption) {
-    const photo = await Store.get('photos', id);
-    if (photo) {
-      photo.caption = caption;
-      photo.synced = false; // Mark for re-sync
-      await Store.put('photos', photo);
-    }
+    // Mark for re-sync
+    return updatePhotoMeta(id, { caption, synced: 0 });
+  },
+
+  /**
+   * Delete a photo and all its versions
+   * @param {string} id - Photo ID
+   * @returns {Promise<void>}
+   */
+  async delete(id) {
+    return PhotosStore.deleteMany([id]);
+  },
+
+  /**
+   * Delete several photos in one transaction
+   * @param {string[]} ids - Photo IDs
+   * @returns {Promise<void>}
+   */
+  async deleteMany(ids) {
+    const storeNames = ['photos', ...Object.values(PHOTO_VERSION_STORES)];
+
+    return Store.transaction(storeNames, 'readwrite', (stores) => {
+      ids.forEach(id => storeNames.forEach(name => stores[name].delete(id)));
+    });
   }
 };
 
+/**
+ * Load Blob versions onto photo metadata within an open transaction
+ * @private
+ */
+async function attachVersions(stores, photos, versions) {
+  await Promise.all(photos.map(async (photo) => {
+    photo.versions = {};
+    await Promise.all(versions.map(async (name) => {
+      const record = await promisifyRequest(stores[PHOTO_VERSION_STORES[name]].get(photo.id));
+      if (record) {
+        photo.versions[name] = record.blob;
+      }
+    }));
+  }));
+}
+
+/**
+ * Read every page of a photo listing
+ * @private
+ */
+async function collectPages(options) {
+  const photos = [];
+  let after = null;
+
+  do {
+    const page = await PhotosStore.getPage({ ...options, after });
+    photos.push(...page.photos);
+    after = page.next;
+  } while (after);
+
+  return photos;
+}
+
+/**
+ * Update fields of a photo's metadata record
+ * @private
+ */
+async function updatePhotoMeta(id, changes) {
+  return Store.transaction(['photos'], 'readwrite', async (stores) => {
+    const photo = await promisifyRequest(stores.photos.get(id));
+    if (photo) {
+      stores.photos.put({ ...photo, ...changes });
+    }
+  });
+}
+
 /**
  * Weather Store - Specialized methods for weather cache
  */
@@ -323,6 +737,26 @@ export const WeatherStore = {
     return item.data;
   },
 
+  /**
+   * Get several cache records in one transaction
+   * @param {string[]} keys - locationDate keys
+   * @returns {Promise<Array<Object|null>>} - Records ({ locationDate, data, fetchedAt }) in key order
+   */
+  async getMany(keys) {
+    return Store.transaction(['weather'], 'readonly', ({ weather }) => {
+      return Promise.all(keys.map(key => promisifyRequest(weather.get(key)).then(item => item || null)));
+    });
+  },
+
+  /**
+   * Store several cache records in one transaction
+   * @param {Object[]} records - Records ({ locationDate, data, fetchedAt })
+   * @returns {Promise<void>}
+   */
+  async putMany(records) {
+    return Store.putMany('weather', records);
+  },
+
   /**
    * Clear expired weather cache
    * @param {number} maxAge - Max age in milliseconds
@@ -430,4 +864,4 @@ export function closeStore() {
 }
 
 // Export for direct store access if needed
-export { DB_NAME, DB_VERSION, STORES };
+export { DB_NAME, DB_VERSION, STORES, PHOTO_VERSION_STORES };
@@ -144,9 +144,13 @@ export async function extractGPSFromExif(buffer) {
     }
 
     let offset = 2;
-    while (offset < view.byteLength) {
+    while (offset + 4 <= view.byteLength) {
       const marker = view.getUint16(offset);
 
+      // Metadata segments come before the image data (SOS); callers may pass
+      // only the start of the file, so stop there instead of reading past it
+      if ((marker & 0xFF00) !== 0xFF00 || marker === 0xFFDA) break;
+
       if (marker === 0xFFE1) {
         // APP1 marker (EXIF)
         const exifData = parseExifGPS(view, offset + 4);
@@ -176,6 +180,22 @@ function parseExifGPS(view, offset) {
   return null;
 }
 
+/**
+ * Bytes read from the start of a file when looking for EXIF data
+ */
+const EXIF_SCAN_BYTES = 128 * 1024;
+
+/**
+ * Extract GPS coordinates from an image file's EXIF block
+ * @param {File|Blob} file - Image file
+ * @returns {Promise<{latitude: number, longitude: number, source: string}|null>}
+ */
+export async function extractGPSFromImage(file) {
+  // EXIF lives in the APP1 segment right after the JPEG header
+  const buffer = await file.slice(0, EXIF_SCAN_BYTES).arrayBuffer();
+  const gps = await extractGPSFromExif(buffer);
+  return gps ? { latitude: gps.lat, longitude: gps.lng, source: 'exif' } : null;
+}
 /**
  * Get current GPS position using Geolocation API
  * @param {Object} options - Geolocation options
@@ -278,6 +298,74 @@ export async function compressImage(file, options = {}) {
   });
 }
 
+/**
+ * Decode an image once and render several resized versions from it.
+ * Works on the main thread and inside workers (uses OffscreenCanvas when
+ * available).
+ * @param {File|Blob} file - Image file
+ * @param {Object<string, {maxWidth: number, maxHeight: number, quality?: number, type?: string}>} versions
+ * @returns {Promise<{width: number, height: number, versions: Object<string, {blob: Blob, width: number, height: number}>}>}
+ */
+export async function createImageVersions(file, versions) {
+  const bitmap = await createImageBitmap(file, { imageOrientation: 'from-image' });
+  const result = { width: bitmap.width, height: bitmap.height, versions: {} };
+
+  try {
+    for (const [name, options] of Object.entries(versions)) {
+      const { maxWidth, maxHeight, quality = 0.8, type = 'image/webp' } = options;
+      const scale = Math.min(1, maxWidth / bitmap.width, maxHeight / bitmap.height);
+      const width = Math.round(bitmap.width * scale);
+      const height = Math.round(bitmap.height * scale);
+
+      const canvas = createCanvas(width, height);
+      const ctx = canvas.getContext('2d');
+      ctx.imageSmoothingQuality = 'high';
+      ctx.drawImage(bitmap, 0, 0, width, height);
+
+      result.versions[name] = {
+        blob: await canvasToBlob(canvas, type, quality),
+        width,
+        height
+      };
+    }
+  } finally {
+    bitmap.close();
+  }
+
+  return result;
+}
+
+/**
+ * Create a canvas usable in the current context
+ * @private
+ */
+function createCanvas(width, height) {
+  if (typeof OffscreenCanvas !== 'undefined') {
+    return new OffscreenCanvas(width, height);
+  }
+  const canvas = document.createElement('canvas');
+  canvas.width = width;
+  canvas.height = height;
+  return canvas;
+}
+
+/**
+ * Encode a canvas (HTML or Offscreen) to a Blob
+ * @private
+ */
+function canvasToBlob(canvas, type, quality) {
+  if (canvas.convertToBlob) {
+    return canvas.convertToBlob({ type, quality });
+  }
+  return new Promise((resolve, reject) => {
+    canvas.toBlob(
+      (blob) => (blob ? resolve(blob) : reject(new Error('Failed to compress image'))),
+      type,
+      quality
+    );
+  });
+}
+
 /**
  * Create thumbnail from image
  * @param {File|Blob} file - Image file
@@ -405,6 +493,45 @@ export function parseGPX(gpxContent) {
   };
 }
 
+/**
+ * Decode a Google encoded polyline (as written by hooks/gpx_routes.py)
+ * @param {string} encoded - Encoded polyline
+ * @param {number} precision - Coordinate precision (default: 5)
+ * @returns {Array<[number, number]>} - Array of [lat, lng]
+ */
+export function decodePolyline(encoded, precision = 5) {
+  const factor = Math.pow(10, precision);
+  const coords = [];
+  let index = 0;
+  let lat = 0;
+  let lng = 0;
+
+  while (index < encoded.length) {
+    for (let axis = 0; axis < 2; axis++) {
+      let result = 0;
+      let shift = 0;
+      let byte;
+
+      do {
+        byte = encoded.charCodeAt(index++) - 63;
+        result |= (byte & 0x1f) << shift;
+        shift += 5;
+      } while (byte >= 0x20);
+
+      const delta = (result & 1) ? ~(result >> 1) : (result >> 1);
+      if (axis === 0) {
+        lat += delta;
+      } else {
+        lng += delta;
+      }
+    }
+
+    coords.push([lat / factor, lng / factor]);
+  }
+
+  return coords;
+}
+
 /**
  * Calculate distance between two GPS points (Haversine formula)
  * @param {number} lat1 - Latitude 1
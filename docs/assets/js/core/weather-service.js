@@ -0,0 +1,355 @@
+/**
+ * Tiger 900 - Weather Service
+ *
+ * Single source of weather data for every weather UI:
+ * - One Open-Meteo request for all trip cities (comma-separated coordinates)
+ * - Concurrent identical requests share one in-flight promise
+ * - One IndexedDB cache ('weather' store), one record per date and city
+ * - Stale-while-revalidate with a TTL that depends on how far off the day is
+ *
+ * @module core/weather-service
+ */
+
+import { WeatherStore } from './store.js';
+import { isOnline } from './utils.js';
+
+/**
+ * Service configuration
+ */
+const CONFIG = {
+  API_URL: 'https://api.open-meteo.com/v1/forecast',
+  TIMEZONE: 'America/Sao_Paulo',
+  DAILY: [
+    'weathercode',
+    'temperature_2m_max',
+    'temperature_2m_min',
+    'precipitation_probability_max',
+    'precipitation_sum',
+    'wind_speed_10m_max'
+  ]
+};
+
+/**
+ * Cache TTL by distance (in days) between today and the forecast day.
+ * Forecasts for the next days change every model run; far-off days and
+ * days already past barely change.
+ */
+const TTL_BY_DAYS_AHEAD = [
+  { maxDays: 1, ttl: 60 * 60 * 1000 }, // today and tomorrow: 1 hour
+  { maxDays: 6, ttl: 3 * 60 * 60 * 1000 }, // this week: 3 hours
+  { maxDays: Infinity, ttl: 12 * 60 * 60 * 1000 } // further out: 12 hours
+];
+const PAST_DAY_TTL = 24 * 60 * 60 * 1000;
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+/**
+ * Trip cities with coordinates (destination of each day)
+ */
+export const TRIP_CITIES = {
+  '2026-01-19': { nome: 'Uberaba', lat: -19.7489, lon: -47.9318 },
+  '2026-01-20': { nome: 'Ourinhos', lat: -22.9781, lon: -49.8719 },
+  '2026-01-21': { nome: 'Ponta Grossa', lat: -25.0994, lon: -50.1583 },
+  '2026-01-22': { nome: 'Urubici', lat: -27.9994, lon: -49.5897 },
+  '2026-01-23': { nome: 'Urubici', lat: -27.9994, lon: -49.5897 },
+  '2026-01-24': { nome: 'Bom Jardim', lat: -28.3389, lon: -49.6358 },
+  '2026-01-25': { nome: 'Cambará do Sul', lat: -29.0472, lon: -50.1431 },
+  '2026-01-26': { nome: 'Cambará do Sul', lat: -29.0472, lon: -50.1431 },
+  '2026-01-27': { nome: 'Bento Gonçalves', lat: -29.1699, lon: -51.5188 },
+  '2026-01-28': { nome: 'Bento Gonçalves', lat: -29.1699, lon: -51.5188 },
+  '2026-01-29': { nome: 'Curitiba', lat: -25.4284, lon: -49.2733 },
+  '2026-01-30': { nome: 'Curitiba', lat: -25.4284, lon: -49.2733 },
+  '2026-01-31': { nome: 'Ourinhos', lat: -22.9781, lon: -49.8719 },
+  '2026-02-01': { nome: 'Uberaba', lat: -19.7489, lon: -47.9318 },
+  '2026-02-02': { nome: 'Goiânia', lat: -16.6869, lon: -49.2648 }
+};
+
+/**
+ * Requests currently on the wire, keyed by URL
+ */
+const inflight = new Map();
+
+/**
+ * Cache refreshes in progress, keyed by cities and date range
+ */
+const refreshes = new Map();
+
+/**
+ * Forecast update listeners
+ */
+const listeners = new Set();
+
+/**
+ * Get city info for a date
+ * @param {string} dateStr - Date string (YYYY-MM-DD)
+ * @returns {Object|null}
+ */
+export function getCityForDate(dateStr) {
+  return TRIP_CITIES[dateStr] || null;
+}
+
+/**
+ * Cache key of one forecast day
+ * @private
+ */
+function cacheKey(city, dateStr) {
+  return `${city.lat},${city.lon}_${dateStr}`;
+}
+
+/**
+ * How long a cached forecast for this day stays fresh
+ * @param {string} dateStr - Forecast date (YYYY-MM-DD)
+ * @param {number} [now] - Current time in ms
+ * @returns {number} TTL in milliseconds
+ */
+export function getForecastTTL(dateStr, now = Date.now()) {
+  const today = new Date(now);
+  const startOfToday = Date.UTC(today.getFullYear(), today.getMonth(), today.getDate());
+  const daysAhead = Math.round((Date.parse(dateStr) - startOfToday) / DAY_MS);
+
+  if (daysAhead < 0) {
+    return PAST_DAY_TTL;
+  }
+  return TTL_BY_DAYS_AHEAD.find(rule => daysAhead <= rule.maxDays).ttl;
+}
+
+/**
+ * Check whether a cache record is still fresh
+ * @private
+ */
+function isFresh(record, now = Date.now()) {
+  const age = now - new Date(record.fetchedAt).getTime();
+  return age <= getForecastTTL(record.data.date, now);
+}
+
+/**
+ * Fetch daily forecasts for several locations in one request.
+ * Identical concurrent requests share the same promise.
+ * @param {Array<{lat: number, lon: number}>} cities - Locations
+ * @param {string} startDate - Start date (YYYY-MM-DD)
+ * @param {string} endDate - End date (YYYY-MM-DD)
+ * @returns {Promise<Object[]>} One Open-Meteo response per city, in order
+ */
+export function fetchForecast(cities, startDate, endDate) {
+  const params = new URLSearchParams({
+    latitude: cities.map(city => city.lat).join(','),
+    longitude: cities.map(city => city.lon).join(','),
+    daily: CONFIG.DAILY.join(','),
+    timezone: CONFIG.TIMEZONE,
+    start_date: startDate,
+    end_date: endDate
+  });
+  const url = `${CONFIG.API_URL}?${params}`;
+
+  if (inflight.has(url)) {
+    return inflight.get(url);
+  }
+
+  const request = fetch(url)
+    .then((response) => {
+      if (!response.ok) {
+        throw new Error(`Weather API error: ${response.status}`);
+      }
+      return response.json();
+    })
+    // A single location comes back as an object, several as an array
+    .then(data => (Array.isArray(data) ? data : [data]))
+    .finally(() => inflight.delete(url));
+
+  inflight.set(url, request);
+  return request;
+}
+
+/**
+ * Convert a forecast response into weather objects for the wanted dates
+ * @private
+ */
+function parseDaily(apiData, city, wanted) {
+  const daily = apiData?.daily;
+  if (!daily?.time) return [];
+
+  const days = [];
+  daily.time.forEach((date, i) => {
+    if (!wanted.has(date)) return;
+    days.push({
+      date,
+      city: city.nome,
+      code: daily.weathercode[i],
+      tempMax: daily.temperature_2m_max[i],
+      tempMin: daily.temperature_2m_min[i],
+      precipitation: daily.precipitation_probability_max[i],
+      precipSum: daily.precipitation_sum?.[i] || 0,
+      windMax: daily.wind_speed_10m_max?.[i] || 0
+    });
+  });
+  return days;
+}
+
+/**
+ * Trip days as { date, city } entries
+ * @private
+ */
+function tripEntries() {
+  return Object.entries(TRIP_CITIES).map(([date, city]) => ({ date, city }));
+}
+
+/**
+ * Fetch and cache a set of days with one request.
+ * Days that belong to the trip pull in the whole trip, so every trip city
+ * shares one cached response.
+ * @private
+ * @returns {Promise<Map<string, Object>>} Weather by cache key
+ */
+async function revalidate(entries) {
+  if (entries.some(({ date, city }) => TRIP_CITIES[date] && cacheKey(TRIP_CITIES[date], date) === cacheKey(city, date))) {
+    entries = [...tripEntries(), ...entries];
+  }
+
+  // Unique cities, each with the dates wanted for it
+  const cities = new Map();
+  for (const { date, city } of entries) {
+    const key = `${city.lat},${city.lon}`;
+    if (!cities.has(key)) {
+      cities.set(key, { city, dates: new Set() });
+    }
+    cities.get(key).dates.add(date);
+  }
+
+  const dates = entries.map(entry => entry.date).sort();
+  const groups = [...cities.values()];
+  const startDate = dates[0];
+  const endDate = dates[dates.length - 1];
+  const refreshKey = `${[...cities.keys()].join(';')}|${startDate}|${endDate}`;
+
+  if (!refreshes.has(refreshKey)) {
+    const refresh = refreshGroups(groups, startDate, endDate)
+      .finally(() => refreshes.delete(refreshKey));
+    refreshes.set(refreshKey, refresh);
+  }
+  return refreshes.get(refreshKey);
+}
+
+/**
+ * Fetch, cache and broadcast one set of cities
+ * @private
+ */
+async function refreshGroups(groups, startDate, endDate) {
+  const responses = await fetchForecast(groups.map(group => group.city), startDate, endDate);
+
+  const fetchedAt = new Date();
+  const records = [];
+  groups.forEach(({ city, dates: wanted }, i) => {
+    for (const weather of parseDaily(responses[i], city, wanted)) {
+      records.push({ locationDate: cacheKey(city, weather.date), data: weather, fetchedAt });
+    }
+  });
+
+  await WeatherStore.putMany(records).catch((error) => {
+    console.warn('[WeatherService] Failed to cache forecast:', error);
+  });
+
+  const fresh = new Map(records.map(record => [record.locationDate, record.data]));
+  notify(fresh);
+  return fresh;
+}
+
+/**
+ * Tell listeners about freshly fetched days
+ * @private
+ */
+function notify(fresh) {
+  const byDate = new Map([...fresh.values()].map(weather => [weather.date, weather]));
+  for (const listener of listeners) {
+    try {
+      listener(byDate);
+    } catch (error) {
+      console.error('[WeatherService] Listener error:', error);
+    }
+  }
+}
+
+/**
+ * Subscribe to forecast updates (fired after every successful refresh)
+ * @param {Function} callback - Callback(Map<date, weather>)
+ * @returns {Function} - Unsubscribe function
+ */
+export function onForecastUpdate(callback) {
+  listeners.add(callback);
+  return () => listeners.delete(callback);
+}
+
+/**
+ * Load weather for a set of days.
+ * Cached days are returned straight away (flagged `stale` when past their
+ * TTL) and refreshed in the background; the caller waits for the network
+ * only when a day has never been cached.
+ * @private
+ * @returns {Promise<Map<string, Object>>} Weather by date
+ */
+async function loadForecast(entries) {
+  const keys = entries.map(({ date, city }) => cacheKey(city, date));
+  const records = await WeatherStore.getMany(keys).catch(() => keys.map(() => null));
+
+  const now = Date.now();
+  const result = new Map();
+  let missing = false;
+  let expired = false;
+
+  entries.forEach(({ date }, i) => {
+    const record = records[i];
+    if (!record) {
+      missing = true;
+    } else if (isFresh(record, now)) {
+      result.set(date, record.data);
+    } else {
+      expired = true;
+      result.set(date, { ...record.data, stale: true });
+    }
+  });
+
+  if ((!missing && !expired) || !isOnline()) {
+    return result;
+  }
+
+  const refresh = revalidate(entries);
+
+  if (!missing) {
+    refresh.catch(error => console.warn('[WeatherService] Background refresh failed:', error));
+    return result;
+  }
+
+  try {
+    const fresh = await refresh;
+    entries.forEach(({ date }, i) => {
+      if (fresh.has(keys[i])) {
+        result.set(date, fresh.get(keys[i]));
+      }
+    });
+  } catch (error) {
+    console.error('[WeatherService] API error:', error);
+  }
+  return result;
+}
+
+/**
+ * Get weather for every trip day
+ * @returns {Promise<Map<string, Object>>} Weather by date
+ */
+export function getTripForecast() {
+  return loadForecast(tripEntries());
+}
+
+/**
+ * Get weather for a date
+ * @param {string} dateStr - Date string (YYYY-MM-DD)
+ * @param {Object} [city] - City with lat, lon and nome (default: trip city of the day)
+ * @returns {Promise<Object|null>}
+ */
+export async function getForecastForDate(dateStr, city = null) {
+  city = city || getCityForDate(dateStr);
+  if (!city) {
+    return null;
+  }
+
+  const forecast = await loadForecast([{ date: dateStr, city }]);
+  return forecast.get(dateStr) || null;
+}
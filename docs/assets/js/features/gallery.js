@@ -3,10 +3,10 @@
  *
  * Photo gallery functionality:
  * - Photo upload with GPS extraction
- * - Image compression and thumbnail generation
+ * - Parallel image compression and thumbnail generation (worker pool)
  * - Grid gallery display with lazy loading
  * - Lightbox viewer
- * - IndexedDB storage
+ * - IndexedDB storage (Blob versions, paged listing)
  *
  * @module features/gallery
  */
@@ -14,13 +14,11 @@
 import { Store, PhotosStore } from '../core/store.js';
 import {
   generateUUID,
-  compressImage,
-  createThumbnail,
-  extractGPSFromImage,
   getCurrentPosition,
   formatDate,
   isOnline
 } from '../core/utils.js';
+import { processImages } from '../core/image-pipeline.js';
 import { queueSync } from '../core/sync.js';
 
 /**
@@ -32,7 +30,9 @@ const CONFIG = {
   maxOriginalSize: 2000,
   compressionQuality: 0.8,
   supportedTypes: ['image/jpeg', 'image/png', 'image/webp', 'image/heic'],
-  maxFileSize: 20 * 1024 * 1024 // 20MB
+  maxFileSize: 20 * 1024 * 1024, // 20MB
+  pageSize: 60,
+  saveBatchSize: 8
 };
 
 /**
@@ -46,13 +46,56 @@ const state = {
 };
 
 /**
- * Process uploaded image - extract GPS, compress, create versions
+ * Image versions rendered from each upload (one decode per photo)
+ */
+const IMAGE_VERSIONS = {
+  thumbnail: { maxWidth: CONFIG.thumbnailSize, maxHeight: CONFIG.thumbnailSize, quality: 0.7 },
+  medium: { maxWidth: CONFIG.mediumSize, maxHeight: CONFIG.mediumSize, quality: CONFIG.compressionQuality },
+  original: { maxWidth: CONFIG.maxOriginalSize, maxHeight: CONFIG.maxOriginalSize, quality: CONFIG.compressionQuality }
+};
+
+/**
+ * Object URLs for Blob image versions, reused across renders
+ */
+const objectUrls = new WeakMap();
+
+/**
+ * Get a displayable URL for a photo version
+ * @param {Object} photo - Photo object
+ * @param {string} version - 'thumbnail' | 'medium' | 'original'
+ * @returns {string}
+ */
+export function getPhotoUrl(photo, version) {
+  const source = photo.versions?.[version];
+  if (!(source instanceof Blob)) return source || '';
+
+  if (!objectUrls.has(source)) {
+    objectUrls.set(source, URL.createObjectURL(source));
+  }
+  return objectUrls.get(source);
+}
+
+/**
+ * Revoke the object URLs created for photos that are no longer displayed
+ * @param {Object[]} photos - Photo objects
+ */
+export function releasePhotoUrls(photos) {
+  photos.forEach((photo) => {
+    Object.values(photo.versions || {}).forEach((source) => {
+      if (objectUrls.has(source)) {
+        URL.revokeObjectURL(objectUrls.get(source));
+        objectUrls.delete(source);
+      }
+    });
+  });
+}
+
+/**
+ * Validate an uploaded file before it is decoded
  * @param {File} file - Image file
- * @param {string} dayDate - Day date string (YYYY-MM-DD)
- * @returns {Promise<Object>} Processed photo object
+ * @throws {Error} When the file cannot be processed
  */
-async function processImage(file, dayDate) {
-  // Validate file
+function validateFile(file) {
   if (!CONFIG.supportedTypes.includes(file.type)) {
     throw new Error(`Tipo de arquivo não suportado: ${file.type}`);
   }
@@ -60,50 +103,31 @@ async function processImage(file, dayDate) {
   if (file.size > CONFIG.maxFileSize) {
     throw new Error(`Arquivo muito grande: máximo ${CONFIG.maxFileSize / 1024 / 1024}MB`);
   }
+}
 
-  // Extract GPS from EXIF
-  let gps = await extractGPSFromImage(file);
-
-  // Fallback to browser geolocation if no EXIF GPS
-  if (!gps && isOnline()) {
-    try {
-      const position = await getCurrentPosition();
-      gps = {
-        latitude: position.coords.latitude,
-        longitude: position.coords.longitude,
-        source: 'browser'
-      };
-    } catch (error) {
-      console.warn('[Gallery] Could not get browser location:', error);
-    }
-  }
-
-  // Create image versions
-  const thumbnail = await createThumbnail(file, CONFIG.thumbnailSize);
-  const medium = await compressImage(file, {
-    maxWidth: CONFIG.mediumSize,
-    maxHeight: CONFIG.mediumSize,
-    quality: CONFIG.compressionQuality
-  });
-  const original = await compressImage(file, {
-    maxWidth: CONFIG.maxOriginalSize,
-    maxHeight: CONFIG.maxOriginalSize,
-    quality: CONFIG.compressionQuality
-  });
+/**
+ * Build the stored photo object from a processed image
+ * @param {File} file - Source file
+ * @param {string} dayDate - Day date string (YYYY-MM-DD)
+ * @param {Object} processed - Image pipeline result
+ * @param {Function} getFallbackGPS - Resolves the browser location (shared per batch)
+ * @returns {Promise<Object>} Photo object
+ */
+async function createPhoto(file, dayDate, processed, getFallbackGPS) {
+  const { thumbnail, medium, original } = processed.versions;
 
-  // Create photo object
-  const photo = {
+  return {
     id: generateUUID(),
-    dayDate,
+    dayId: dayDate,
     filename: file.name,
     mimeType: file.type,
-    timestamp: new Date().toISOString(),
-    gps,
+    timestamp: Date.now(),
+    gps: processed.gps || await getFallbackGPS(),
     caption: '',
     versions: {
-      thumbnail: thumbnail.dataUrl,
-      medium: medium.dataUrl,
-      original: original.dataUrl
+      thumbnail: thumbnail.blob,
+      medium: medium.blob,
+      original: original.blob
     },
     dimensions: {
       original: { width: original.width, height: original.height },
@@ -112,66 +136,96 @@ async function processImage(file, dayDate) {
     },
     synced: false
   };
-
-  return photo;
 }
 
 /**
  * Upload photo(s) for a specific day
+ *
+ * Photos are decoded and resized in parallel workers and saved in small
+ * batches (one transaction each) as they finish. Progress (including
+ * 'cancelled') is reported through onProgress.
+ *
  * @param {FileList|File[]} files - Files to upload
  * @param {string} dayDate - Day date string
  * @param {Function} onProgress - Progress callback
- * @returns {Promise<Object[]>} Array of processed photos
+ * @param {Object} [options]
+ * @param {AbortSignal} [options.signal] - Cancels the remaining photos
+ * @returns {Promise<Object[]>} Array of processed photos (those saved before a cancel)
  */
-export async function uploadPhotos(files, dayDate, onProgress) {
+export async function uploadPhotos(files, dayDate, onProgress, { signal } = {}) {
+  const list = Array.from(files);
+  const total = list.length;
   const results = [];
-  const total = files.length;
+  const accepted = [];
+  let rejected = 0;
 
-  for (let i = 0; i < total; i++) {
-    const file = files[i];
+  for (const file of list) {
+    try {
+      validateFile(file);
+      accepted.push(file);
+    } catch (error) {
+      rejected++;
+      onProgress?.({ current: rejected, total, filename: file.name, phase: 'error', error: error.message });
+    }
+  }
 
-    onProgress?.({
-      current: i + 1,
-      total,
-      filename: file.name,
-      phase: 'processing'
-    });
+  // Ask the browser for a location at most once per batch
+  let fallbackGPS;
+  const getFallbackGPS = () => {
+    fallbackGPS ??= isOnline()
+      ? getCurrentPosition()
+        .then((position) => ({ latitude: position.lat, longitude: position.lng, source: 'browser' }))
+        .catch((error) => {
+          console.warn('[Gallery] Could not get browser location:', error);
+          return null;
+        })
+      : Promise.resolve(null);
+    return fallbackGPS;
+  };
 
-    try {
-      const photo = await processImage(file, dayDate);
+  // Photos waiting to be written in the next batch
+  let pending = [];
+  const flush = async () => {
+    if (!pending.length) return;
+    const batch = pending;
+    pending = [];
 
-      // Save to IndexedDB
-      await PhotosStore.save(photo);
+    // Save to IndexedDB
+    await PhotosStore.saveMany(batch);
 
-      // Queue for sync
-      queueSync('upload', 'photo', { id: photo.id });
+    // Queue for sync
+    batch.forEach(photo => queueSync('upload', 'photo', { id: photo.id }));
+    results.push(...batch);
+  };
 
-      results.push(photo);
+  try {
+    await processImages(accepted, IMAGE_VERSIONS, {
+      signal,
+      onProgress: (progress) => onProgress?.({ ...progress, current: progress.current + rejected, total }),
+      onResult: async ({ file, result, error }) => {
+        if (error) {
+          console.error('[Gallery] Error processing', file.name, error);
+          throw error;
+        }
 
-      onProgress?.({
-        current: i + 1,
-        total,
-        filename: file.name,
-        phase: 'complete'
-      });
-    } catch (error) {
-      console.error('[Gallery] Error processing', file.name, error);
-
-      onProgress?.({
-        current: i + 1,
-        total,
-        filename: file.name,
-        phase: 'error',
-        error: error.message
-      });
-    }
+        pending.push(await createPhoto(file, dayDate, result, getFallbackGPS));
+        if (pending.length >= CONFIG.saveBatchSize) {
+          await flush();
+        }
+      }
+    });
+  } catch (error) {
+    if (error.name !== 'AbortError') throw error;
+  } finally {
+    // Keep photos that finished before a cancel
+    await flush();
   }
 
   return results;
 }
 
 /**
- * Get photos for a specific day
+ * Get photos for a specific day (metadata and thumbnails)
  * @param {string} dayDate - Day date string
  * @returns {Promise<Object[]>}
  */
@@ -180,13 +234,38 @@ export async function getPhotosForDay(dayDate) {
 }
 
 /**
- * Get all photos
+ * Get all photos (metadata and thumbnails)
  * @returns {Promise<Object[]>}
  */
 export async function getAllPhotos() {
   return PhotosStore.getAll();
 }
 
+/**
+ * Get a page of photos (metadata and thumbnails)
+ * @param {Object} [options]
+ * @param {string} [options.dayDate] - Only this day
+ * @param {Object} [options.after] - `next` value from the previous page
+ * @returns {Promise<{photos: Object[], next: Object|null}>}
+ */
+export async function getPhotoPage({ dayDate, after = null } = {}) {
+  return PhotosStore.getPage({ dayId: dayDate || undefined, after, limit: CONFIG.pageSize });
+}
+
+/**
+ * Load a photo version that is not in memory yet (e.g. medium for the lightbox)
+ * @param {Object} photo - Photo object
+ * @param {string} version - 'medium' | 'original'
+ * @returns {Promise<Object>} The same photo, with the version attached
+ */
+export async function loadPhotoVersion(photo, version) {
+  if (!photo.versions?.[version]) {
+    const blob = await PhotosStore.getVersion(photo.id, version);
+    photo.versions = { ...photo.versions, [version]: blob };
+  }
+  return photo;
+}
+
 /**
  * Update photo caption
  * @param {string} photoId - Photo ID
@@ -194,14 +273,10 @@ export async function getAllPhotos() {
  * @returns {Promise<void>}
  */
 export async function updateCaption(photoId, caption) {
-  const photo = await PhotosStore.get(photoId);
-  if (!photo) return;
-
-  photo.caption = caption.slice(0, 280); // Max 280 chars
-  photo.synced = false;
+  const text = caption.slice(0, 280); // Max 280 chars
 
-  await PhotosStore.save(photo);
-  queueSync('update', 'photo', { id: photoId, caption: photo.caption });
+  await PhotosStore.updateCaption(photoId, text);
+  queueSync('update', 'photo', { id: photoId, caption: text });
 }
 
 /**
@@ -228,12 +303,17 @@ class PhotoUpload extends HTMLElement {
     this.attachShadow({ mode: 'open' });
     this._uploading = false;
     this._progress = null;
+    this._abortController = null;
   }
 
   connectedCallback() {
     this.render();
   }
 
+  disconnectedCallback() {
+    this._abortController?.abort();
+  }
+
   get day() {
     return this.getAttribute('day');
   }
@@ -242,13 +322,14 @@ class PhotoUpload extends HTMLElement {
     if (this._uploading || !files.length) return;
 
     this._uploading = true;
+    this._abortController = new AbortController();
     this.render();
 
     try {
       const photos = await uploadPhotos(files, this.day, (progress) => {
         this._progress = progress;
         this.render();
-      });
+      }, { signal: this._abortController.signal });
 
       // Dispatch event for gallery to refresh
       this.dispatchEvent(new CustomEvent('photos-uploaded', {
@@ -261,6 +342,7 @@ class PhotoUpload extends HTMLElement {
 
     this._uploading = false;
     this._progress = null;
+    this._abortController = null;
     this.render();
   }
 
@@ -354,6 +436,17 @@ class PhotoUpload extends HTMLElement {
           margin-top: 8px;
         }
 
+        .cancel-btn {
+          margin-top: 12px;
+          padding: 6px 16px;
+          background: none;
+          color: #666;
+          border: 1px solid #ccc;
+          border-radius: 6px;
+          font-size: 13px;
+          cursor: pointer;
+        }
+
         @media (prefers-color-scheme: dark) {
           .upload-container { background: #2d2d2d; border-color: #555; }
           .upload-container:hover { background: #1d3d3d; }
@@ -379,6 +472,7 @@ class PhotoUpload extends HTMLElement {
               ${this._progress.current} de ${this._progress.total} - ${this._progress.filename}
             </div>
           </div>
+          <button class="cancel-btn" id="cancelBtn">Cancelar</button>
         </div>
       `;
     } else {
@@ -396,6 +490,10 @@ class PhotoUpload extends HTMLElement {
     this.shadowRoot.innerHTML = styles + content;
 
     // Add event listeners
+    this.shadowRoot.getElementById('cancelBtn')?.addEventListener('click', () => {
+      this._abortController?.abort();
+    });
+
     if (!this._uploading) {
       const dropzone = this.shadowRoot.getElementById('dropzone');
       const fileInput = this.shadowRoot.getElementById('fileInput');
@@ -443,7 +541,9 @@ class PhotoGrid extends HTMLElement {
     super();
     this.attachShadow({ mode: 'open' });
     this._photos = [];
+    this._next = null;
     this._loading = true;
+    this._loadingMore = false;
   }
 
   connectedCallback() {
@@ -471,21 +571,40 @@ class PhotoGrid extends HTMLElement {
     this._loading = true;
     this.render();
 
+    releasePhotoUrls(this._photos);
+
     try {
-      if (this.day) {
-        this._photos = await getPhotosForDay(this.day);
-      } else {
-        this._photos = await getAllPhotos();
-      }
+      const page = await getPhotoPage({ dayDate: this.day });
+      this._photos = page.photos;
+      this._next = page.next;
     } catch (error) {
       console.error('[PhotoGrid] Error loading photos:', error);
       this._photos = [];
+      this._next = null;
     }
 
     this._loading = false;
     this.render();
   }
 
+  async loadMore() {
+    if (!this._next || this._loadingMore) return;
+
+    this._loadingMore = true;
+    this.render();
+
+    try {
+      const page = await getPhotoPage({ dayDate: this.day, after: this._next });
+      this._photos = [...this._photos, ...page.photos];
+      this._next = page.next;
+    } catch (error) {
+      console.error('[PhotoGrid] Error loading photos:', error);
+    }
+
+    this._loadingMore = false;
+    this.render();
+  }
+
   openLightbox(index) {
     this.dispatchEvent(new CustomEvent('open-lightbox', {
       detail: { photos: this._photos, index },
@@ -561,6 +680,18 @@ class PhotoGrid extends HTMLElement {
           color: #666;
         }
 
+        .load-more {
+          display: block;
+          margin: 16px auto 0;
+          padding: 8px 20px;
+          background: none;
+          color: var(--md-primary-fg-color, #009688);
+          border: 1px solid currentColor;
+          border-radius: 6px;
+          font-size: 14px;
+          cursor: pointer;
+        }
+
         .skeleton {
           background: linear-gradient(90deg, #f0f0f0 25%, #e0e0e0 50%, #f0f0f0 75%);
           background-size: 200% 100%;
@@ -606,7 +737,7 @@ class PhotoGrid extends HTMLElement {
     } else {
       const photosHTML = this._photos.map((photo, index) => `
         <div class="photo-item" data-id="${photo.id}" data-index="${index}">
-          <img src="${photo.versions.thumbnail}" alt="${photo.caption || photo.filename}" loading="lazy">
+          <img src="${getPhotoUrl(photo, 'thumbnail')}" alt="${photo.caption || photo.filename}" loading="lazy">
           ${photo.gps ? '<span class="gps-badge">📍</span>' : ''}
           <div class="overlay">
             ${photo.caption || formatDate(photo.timestamp, { timeStyle: 'short' })}
@@ -615,10 +746,20 @@ class PhotoGrid extends HTMLElement {
       `).join('');
 
       content = `<div class="photo-grid">${photosHTML}</div>`;
+
+      if (this._next) {
+        content += `
+          <button class="load-more" id="loadMoreBtn" ${this._loadingMore ? 'disabled' : ''}>
+            ${this._loadingMore ? 'Carregando...' : 'Carregar mais fotos'}
+          </button>
+        `;
+      }
     }
 
     this.shadowRoot.innerHTML = styles + content;
 
+    this.shadowRoot.getElementById('loadMoreBtn')?.addEventListener('click', () => this.loadMore());
+
     // Add click handlers
     this.shadowRoot.querySelectorAll('.photo-item').forEach(item => {
       item.addEventListener('click', () => {
@@ -824,6 +965,15 @@ class PhotoLightbox extends HTMLElement {
     }
 
     const photo = this._photos[this._currentIndex];
+
+    // Medium versions are read on demand; show the thumbnail meanwhile
+    if (!photo.versions?.medium) {
+      loadPhotoVersion(photo, 'medium')
+        .then(() => this._visible && this._photos[this._currentIndex] === photo && this.render())
+        .catch(error => console.warn('[Lightbox] Could not load photo:', error));
+    }
+    const imageUrl = getPhotoUrl(photo, 'medium') || getPhotoUrl(photo, 'thumbnail');
+
     const dateStr = formatDate(photo.timestamp, {
       dateStyle: 'long',
       timeStyle: 'short'
@@ -838,7 +988,7 @@ class PhotoLightbox extends HTMLElement {
         </div>
         <div class="lightbox-main">
           <button class="lightbox-nav lightbox-prev" id="prevBtn" ${this._currentIndex === 0 ? 'disabled' : ''}>‹</button>
-          <img class="lightbox-image" src="${photo.versions.medium}" alt="${photo.caption || ''}">
+          <img class="lightbox-image" src="${imageUrl}" alt="${photo.caption || ''}">
           <button class="lightbox-nav lightbox-next" id="nextBtn" ${this._currentIndex === this._photos.length - 1 ? 'disabled' : ''}>›</button>
         </div>
         <div class="lightbox-footer">
@@ -916,10 +1066,5 @@ export function initGallery() {
 }
 
 export {
-  uploadPhotos,
-  getPhotosForDay,
-  getAllPhotos,
-  updateCaption,
-  deletePhoto,
   CONFIG as GalleryConfig
 };
@@ -14,6 +14,7 @@
 import { Store, PhotosStore } from '../core/store.js';
 import { getSyncStatus, getPendingCount, onSyncStatusChange, retryFailedSync } from '../core/sync.js';
 import { formatDate, isOnline, onNetworkChange } from '../core/utils.js';
+import { getPhotoUrl, releasePhotoUrls } from './gallery.js';
 
 /**
  * Photo Editor Custom Element
@@ -36,6 +37,10 @@ class PhotoEditor extends HTMLElement {
     this.loadPhoto();
   }
 
+  disconnectedCallback() {
+    releasePhotoUrls(this._photo ? [this._photo] : []);
+  }
+
   attributeChangedCallback(name, oldValue, newValue) {
     if (name === 'photo-id' && oldValue !== newValue) {
       this.loadPhoto();
@@ -48,16 +53,18 @@ class PhotoEditor extends HTMLElement {
 
   async loadPhoto() {
     if (!this.photoId) return;
-    this._photo = await PhotosStore.get(this.photoId);
+    const previous = this._photo;
+    this._photo = await PhotosStore.get(this.photoId, { versions: ['medium'] });
     this.render();
+    releasePhotoUrls(previous ? [previous] : []);
   }
 
   async saveCaption(caption) {
     if (!this._photo) return;
 
     this._photo.caption = caption.slice(0, 280);
-    this._photo.synced = false;
-    await PhotosStore.save(this._photo);
+    this._photo.synced = 0;
+    await PhotosStore.updateCaption(this._photo.id, this._photo.caption);
 
     // Import and queue sync
     const { queueSync } = await import('../core/sync.js');
@@ -265,7 +272,7 @@ class PhotoEditor extends HTMLElement {
       ${styles}
       <div class="editor-container">
         <div class="photo-preview">
-          <img src="${this._photo.versions.medium}" alt="${this._photo.caption || ''}">
+          <img src="${getPhotoUrl(this._photo, 'medium')}" alt="${this._photo.caption || ''}">
           <div class="photo-actions">
             <button class="action-btn" id="editBtn" title="Editar legenda">✏️</button>
             <button class="action-btn delete" id="deleteBtn" title="Excluir foto">🗑️</button>
@@ -680,6 +687,10 @@ class MediaCarousel extends HTMLElement {
     this.loadPhotos();
   }
 
+  disconnectedCallback() {
+    releasePhotoUrls(this._photos);
+  }
+
   get day() {
     return this.getAttribute('day');
   }
@@ -689,13 +700,15 @@ class MediaCarousel extends HTMLElement {
   }
 
   async loadPhotos() {
+    const previous = this._photos;
     try {
-      const allPhotos = await PhotosStore.getByDay(this.day);
-      this._photos = allPhotos.slice(0, this.max);
+      const { photos } = await PhotosStore.getPage({ dayId: this.day, limit: this.max });
+      this._photos = photos;
     } catch (error) {
       this._photos = [];
     }
     this.render();
+    releasePhotoUrls(previous);
   }
 
   prev() {
@@ -825,7 +838,7 @@ class MediaCarousel extends HTMLElement {
 
     const slidesHTML = this._photos.map(photo => `
       <div class="carousel-slide">
-        <img src="${photo.versions.thumbnail}" alt="${photo.caption || ''}" loading="lazy">
+        <img src="${getPhotoUrl(photo, 'thumbnail')}" alt="${photo.caption || ''}" loading="lazy">
       </div>
     `).join('');
 
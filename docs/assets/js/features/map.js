@@ -11,8 +11,8 @@
  * @module features/map
  */
 
-import { parseGPX, haversineDistance, formatDate } from '../core/utils.js';
-import { getAllPhotos, getPhotosForDay } from './gallery.js';
+import { parseGPX, decodePolyline, haversineDistance, formatDate } from '../core/utils.js';
+import { getAllPhotos, getPhotosForDay, getPhotoUrl, releasePhotoUrls } from './gallery.js';
 
 /**
  * Map configuration
@@ -23,7 +23,15 @@ const CONFIG = {
   minZoom: 6,
   maxZoom: 18,
   tileUrl: 'https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png',
+  // Served by the Service Worker from the offline tile pack (hooks/tile_pack.py)
+  offlineTileUrl: new URL('../../../', import.meta.url).href + 'tiles/{z}/{x}/{y}.png',
   tileAttribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a>',
+  // Route geometry compiled at build time by hooks/gpx_routes.py
+  routesUrl: new URL('../../data/routes/', import.meta.url).href,
+  tripRoute: '01_Rota_Cenica_Completa',
+  // A trip day uses the compiled days (up to maxDays in a row) that start
+  // and end within radiusKm of its waypoints; otherwise a straight line
+  routeMatch: { radiusKm: 15, maxDays: 2 },
   // Route colors for each day
   routeColors: [
     '#2196f3', '#4caf50', '#ff9800', '#e91e63',
@@ -103,6 +111,81 @@ async function loadLeaflet() {
   });
 }
 
+/**
+ * Compiled route geometry cache (route id -> Promise)
+ */
+const routeCache = new Map();
+
+/**
+ * Load compiled route geometry
+ * @param {string} routeId - GPX file name without extension
+ * @returns {Promise<Object|null>} - Route document or null if not compiled
+ */
+function loadRouteGeometry(routeId) {
+  if (!routeCache.has(routeId)) {
+    const promise = fetch(`${CONFIG.routesUrl}${encodeURIComponent(routeId)}.json`)
+      .then(response => (response.ok ? response.json() : null))
+      .catch(() => null);
+    routeCache.set(routeId, promise);
+  }
+  return routeCache.get(routeId);
+}
+
+/**
+ * Get compiled geometry for a trip day.
+ * The GPX plan has its own day numbering, so days are matched by endpoints:
+ * the shortest run of consecutive compiled days that leaves from the
+ * waypoint start and arrives at the waypoint end.
+ * @param {Object} waypoint - Entry of TRIP_WAYPOINTS
+ * @returns {Promise<Object|null>} - Matched days with decoded coordinates
+ */
+async function getDayGeometry(waypoint) {
+  const route = await loadRouteGeometry(CONFIG.tripRoute);
+  if (!route) return null;
+
+  const { radiusKm, maxDays } = CONFIG.routeMatch;
+  const near = (point, target) => point &&
+    haversineDistance(point[0], point[1], target[0], target[1]) <= radiusKm;
+
+  for (let length = 1; length <= maxDays; length++) {
+    for (let first = 0; first + length <= route.days.length; first++) {
+      const days = route.days.slice(first, first + length);
+      if (!near(days[0].from, waypoint.coords.start) || !near(days[length - 1].to, waypoint.coords.end)) {
+        continue;
+      }
+
+      // Each compiled day starts at the previous day's last point
+      const coordinates = days.flatMap((day, i) => decodePolyline(day.polyline).slice(i ? 1 : 0));
+      return { days, coordinates };
+    }
+  }
+  return null;
+}
+
+/**
+ * Ask the Service Worker whether it can serve tiles from an offline pack.
+ * Builds without a pack keep loading tiles straight from the tile server.
+ * @returns {Promise<boolean>}
+ */
+function hasOfflineTiles() {
+  const controller = navigator.serviceWorker?.controller;
+  if (!controller) {
+    return Promise.resolve(false);
+  }
+
+  return new Promise((resolve) => {
+    const channel = new MessageChannel();
+    channel.port1.onmessage = (event) => {
+      resolve(Boolean(event.data?.available));
+    };
+
+    controller.postMessage({ type: 'GET_TILE_PACK_STATUS' }, [channel.port2]);
+
+    // Timeout after 1 second
+    setTimeout(() => resolve(false), 1000);
+  });
+}
+
 /**
  * Create custom marker icons
  */
@@ -193,6 +276,7 @@ class RouteMap extends HTMLElement {
 
   disconnectedCallback() {
     if (this._map) {
+      this.clearLayers();
       this._map.remove();
       this._map = null;
     }
@@ -240,8 +324,9 @@ class RouteMap extends HTMLElement {
         attributionControl: true
       });
 
-      // Add tile layer
-      L.tileLayer(CONFIG.tileUrl, {
+      // Add tile layer (offline pack when the Service Worker has one)
+      const tileUrl = await hasOfflineTiles() ? CONFIG.offlineTileUrl : CONFIG.tileUrl;
+      L.tileLayer(tileUrl, {
         attribution: CONFIG.tileAttribution
       }).addTo(this._map);
 
@@ -290,10 +375,27 @@ class RouteMap extends HTMLElement {
     this._layers.markers.forEach(layer => this._map.removeLayer(layer));
     this._layers.photos.forEach(layer => this._map.removeLayer(layer));
 
+    // Photo objects are re-read on every update; free their object URLs
+    releasePhotoUrls(this._layers.photos.map(layer => layer.photo));
+
     this._layers = { routes: [], markers: [], photos: [] };
   }
 
   async loadGPX(url) {
+    // Prefer the build-time compiled geometry over parsing XML on the device
+    const routeId = url.split('/').pop().replace(/\.gpx$/i, '');
+    const route = await loadRouteGeometry(routeId);
+
+    if (route) {
+      const days = route.days.map(day => decodePolyline(day.polyline));
+      days.forEach((coordinates, index) => this.addRoute(coordinates, index));
+
+      const lastDay = days[days.length - 1];
+      this.addMarker(days[0][0], 'start', 'Início');
+      this.addMarker(lastDay[lastDay.length - 1], 'end', 'Fim');
+      return;
+    }
+
     try {
       const response = await fetch(url);
       const gpxText = await response.text();
@@ -321,8 +423,11 @@ class RouteMap extends HTMLElement {
     const L = window.L;
     const dayIndex = Object.keys(TRIP_WAYPOINTS).indexOf(dayDate);
 
-    // Add route line (simplified without GPX)
-    if (waypoint.coords.start[0] !== waypoint.coords.end[0] ||
+    // Add route line (compiled GPX geometry, straight line as fallback)
+    const geometry = await getDayGeometry(waypoint);
+    if (geometry) {
+      this.addRoute(geometry.coordinates, dayIndex);
+    } else if (waypoint.coords.start[0] !== waypoint.coords.end[0] ||
         waypoint.coords.start[1] !== waypoint.coords.end[1]) {
       this.addRoute([waypoint.coords.start, waypoint.coords.end], dayIndex);
     }
@@ -354,11 +459,14 @@ class RouteMap extends HTMLElement {
   async showAllRoutes() {
     const L = window.L;
     const dates = Object.keys(TRIP_WAYPOINTS);
+    const geometries = await Promise.all(dates.map(date => getDayGeometry(TRIP_WAYPOINTS[date])));
 
     dates.forEach((date, index) => {
       const waypoint = TRIP_WAYPOINTS[date];
 
-      if (waypoint.coords.start[0] !== waypoint.coords.end[0] ||
+      if (geometries[index]) {
+        this.addRoute(geometries[index].coordinates, index);
+      } else if (waypoint.coords.start[0] !== waypoint.coords.end[0] ||
           waypoint.coords.start[1] !== waypoint.coords.end[1]) {
         this.addRoute([waypoint.coords.start, waypoint.coords.end], index);
       }
@@ -419,14 +527,17 @@ class RouteMap extends HTMLElement {
           icon: this._icons.photo
         });
 
-        const popupContent = `
+        // The thumbnail URL only exists while the popup is open
+        const popupContent = () => `
           <div style="text-align: center;">
-            <img src="${photo.versions.thumbnail}" style="max-width: 150px; border-radius: 4px;">
+            <img src="${getPhotoUrl(photo, 'thumbnail')}" style="max-width: 150px; border-radius: 4px;">
             ${photo.caption ? `<p style="margin: 8px 0 0; font-size: 12px;">${photo.caption}</p>` : ''}
           </div>
         `;
 
+        marker.photo = photo;
         marker.bindPopup(popupContent).addTo(this._map);
+        marker.on('popupclose', () => releasePhotoUrls([photo]));
         this._layers.photos.push(marker);
       });
     } catch (error) {
@@ -690,6 +801,7 @@ export function initMap() {
 
 export {
   loadLeaflet,
+  loadRouteGeometry,
   CONFIG as MapConfig,
   TRIP_WAYPOINTS,
   POIS
@@ -11,7 +11,7 @@
  */
 
 import { formatDate } from '../core/utils.js';
-import { getWeatherForDate, getWMOInfo } from './weather.js';
+import { getAllTripWeather, getWeatherForDate, getWMOInfo } from './weather.js';
 
 /**
  * Trip data configuration
@@ -512,19 +512,22 @@ class TripTimeline extends HTMLElement {
   async loadWeatherForDays() {
     const weatherCells = this.shadowRoot.querySelectorAll('.day-weather');
 
+    // One cache read (and at most one request) for every day
+    let forecast = new Map();
+    try {
+      forecast = await getAllTripWeather();
+    } catch (error) {
+      console.error('[Timeline] Weather error:', error);
+    }
+
     for (const cell of weatherCells) {
-      const date = cell.dataset.date;
-      try {
-        const weather = await getWeatherForDate(date);
-        if (weather) {
-          const info = getWMOInfo(weather.code);
-          cell.innerHTML = `
-            <span title="${info.desc}\n${Math.round(weather.tempMin)}° - ${Math.round(weather.tempMax)}°C">${info.icon}</span>
-          `;
-        } else {
-          cell.innerHTML = '<span>—</span>';
-        }
-      } catch (error) {
+      const weather = forecast.get(cell.dataset.date);
+      if (weather) {
+        const info = getWMOInfo(weather.code);
+        cell.innerHTML = `
+          <span title="${info.desc}\n${Math.round(weather.tempMin)}° - ${Math.round(weather.tempMax)}°C">${info.icon}</span>
+        `;
+      } else {
         cell.innerHTML = '<span>—</span>';
       }
     }
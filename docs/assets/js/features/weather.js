@@ -4,45 +4,21 @@
  * Weather forecast functionality:
  * - WeatherWidget custom element
  * - Multi-day weather overview
- * - Open-Meteo API integration
- * - IndexedDB caching with TTL
+ * - Data from the shared weather service (core/weather-service)
+ * - Re-renders when a background refresh lands
  * - Offline graceful degradation
  *
  * @module features/weather
  */
 
-import { Store, WeatherStore } from '../core/store.js';
-import { formatDate, isOnline, onNetworkChange } from '../core/utils.js';
-
-/**
- * API Configuration
- */
-const CONFIG = {
-  API_URL: 'https://api.open-meteo.com/v1/forecast',
-  CACHE_TTL: 3 * 60 * 60 * 1000, // 3 hours
-  TIMEZONE: 'America/Sao_Paulo'
-};
-
-/**
- * Trip cities with coordinates (destination of each day)
- */
-const TRIP_CITIES = {
-  '2026-01-19': { nome: 'Uberaba', lat: -19.7489, lon: -47.9318 },
-  '2026-01-20': { nome: 'Ourinhos', lat: -22.9781, lon: -49.8719 },
-  '2026-01-21': { nome: 'Ponta Grossa', lat: -25.0994, lon: -50.1583 },
-  '2026-01-22': { nome: 'Urubici', lat: -27.9994, lon: -49.5897 },
-  '2026-01-23': { nome: 'Urubici', lat: -27.9994, lon: -49.5897 },
-  '2026-01-24': { nome: 'Bom Jardim', lat: -28.3389, lon: -49.6358 },
-  '2026-01-25': { nome: 'Cambará do Sul', lat: -29.0472, lon: -50.1431 },
-  '2026-01-26': { nome: 'Cambará do Sul', lat: -29.0472, lon: -50.1431 },
-  '2026-01-27': { nome: 'Bento Gonçalves', lat: -29.1699, lon: -51.5188 },
-  '2026-01-28': { nome: 'Bento Gonçalves', lat: -29.1699, lon: -51.5188 },
-  '2026-01-29': { nome: 'Curitiba', lat: -25.4284, lon: -49.2733 },
-  '2026-01-30': { nome: 'Curitiba', lat: -25.4284, lon: -49.2733 },
-  '2026-01-31': { nome: 'Ourinhos', lat: -22.9781, lon: -49.8719 },
-  '2026-02-01': { nome: 'Uberaba', lat: -19.7489, lon: -47.9318 },
-  '2026-02-02': { nome: 'Goiânia', lat: -16.6869, lon: -49.2648 }
-};
+import { isOnline, onNetworkChange } from '../core/utils.js';
+import {
+  TRIP_CITIES,
+  getCityForDate,
+  getForecastForDate,
+  getTripForecast,
+  onForecastUpdate
+} from '../core/weather-service.js';
 
 /**
  * WMO Weather Codes to icons and descriptions
@@ -80,195 +56,24 @@ function getWMOInfo(code) {
   return WMO_CODES[code] || { icon: '❓', desc: 'Desconhecido', severity: 'unknown' };
 }
 
-/**
- * Get city info for a date
- */
-export function getCityForDate(dateStr) {
-  return TRIP_CITIES[dateStr] || null;
-}
-
-/**
- * Fetch weather data from Open-Meteo API
- * @param {number} lat - Latitude
- * @param {number} lon - Longitude
- * @param {string} startDate - Start date (YYYY-MM-DD)
- * @param {string} endDate - End date (YYYY-MM-DD)
- * @returns {Promise<Object>}
- */
-async function fetchWeatherFromAPI(lat, lon, startDate, endDate) {
-  const params = new URLSearchParams({
-    latitude: lat,
-    longitude: lon,
-    daily: 'weathercode,temperature_2m_max,temperature_2m_min,precipitation_probability_max,precipitation_sum,wind_speed_10m_max',
-    timezone: CONFIG.TIMEZONE,
-    start_date: startDate,
-    end_date: endDate
-  });
-
-  const response = await fetch(`${CONFIG.API_URL}?${params}`);
-
-  if (!response.ok) {
-    throw new Error(`Weather API error: ${response.status}`);
-  }
-
-  return response.json();
-}
-
 /**
  * Get weather for a specific date and location
- * Uses cache if available, fetches from API otherwise
+ * Served from the shared weather cache; stale entries come back with
+ * `stale: true` and are refreshed in the background
  * @param {string} dateStr - Date string (YYYY-MM-DD)
  * @param {Object} city - City object with lat, lon, nome
  * @returns {Promise<Object|null>}
  */
-export async function getWeatherForDate(dateStr, city = null) {
-  if (!city) {
-    city = getCityForDate(dateStr);
-  }
-
-  if (!city) {
-    return null;
-  }
-
-  const cacheKey = `${dateStr}_${city.lat}_${city.lon}`;
-
-  // Try cache first
-  const cached = await WeatherStore.get(cacheKey);
-  if (cached && (Date.now() - cached.timestamp < CONFIG.CACHE_TTL)) {
-    return cached.data;
-  }
-
-  // Fetch from API if online
-  if (!isOnline()) {
-    // Return stale cache if available
-    if (cached) {
-      return { ...cached.data, stale: true };
-    }
-    return null;
-  }
-
-  try {
-    const apiData = await fetchWeatherFromAPI(city.lat, city.lon, dateStr, dateStr);
-
-    if (!apiData.daily) {
-      return null;
-    }
-
-    const weather = {
-      date: dateStr,
-      city: city.nome,
-      code: apiData.daily.weathercode[0],
-      tempMax: apiData.daily.temperature_2m_max[0],
-      tempMin: apiData.daily.temperature_2m_min[0],
-      precipitation: apiData.daily.precipitation_probability_max[0],
-      precipSum: apiData.daily.precipitation_sum?.[0] || 0,
-      windMax: apiData.daily.wind_speed_10m_max?.[0] || 0
-    };
-
-    // Cache the result
-    await WeatherStore.save(cacheKey, weather);
-
-    return weather;
-  } catch (error) {
-    console.error('[Weather] API error:', error);
-
-    // Return stale cache on error
-    if (cached) {
-      return { ...cached.data, stale: true };
-    }
-    return null;
-  }
+export function getWeatherForDate(dateStr, city = null) {
+  return getForecastForDate(dateStr, city);
 }
 
 /**
  * Get weather for all trip days
  * @returns {Promise<Map<string, Object>>}
  */
-export async function getAllTripWeather() {
-  const weatherMap = new Map();
-  const dates = Object.keys(TRIP_CITIES);
-
-  // Group by unique city to reduce API calls
-  const uniqueCities = new Map();
-  for (const date of dates) {
-    const city = TRIP_CITIES[date];
-    const key = `${city.lat},${city.lon}`;
-    if (!uniqueCities.has(key)) {
-      uniqueCities.set(key, { city, dates: [] });
-    }
-    uniqueCities.get(key).dates.push(date);
-  }
-
-  // Check cache first for all dates
-  for (const date of dates) {
-    const city = TRIP_CITIES[date];
-    const cacheKey = `${date}_${city.lat}_${city.lon}`;
-    const cached = await WeatherStore.get(cacheKey);
-
-    if (cached && (Date.now() - cached.timestamp < CONFIG.CACHE_TTL)) {
-      weatherMap.set(date, cached.data);
-    }
-  }
-
-  // If all cached, return early
-  if (weatherMap.size === dates.length) {
-    return weatherMap;
-  }
-
-  // Fetch missing from API
-  if (!isOnline()) {
-    // Fill remaining with stale cache or null
-    for (const date of dates) {
-      if (!weatherMap.has(date)) {
-        const city = TRIP_CITIES[date];
-        const cacheKey = `${date}_${city.lat}_${city.lon}`;
-        const cached = await WeatherStore.get(cacheKey);
-        if (cached) {
-          weatherMap.set(date, { ...cached.data, stale: true });
-        }
-      }
-    }
-    return weatherMap;
-  }
-
-  // Fetch from API for each unique city
-  const startDate = dates[0];
-  const endDate = dates[dates.length - 1];
-
-  for (const [, { city, dates: cityDates }] of uniqueCities) {
-    try {
-      const apiData = await fetchWeatherFromAPI(city.lat, city.lon, startDate, endDate);
-
-      if (apiData.daily) {
-        for (let i = 0; i < apiData.daily.time.length; i++) {
-          const date = apiData.daily.time[i];
-
-          if (cityDates.includes(date)) {
-            const weather = {
-              date,
-              city: city.nome,
-              code: apiData.daily.weathercode[i],
-              tempMax: apiData.daily.temperature_2m_max[i],
-              tempMin: apiData.daily.temperature_2m_min[i],
-              precipitation: apiData.daily.precipitation_probability_max[i],
-              precipSum: apiData.daily.precipitation_sum?.[i] || 0,
-              windMax: apiData.daily.wind_speed_10m_max?.[i] || 0
-            };
-
-            weatherMap.set(date, weather);
-
-            // Cache individually
-            const cacheKey = `${date}_${city.lat}_${city.lon}`;
-            await WeatherStore.save(cacheKey, weather);
-          }
-        }
-      }
-    } catch (error) {
-      console.error('[Weather] API error for', city.nome, error);
-    }
-  }
-
-  return weatherMap;
+export function getAllTripWeather() {
+  return getTripForecast();
 }
 
 /**
@@ -297,12 +102,23 @@ class WeatherWidget extends HTMLElement {
         this.loadWeather();
       }
     });
+
+    // Pick up background refreshes of a stale cache
+    this._forecastListener = onForecastUpdate((forecast) => {
+      if (forecast.has(this.date)) {
+        this._weather = forecast.get(this.date);
+        this.render();
+      }
+    });
   }
 
   disconnectedCallback() {
     if (this._networkListener) {
       this._networkListener();
     }
+    if (this._forecastListener) {
+      this._forecastListener();
+    }
   }
 
   attributeChangedCallback(name, oldValue, newValue) {
@@ -523,6 +339,21 @@ class WeatherOverview extends HTMLElement {
   connectedCallback() {
     this.render();
     this.loadAllWeather();
+
+    this._forecastListener = onForecastUpdate((forecast) => {
+      for (const [date, weather] of forecast) {
+        if (TRIP_CITIES[date]) {
+          this._weatherMap.set(date, weather);
+        }
+      }
+      this.render();
+    });
+  }
+
+  disconnectedCallback() {
+    if (this._forecastListener) {
+      this._forecastListener();
+    }
   }
 
   async loadAllWeather() {
@@ -721,4 +552,4 @@ export function initWeather() {
   console.log('[Weather] Module initialized');
 }
 
-export { WMO_CODES, TRIP_CITIES, getWMOInfo };
+export { WMO_CODES, TRIP_CITIES, getWMOInfo, getCityForDate };
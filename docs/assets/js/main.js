@@ -110,6 +110,26 @@ const featureInitMap = {
   integration: 'initIntegration'
 };
 
+/**
+ * Feature module imports in flight or done, by feature name
+ */
+const featureImports = new Map();
+
+/**
+ * Start importing a feature module without initializing it
+ * @param {string} featureName - Feature module name
+ * @returns {Promise<Object>}
+ */
+function importFeature(featureName) {
+  if (!featureImports.has(featureName)) {
+    const pending = import(`./features/${featureName}.js`);
+    // Errors are reported by loadFeature()
+    pending.catch(() => {});
+    featureImports.set(featureName, pending);
+  }
+  return featureImports.get(featureName);
+}
+
 /**
  * Feature loader - dynamically imports features as needed
  * @param {string} featureName - Feature module name
@@ -122,7 +142,7 @@ async function loadFeature(featureName) {
 
   try {
     log(`Loading feature: ${featureName}`);
-    const module = await import(`./features/${featureName}.js`);
+    const module = await importFeature(featureName);
 
     // Try specific init function first, then generic 'init'
     const initFnName = featureInitMap[featureName] || 'init';
@@ -151,13 +171,14 @@ async function autoInitFeatures() {
   const path = window.location.pathname;
   const isViagensPage = path.includes('/viagens/');
   const isRoteiroPage = path.includes('/roteiro');
+  const features = [];
 
   // Weather feature - on viagens pages or if weather elements exist
   if (isViagensPage ||
       document.querySelector('[data-weather]') ||
       document.querySelector('weather-widget') ||
       document.querySelector('weather-overview')) {
-    await loadFeature('weather');
+    features.push('weather');
   }
 
   // Timeline feature - on roteiro pages or if timeline elements exist
@@ -166,7 +187,7 @@ async function autoInitFeatures() {
       document.querySelector('trip-timeline') ||
       document.querySelector('day-cards-accordion') ||
       document.querySelector('#viagem-timeline')) {
-    await loadFeature('timeline');
+    features.push('timeline');
   }
 
   // Gallery feature - if gallery elements exist
@@ -174,7 +195,7 @@ async function autoInitFeatures() {
       document.querySelector('.photo-gallery') ||
       document.querySelector('photo-upload') ||
       document.querySelector('photo-grid')) {
-    await loadFeature('gallery');
+    features.push('gallery');
   }
 
   // Map feature - if map elements exist
@@ -182,7 +203,7 @@ async function autoInitFeatures() {
       document.querySelector('.route-map') ||
       document.querySelector('route-map') ||
       document.querySelector('mini-map')) {
-    await loadFeature('map');
+    features.push('map');
   }
 
   // Integration feature - always load on viagens pages for polish features
@@ -192,7 +213,14 @@ async function autoInitFeatures() {
       document.querySelector('trip-progress') ||
       document.querySelector('media-carousel') ||
       document.querySelector('warning-badge')) {
-    await loadFeature('integration');
+    features.push('integration');
+  }
+
+  // Download every module up front (hooks/script_graph.py preloads the same
+  // graph), then initialize in order
+  features.forEach(importFeature);
+  for (const featureName of features) {
+    await loadFeature(featureName);
   }
 
   log('Feature auto-detection complete');
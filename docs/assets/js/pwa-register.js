@@ -85,6 +85,25 @@
         showToast('Conteúdo salvo para uso offline!', 'success');
         break;
 
+      case 'PRECACHE_COMPLETE':
+        console.log('[PWA] Precache complete:', data.updated, 'updated,', data.failed, 'failed');
+        hideCacheProgress();
+        if (data.pending) {
+          // A newer build is being installed with its own precache
+          showToast('Instalando a versão mais recente para uso offline...', 'info');
+        } else if (data.error || data.failed) {
+          showToast('Alguns itens não foram baixados. Tente novamente.', 'warning');
+        } else {
+          showToast('Conteúdo salvo para uso offline!', 'success');
+        }
+        break;
+
+      case 'TILE_PACK_COMPLETE':
+        if (data.status === 'cached') {
+          showToast('Mapas da rota salvos para uso offline!', 'success');
+        }
+        break;
+
       case 'PROCESS_SYNC_QUEUE':
         window.dispatchEvent(new CustomEvent('pwa:sync-requested'));
         break;
@@ -215,26 +234,12 @@
 
     showCacheProgress();
 
-    // URLs to cache
-    var urls = [
-      BASE_PATH + '/',
-      BASE_PATH + '/viagens/serras-gauchas-2026/',
-      BASE_PATH + '/viagens/serras-gauchas-2026/roteiro/',
-      BASE_PATH + '/viagens/serras-gauchas-2026/checklist/',
-      BASE_PATH + '/viagens/serras-gauchas-2026/mapas-offline/',
-      BASE_PATH + '/viagens/serras-gauchas-2026/guia-clima/',
-      BASE_PATH + '/viagens/serras-gauchas-2026/guia-emergencias/',
-      BASE_PATH + '/viagens/serras-gauchas-2026/guia-gastronomico/',
-      BASE_PATH + '/viagens/serras-gauchas-2026/manutencao-viagem/',
-      BASE_PATH + '/garagem/manutencao/',
-      BASE_PATH + '/garagem/ficha-tecnica/',
-      BASE_PATH + '/sobre/'
-    ];
-
-    navigator.serviceWorker.controller.postMessage({
-      type: 'CACHE_URLS',
-      payload: { urls: urls }
-    });
+    // Pages and assets come from the generated precache manifest;
+    // only entries whose content changed are downloaded
+    navigator.serviceWorker.controller.postMessage({ type: 'UPDATE_PRECACHE' });
+
+    // Map tiles for the route corridor (single file)
+    navigator.serviceWorker.controller.postMessage({ type: 'CACHE_TILE_PACK' });
 
     // Timeout fallback
     setTimeout(function() {
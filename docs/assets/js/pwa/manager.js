@@ -39,23 +39,10 @@ const listeners = {
 const BASE_PATH = '/tiger-900';
 
 /**
- * URLs to cache for full offline support
+ * Precache manifest generated at build time (hooks/precache_manifest.py).
+ * The Service Worker owns the offline URL list; this is only read for sizes.
  */
-const OFFLINE_URLS = [
-  `${BASE_PATH}/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/roteiro/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/checklist/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/mapas-offline/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/guia-clima/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/guia-emergencias/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/guia-gastronomico/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/manutencao-viagem/`,
-  `${BASE_PATH}/garagem/manutencao/`,
-  `${BASE_PATH}/garagem/ficha-tecnica/`,
-  `${BASE_PATH}/garagem/manuais/`,
-  `${BASE_PATH}/sobre/`
-];
+const PRECACHE_MANIFEST_URL = `${BASE_PATH}/precache-manifest.json`;
 
 /**
  * Register the Service Worker
@@ -121,6 +108,16 @@ function handleSWMessage(event) {
       notifyListeners('cache', { complete: true, urls: data.urls });
       break;
 
+    case 'PRECACHE_COMPLETE':
+      console.log('[PWA] Precache complete:', data);
+      notifyListeners('cache', { precache: data });
+      break;
+
+    case 'TILE_PACK_COMPLETE':
+      console.log('[PWA] Tile pack:', data.status);
+      notifyListeners('cache', { tilePack: data.status });
+      break;
+
     case 'PROCESS_SYNC_QUEUE':
       console.log('[PWA] Background sync triggered');
       // Dispatch event for sync module to handle
@@ -196,6 +193,30 @@ export async function getCacheStatus() {
   });
 }
 
+/**
+ * Ask the browser not to evict this origin's storage under pressure.
+ * Only pages can call persist(); the Service Worker reports the result in
+ * its cache status.
+ * @returns {Promise<boolean>} - Whether storage is persistent
+ */
+export async function requestPersistentStorage() {
+  if (!navigator.storage?.persist) {
+    return false;
+  }
+
+  try {
+    if (await navigator.storage.persisted()) {
+      return true;
+    }
+    const granted = await navigator.storage.persist();
+    console.log('[PWA] Persistent storage', granted ? 'granted' : 'denied');
+    return granted;
+  } catch (error) {
+    console.warn('[PWA] Persistent storage request failed:', error);
+    return false;
+  }
+}
+
 /**
  * Request caching of specific URLs
  * @param {string[]} urls - URLs to cache
@@ -214,6 +235,47 @@ export function requestCache(urls) {
   return Promise.resolve();
 }
 
+/**
+ * Ask the Service Worker to sync the precache with the current manifest
+ * @returns {Promise<void>}
+ */
+export function requestPrecacheUpdate() {
+  if (!navigator.serviceWorker?.controller) {
+    return Promise.reject(new Error('No active Service Worker'));
+  }
+
+  navigator.serviceWorker.controller.postMessage({ type: 'UPDATE_PRECACHE' });
+
+  return Promise.resolve();
+}
+
+/**
+ * Get the precache manifest (asset URLs, hashes and sizes)
+ * @returns {Promise<Object|null>}
+ */
+export async function getPrecacheManifest() {
+  try {
+    const response = await fetch(PRECACHE_MANIFEST_URL, { cache: 'no-cache' });
+    return response.ok ? response.json() : null;
+  } catch (error) {
+    return null;
+  }
+}
+
+/**
+ * Request download of the offline map tile pack
+ * @returns {Promise<void>}
+ */
+export function requestTilePack() {
+  if (!navigator.serviceWorker?.controller) {
+    return Promise.reject(new Error('No active Service Worker'));
+  }
+
+  navigator.serviceWorker.controller.postMessage({ type: 'CACHE_TILE_PACK' });
+
+  return Promise.resolve();
+}
+
 /**
  * Download all content for offline use
  * @param {Function} onProgress - Progress callback
@@ -224,13 +286,14 @@ export async function downloadForOffline(onProgress) {
     throw new Error('Cannot download while offline');
   }
 
-  const totalUrls = OFFLINE_URLS.length;
-  let cached = 0;
+  const manifest = await getPrecacheManifest();
+  const totalUrls = manifest ? Object.keys(manifest.assets).length : 0;
 
-  onProgress?.({ phase: 'starting', total: totalUrls, cached: 0 });
+  onProgress?.({ phase: 'starting', total: totalUrls, cached: 0, bytes: manifest?.totalBytes });
 
-  // Request SW to cache URLs
-  await requestCache(OFFLINE_URLS);
+  // Request SW to sync the precache (changed entries only) and the map tile pack
+  await requestPrecacheUpdate();
+  await requestTilePack();
 
   // Also cache current page's assets
   const pageAssets = Array.from(document.querySelectorAll('link[rel="stylesheet"], script[src], img[src]'))
@@ -244,9 +307,15 @@ export async function downloadForOffline(onProgress) {
   // Wait for cache complete message
   return new Promise((resolve) => {
     const unsubscribe = onCacheUpdate((data) => {
-      if (data.complete) {
+      if (data.precache) {
         unsubscribe();
-        onProgress?.({ phase: 'complete', total: totalUrls, cached: totalUrls });
+        const { total = totalUrls, failed = 0 } = data.precache;
+        onProgress?.({
+          phase: data.precache.error ? 'error' : 'complete',
+          total,
+          cached: total - failed,
+          updated: data.precache.updated
+        });
         resolve();
       }
     });
@@ -393,6 +462,9 @@ export async function initPWA() {
     console.log('[PWA] App installed');
   });
 
+  // Keep offline data (caches, photos) out of automatic eviction
+  requestPersistentStorage();
+
   // Get initial version
   state.installedVersion = await getSWVersion();
 
@@ -424,6 +496,9 @@ export async function createStorageStatus() {
   }
 
   const cacheCount = Object.values(status.caches || {}).reduce((sum, c) => sum + c.count, 0);
+  const strategies = Object.values(status.telemetry?.strategies || {});
+  const requests = strategies.reduce((sum, s) => sum + s.requests, 0);
+  const hits = strategies.reduce((sum, s) => sum + s.hits, 0);
 
   container.innerHTML = `
     <div class="storage-info">
@@ -435,6 +510,18 @@ export async function createStorageStatus() {
         <span class="label">Itens em cache:</span>
         <span class="value">${cacheCount}</span>
       </div>
+      ${status.budget ? `
+        <div class="storage-item">
+          <span class="label">Cache dinâmico:</span>
+          <span class="value">${formatBytes(status.budget.used)} / ${formatBytes(status.budget.bytes)}</span>
+        </div>
+      ` : ''}
+      ${requests ? `
+        <div class="storage-item">
+          <span class="label">Acertos de cache:</span>
+          <span class="value">${Math.round((hits / requests) * 100)}% (${status.telemetry.evictions.count} removidos)</span>
+        </div>
+      ` : ''}
       ${status.storage ? `
         <div class="storage-item">
           <span class="label">Armazenamento:</span>
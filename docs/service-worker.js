@@ -4,6 +4,7 @@
  * Implements Workbox-like patterns for robust offline support:
  * - Precaching of critical assets
  * - Runtime caching with multiple strategies
+ * - Byte-budgeted runtime caches with LRU eviction and telemetry
  * - Background sync support
  * - Update notifications
  *
@@ -13,92 +14,95 @@
 const SW_VERSION = '2.0.0';
 const BASE_PATH = '/tiger-900';
 
-// Cache names with versioning
+// Injected by hooks/precache_manifest.py at build time; changes whenever any
+// precached file changes, which makes the browser install the new worker
+const PRECACHE_REVISION = 'dev';
+const PRECACHE_MANIFEST_URL = `${BASE_PATH}/precache-manifest.json`;
+
+// Each precache revision gets its own cache: a new worker fills it during
+// install (copying unchanged entries forward, see syncPrecache) and activate
+// drops the previous one, so the cache clients read is never changed under
+// them. The other cache names are stable across releases.
 const CACHES = {
-  precache: `tiger900-precache-v${SW_VERSION}`,
-  runtime: `tiger900-runtime-v${SW_VERSION}`,
-  images: `tiger900-images-v${SW_VERSION}`,
-  api: `tiger900-api-v${SW_VERSION}`
+  precache: `tiger900-precache-${PRECACHE_REVISION}`,
+  runtime: 'tiger900-runtime',
+  images: 'tiger900-images',
+  api: 'tiger900-api',
+  // Versioned by pack format, not SW_VERSION, so releases don't drop the download
+  tiles: 'tiger900-tiles-v1'
+};
+
+// Parallel downloads while syncing the precache
+const PRECACHE_CONCURRENCY = 4;
+
+// Offline tile pack built by hooks/tile_pack.py (one file, served by range reads)
+const TILE_PACK = {
+  url: `${BASE_PATH}/assets/data/tiles/corridor.pack`,
+  // Virtual tile path used by the map when the build ships a pack
+  pattern: /\/tiles\/(\d+)\/(\d+)\/(\d+)\.png$/,
+  // Tiles outside the pack are fetched live (not cached) when online
+  fallbackUrl: 'https://tile.openstreetmap.org/{z}/{x}/{y}.png'
 };
 
-// Assets to precache on install (critical for offline)
-const PRECACHE_ASSETS = [
-  // Core pages
-  `${BASE_PATH}/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/roteiro/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/checklist/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/mapas-offline/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/guia-clima/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/guia-emergencias/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/guia-gastronomico/`,
-  `${BASE_PATH}/viagens/serras-gauchas-2026/manutencao-viagem/`,
-  `${BASE_PATH}/garagem/manutencao/`,
-  `${BASE_PATH}/garagem/ficha-tecnica/`,
-  `${BASE_PATH}/sobre/`,
-
-  // Core assets
-  `${BASE_PATH}/assets/css/roteiro-interativo.css`,
-  `${BASE_PATH}/assets/css/core.css`,
-  `${BASE_PATH}/assets/js/roteiro-interativo.js`,
-  `${BASE_PATH}/assets/js/previsao-tempo.js`,
-  `${BASE_PATH}/assets/js/pwa-register.js`,
-  `${BASE_PATH}/assets/js/loader.js`,
-  `${BASE_PATH}/assets/js/main.js`,
-  `${BASE_PATH}/assets/js/core/store.js`,
-  `${BASE_PATH}/assets/js/core/utils.js`,
-  `${BASE_PATH}/assets/js/core/sync.js`,
-
-  // PWA assets
-  `${BASE_PATH}/manifest.json`,
-  `${BASE_PATH}/assets/icons/icon-192x192.png`,
-  `${BASE_PATH}/assets/icons/icon-512x512.png`
-];
-
-// Cache duration settings (in milliseconds)
+// Runtime entries not used for this long are dropped (in milliseconds)
 const CACHE_DURATIONS = {
-  api: 3 * 60 * 60 * 1000,      // 3 hours for API responses
-  images: 30 * 24 * 60 * 60 * 1000, // 30 days for images
-  runtime: 7 * 24 * 60 * 60 * 1000  // 7 days for runtime cache
+  [CACHES.api]: 3 * 60 * 60 * 1000,      // 3 hours for API responses
+  [CACHES.images]: 30 * 24 * 60 * 60 * 1000, // 30 days for images
+  [CACHES.runtime]: 7 * 24 * 60 * 60 * 1000  // 7 days for runtime cache
+};
+
+// Byte budget for the runtime caches, evicted least-recently-used first.
+// The precache and the tile pack are the offline baseline and never evicted.
+const CACHE_BUDGET = {
+  managed: [CACHES.runtime, CACHES.images, CACHES.api],
+  quotaShare: 0.25,              // share of the origin quota
+  min: 20 * 1024 * 1024,
+  max: 200 * 1024 * 1024,
+  fallback: 50 * 1024 * 1024,    // when storage.estimate() is unavailable
+  // Keep total origin usage under this share of the quota (photos in
+  // IndexedDB compete for the same quota)
+  pressure: 0.9,
+  // Largest share of the budget a single cache may take, so a few large
+  // photos cannot push out the pages
+  cacheShare: {
+    [CACHES.runtime]: 0.6,
+    [CACHES.images]: 0.6,
+    [CACHES.api]: 0.1
+  },
+  estimateTTL: 60 * 1000
 };
 
-// Maximum cache sizes
-const MAX_CACHE_ITEMS = {
-  images: 100,
-  api: 50,
-  runtime: 100
+// IndexedDB database holding the cache metadata index and telemetry
+const CACHE_INDEX_DB = {
+  name: 'tiger900-sw',
+  version: 1,
+  entries: 'entries',
+  stats: 'stats'
 };
 
+const STRATEGIES = ['precache', 'cacheFirst', 'networkFirst', 'staleWhileRevalidate'];
+const LATENCY_SAMPLES = 100;
+const INDEX_FLUSH_DELAY = 1000;
+
 /* ============================================
    INSTALL EVENT
    ============================================ */
 
 self.addEventListener('install', (event) => {
-  console.log('[SW] Installing version', SW_VERSION);
+  console.log('[SW] Installing version', SW_VERSION, 'precache', PRECACHE_REVISION);
 
   event.waitUntil(
     (async () => {
-      const cache = await caches.open(CACHES.precache);
-
-      // Cache assets one by one to handle failures gracefully
-      const results = await Promise.allSettled(
-        PRECACHE_ASSETS.map(async (url) => {
-          try {
-            const response = await fetch(url);
-            if (response.ok) {
-              await cache.put(url, response);
-              return { url, status: 'cached' };
-            }
-            return { url, status: 'failed', reason: response.status };
-          } catch (error) {
-            return { url, status: 'failed', reason: error.message };
-          }
-        })
-      );
-
-      const cached = results.filter(r => r.value?.status === 'cached').length;
-      const failed = results.filter(r => r.value?.status === 'failed').length;
-      console.log(`[SW] Precached ${cached} assets, ${failed} failed`);
+      try {
+        const result = await syncPrecache();
+        console.log(`[SW] Precache: ${result.updated} updated, ${result.unchanged} unchanged, ` +
+                    `${result.removed} removed, ${result.failed} failed`);
+      } catch (error) {
+        // Fail the install: activating would drop the previous precache,
+        // so the current worker keeps serving it until the next update
+        console.warn('[SW] Precache sync failed:', error.message);
+        throw error;
+      }
 
       // Skip waiting to activate immediately
       await self.skipWaiting();
@@ -106,6 +110,142 @@ self.addEventListener('install', (event) => {
   );
 });
 
+/* ============================================
+   PRECACHE (manifest-driven delta updates)
+   ============================================ */
+
+/**
+ * Read the manifest stored by the last successful sync
+ * @returns {Promise<Object>}
+ */
+async function getStoredManifest(cache) {
+  const stored = await cache.match(PRECACHE_MANIFEST_URL);
+  if (!stored) {
+    return { revision: null, assets: {} };
+  }
+  try {
+    return await stored.json();
+  } catch (error) {
+    return { revision: null, assets: {} };
+  }
+}
+
+/**
+ * Precache caches with the manifest each one stored, this worker's first
+ * (older revisions, and the unversioned cache of earlier workers, follow)
+ * @returns {Promise<Array<{cache: Cache, manifest: Object}>>}
+ */
+async function openPrecaches() {
+  const names = (await caches.keys())
+    .filter(name => name.startsWith('tiger900-precache') && name !== CACHES.precache);
+
+  return Promise.all([CACHES.precache, ...names].map(async (name) => {
+    const cache = await caches.open(name);
+    return { cache, manifest: await getStoredManifest(cache) };
+  }));
+}
+
+/**
+ * Fill this worker's precache (one cache per manifest revision) from the
+ * current manifest. Entries whose content hash is unchanged are copied from
+ * an older revision's cache; only new or changed entries are downloaded.
+ * Older caches are only read here and deleted on activate.
+ *
+ * When the active worker is asked to sync (UPDATE_PRECACHE) and the server
+ * already has a newer revision, the browser is told to install that
+ * worker instead, so the cache in use is never rewritten.
+ * @returns {Promise<{total: number, updated: number, unchanged: number, removed: number, failed: number}>}
+ */
+async function syncPrecache({ live = false } = {}) {
+  const response = await fetch(PRECACHE_MANIFEST_URL, { cache: 'no-cache' });
+  if (!response.ok) {
+    throw new Error(`Manifest HTTP ${response.status}`);
+  }
+  const manifest = await response.json();
+
+  if (live && manifest.revision !== PRECACHE_REVISION) {
+    await self.registration.update();
+    return { total: 0, updated: 0, unchanged: 0, removed: 0, failed: 0, pending: manifest.revision };
+  }
+
+  const [current, ...older] = await openPrecaches();
+  const { cache } = current;
+  const urls = Object.keys(manifest.assets);
+  const removed = new Set(
+    [current, ...older].flatMap(source => Object.keys(source.manifest.assets))
+      .filter(url => !manifest.assets[url])
+  );
+
+  // Record what is actually in the cache: a failed download keeps an older
+  // copy (and its hash) when there is one, or is left out, so the next sync
+  // retries it
+  const stored = { ...manifest, assets: {} };
+  let updated = 0;
+  let failed = 0;
+
+  const copyForward = async (url, matchesHash) => {
+    for (const source of [current, ...older]) {
+      const entry = source.manifest.assets[url];
+      if (!entry || (matchesHash && entry.hash !== manifest.assets[url].hash)) {
+        continue;
+      }
+      const cached = await source.cache.match(url);
+      if (cached) {
+        if (source !== current) {
+          await cache.put(url, cached);
+        }
+        stored.assets[url] = entry;
+        return true;
+      }
+    }
+    return false;
+  };
+
+  const queue = [...urls];
+  const worker = async () => {
+    while (queue.length) {
+      const url = queue.shift();
+      if (await copyForward(url, true)) {
+        continue;
+      }
+      try {
+        const assetResponse = await fetch(url, { cache: 'reload' });
+        if (!assetResponse.ok) {
+          throw new Error(`HTTP ${assetResponse.status}`);
+        }
+        await cache.put(url, assetResponse);
+        stored.assets[url] = manifest.assets[url];
+        updated++;
+      } catch (error) {
+        failed++;
+        await copyForward(url, false);
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: PRECACHE_CONCURRENCY }, worker));
+
+  // Only this worker's cache; older revisions go away on activate
+  await Promise.all(Object.keys(current.manifest.assets)
+    .filter(url => !manifest.assets[url])
+    .map(url => cache.delete(url)));
+
+  await cache.put(PRECACHE_MANIFEST_URL, new Response(JSON.stringify(stored), {
+    headers: { 'Content-Type': 'application/json' }
+  }));
+  // The manifest says whether the build has a tile pack
+  tilePackIndex = null;
+  const tilePack = await refreshTilePack(stored);
+
+  return {
+    total: urls.length,
+    updated,
+    unchanged: urls.length - updated - failed,
+    removed: removed.size,
+    failed,
+    ...(tilePack && { tilePack })
+  };
+}
+
 /* ============================================
    ACTIVATE EVENT
    ============================================ */
@@ -128,6 +268,16 @@ self.addEventListener('activate', (event) => {
           })
       );
 
+      // Only the tile pack listed in the current manifest is kept
+      await dropStaleTilePacks().catch((error) => {
+        console.warn('[SW] Tile pack cleanup failed:', error.message);
+      });
+
+      // Index runtime entries cached before (or outside) the metadata index
+      await reconcileCacheIndex().catch((error) => {
+        console.warn('[SW] Cache index reconcile failed:', error.message);
+      });
+
       // Take control of all clients immediately
       await self.clients.claim();
 
@@ -157,16 +307,16 @@ self.addEventListener('fetch', (event) => {
   }
 
   // Route to appropriate strategy
-  if (isApiRequest(url)) {
-    event.respondWith(staleWhileRevalidate(request, CACHES.api));
+  if (isTileRequest(url)) {
+    event.respondWith(serveTile(url));
+  } else if (url.pathname === PRECACHE_MANIFEST_URL) {
+    event.respondWith(networkFirst(event, CACHES.runtime));
+  } else if (isApiRequest(url)) {
+    event.respondWith(staleWhileRevalidate(event, CACHES.api));
   } else if (isImageRequest(url)) {
-    event.respondWith(cacheFirst(request, CACHES.images));
-  } else if (isPrecachedAsset(url)) {
-    event.respondWith(cacheFirst(request, CACHES.precache));
-  } else if (isPageRequest(request)) {
-    event.respondWith(networkFirst(request, CACHES.runtime));
+    event.respondWith(precacheFirst(event, () => cacheFirst(event, CACHES.images)));
   } else {
-    event.respondWith(networkFirst(request, CACHES.runtime));
+    event.respondWith(precacheFirst(event, () => networkFirst(event, CACHES.runtime)));
   }
 });
 
@@ -180,46 +330,72 @@ function isApiRequest(url) {
          url.pathname.includes('/api/');
 }
 
-function isImageRequest(url) {
-  return /\.(jpg|jpeg|png|gif|webp|svg|ico)$/i.test(url.pathname);
+function isTileRequest(url) {
+  return TILE_PACK.pattern.test(url.pathname);
 }
 
-function isPrecachedAsset(url) {
-  const path = url.pathname;
-  return PRECACHE_ASSETS.some(asset => path === asset || path === asset.replace(BASE_PATH, ''));
+function isImageRequest(url) {
+  return /\.(jpg|jpeg|png|gif|webp|svg|ico)$/i.test(url.pathname);
 }
 
-function isPageRequest(request) {
-  return request.mode === 'navigate' ||
-         request.headers.get('accept')?.includes('text/html');
-}
 
 /* ============================================
    CACHING STRATEGIES
    ============================================ */
 
+// Strategies take the fetch event: cache writes, index updates and
+// telemetry finish after the response is returned, so they are passed to
+// event.waitUntil() to keep the worker alive until they are done.
+
+/**
+ * Extend the event's lifetime until the promise settles
+ */
+function keepAlive(event, promise) {
+  event?.waitUntil(promise);
+  return promise;
+}
+
+/**
+ * Precache First - Serve precached entries directly (they are kept fresh by
+ * the manifest hashes), otherwise defer to the given strategy
+ */
+async function precacheFirst(event, otherwise) {
+  const timer = startTimer('precache', event);
+  const precache = await caches.open(CACHES.precache);
+  const cachedResponse = await precache.match(event.request);
+  if (cachedResponse) {
+    return timer.hit(cachedResponse);
+  }
+
+  timer.miss();
+  return otherwise();
+}
+
 /**
  * Cache First - Return cached version, fallback to network
  * Best for: Static assets that rarely change
  */
-async function cacheFirst(request, cacheName) {
+async function cacheFirst(event, cacheName) {
+  const { request } = event;
+  const timer = startTimer('cacheFirst', event);
   const cache = await caches.open(cacheName);
   const cachedResponse = await cache.match(request);
 
   if (cachedResponse) {
+    keepAlive(event, touchEntry(cacheName, request.url));
     // Update cache in background
-    updateCache(request, cacheName);
-    return cachedResponse;
+    keepAlive(event, updateCache(request, cacheName, 'cacheFirst'));
+    return timer.hit(cachedResponse);
   }
 
   try {
     const response = await fetch(request);
     if (response.ok) {
-      cache.put(request, response.clone());
+      keepAlive(event, storeResponse(cacheName, request, response.clone(), 'cacheFirst'));
     }
-    return response;
+    return timer.miss(response);
   } catch (error) {
-    return offlineFallback(request);
+    return timer.miss(await offlineFallback(request));
   }
 }
 
@@ -227,21 +403,24 @@ async function cacheFirst(request, cacheName) {
  * Network First - Try network, fallback to cache
  * Best for: Pages and dynamic content
  */
-async function networkFirst(request, cacheName) {
+async function networkFirst(event, cacheName) {
+  const { request } = event;
+  const timer = startTimer('networkFirst', event);
   const cache = await caches.open(cacheName);
 
   try {
     const response = await fetch(request);
     if (response.ok) {
-      cache.put(request, response.clone());
+      keepAlive(event, storeResponse(cacheName, request, response.clone(), 'networkFirst'));
     }
-    return response;
+    return timer.miss(response);
   } catch (error) {
     const cachedResponse = await cache.match(request);
     if (cachedResponse) {
-      return cachedResponse;
+      keepAlive(event, touchEntry(cacheName, request.url));
+      return timer.hit(cachedResponse);
     }
-    return offlineFallback(request);
+    return timer.miss(await offlineFallback(request));
   }
 }
 
@@ -249,49 +428,742 @@ async function networkFirst(request, cacheName) {
  * Stale While Revalidate - Return cached immediately, update in background
  * Best for: API responses where freshness matters but stale is acceptable
  */
-async function staleWhileRevalidate(request, cacheName) {
+async function staleWhileRevalidate(event, cacheName) {
+  const { request } = event;
+  const timer = startTimer('staleWhileRevalidate', event);
   const cache = await caches.open(cacheName);
   const cachedResponse = await cache.match(request);
 
   // Fetch in background
+  let stored = Promise.resolve();
   const fetchPromise = fetch(request)
     .then(response => {
       if (response.ok) {
-        cache.put(request, response.clone());
+        stored = storeResponse(cacheName, request, response.clone(), 'staleWhileRevalidate');
       }
       return response;
     })
     .catch(() => null);
+  keepAlive(event, fetchPromise.then(() => stored));
 
   // Return cached immediately if available
   if (cachedResponse) {
-    return cachedResponse;
+    keepAlive(event, touchEntry(cacheName, request.url));
+    return timer.hit(cachedResponse);
   }
 
   // Wait for network if no cache
   const networkResponse = await fetchPromise;
   if (networkResponse) {
-    return networkResponse;
+    return timer.miss(networkResponse);
   }
 
-  return offlineFallback(request);
+  return timer.miss(await offlineFallback(request));
 }
 
 /**
  * Update cache in background without blocking
  */
-async function updateCache(request, cacheName) {
+async function updateCache(request, cacheName, strategy) {
   try {
     const response = await fetch(request);
     if (response.ok) {
-      const cache = await caches.open(cacheName);
-      await cache.put(request, response);
+      await storeResponse(cacheName, request, response, strategy);
     }
   } catch (error) {
     // Silently fail - we already have a cached version
   }
 }
 
+/* ============================================
+   CACHE INDEX (byte budget, LRU eviction, telemetry)
+   ============================================ */
+
+// Loaded lazily: { entries: Map<key, entry>, telemetry }
+let cacheIndex = null;
+let cacheIndexDb = null;
+let pendingFlush = null;
+let budgetEstimate = null;
+let budgetRun = Promise.resolve(0);
+const dirtyEntries = new Set();
+const removedEntries = new Set();
+
+/**
+ * Key of an index entry (the same URL may live in several caches)
+ */
+function entryKey(cacheName, url) {
+  return `${cacheName} ${url}`;
+}
+
+function idbRequest(request) {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function openCacheIndexDb() {
+  if (!cacheIndexDb) {
+    cacheIndexDb = new Promise((resolve, reject) => {
+      const request = indexedDB.open(CACHE_INDEX_DB.name, CACHE_INDEX_DB.version);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        if (!db.objectStoreNames.contains(CACHE_INDEX_DB.entries)) {
+          db.createObjectStore(CACHE_INDEX_DB.entries, { keyPath: 'key' });
+        }
+        if (!db.objectStoreNames.contains(CACHE_INDEX_DB.stats)) {
+          db.createObjectStore(CACHE_INDEX_DB.stats);
+        }
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+    cacheIndexDb.catch(() => { cacheIndexDb = null; });
+  }
+  return cacheIndexDb;
+}
+
+function createTelemetry() {
+  return {
+    since: Date.now(),
+    strategies: Object.fromEntries(STRATEGIES.map(name => [name, {
+      hits: 0,
+      misses: 0,
+      totalMs: 0,
+      maxMs: 0,
+      samples: []
+    }])),
+    evictions: { count: 0, bytes: 0, expired: 0, byCache: {} }
+  };
+}
+
+/**
+ * Load the metadata index and telemetry (once per worker lifetime).
+ * Falls back to an in-memory index when IndexedDB is unavailable.
+ * @returns {Promise<{entries: Map<string, Object>, telemetry: Object}>}
+ */
+function loadCacheIndex() {
+  if (!cacheIndex) {
+    cacheIndex = (async () => {
+      const index = { entries: new Map(), telemetry: createTelemetry() };
+      try {
+        const db = await openCacheIndexDb();
+        const tx = db.transaction([CACHE_INDEX_DB.entries, CACHE_INDEX_DB.stats], 'readonly');
+        const [entries, telemetry] = await Promise.all([
+          idbRequest(tx.objectStore(CACHE_INDEX_DB.entries).getAll()),
+          idbRequest(tx.objectStore(CACHE_INDEX_DB.stats).get('telemetry'))
+        ]);
+        entries.forEach(entry => index.entries.set(entry.key, entry));
+        if (telemetry) {
+          index.telemetry = telemetry;
+        }
+      } catch (error) {
+        console.warn('[SW] Cache index unavailable:', error.message);
+      }
+      return index;
+    })();
+  }
+  return cacheIndex;
+}
+
+/**
+ * Write changed index entries and telemetry in one transaction, debounced
+ * @returns {Promise<void>} Settles once the write is done
+ */
+function scheduleIndexFlush() {
+  if (!pendingFlush) {
+    pendingFlush = new Promise(resolve => setTimeout(resolve, INDEX_FLUSH_DELAY))
+      .then(() => {
+        pendingFlush = null;
+        return flushCacheIndex();
+      })
+      .catch((error) => {
+        console.warn('[SW] Cache index flush failed:', error.message);
+      });
+  }
+  return pendingFlush;
+}
+
+async function flushCacheIndex() {
+  const { entries, telemetry } = await loadCacheIndex();
+  const db = await openCacheIndexDb();
+  const tx = db.transaction([CACHE_INDEX_DB.entries, CACHE_INDEX_DB.stats], 'readwrite');
+  const store = tx.objectStore(CACHE_INDEX_DB.entries);
+
+  for (const key of dirtyEntries) {
+    const entry = entries.get(key);
+    if (entry) {
+      store.put(entry);
+    }
+  }
+  for (const key of removedEntries) {
+    store.delete(key);
+  }
+  dirtyEntries.clear();
+  removedEntries.clear();
+  tx.objectStore(CACHE_INDEX_DB.stats).put(telemetry, 'telemetry');
+
+  await new Promise((resolve, reject) => {
+    tx.oncomplete = resolve;
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
+
+/**
+ * Start timing a strategy; hit()/miss() record the outcome and pass the
+ * response through
+ */
+function startTimer(strategy, event) {
+  const start = performance.now();
+  const finish = (hit) => (response) => {
+    keepAlive(event, recordStrategy(strategy, hit, performance.now() - start));
+    return response;
+  };
+  return { hit: finish(true), miss: finish(false) };
+}
+
+function recordStrategy(strategy, hit, ms) {
+  return loadCacheIndex().then(({ telemetry }) => {
+    const stats = telemetry.strategies[strategy];
+    stats[hit ? 'hits' : 'misses']++;
+    stats.totalMs += ms;
+    stats.maxMs = Math.max(stats.maxMs, ms);
+    stats.samples.push(Math.round(ms * 10) / 10);
+    if (stats.samples.length > LATENCY_SAMPLES) {
+      stats.samples.shift();
+    }
+    return scheduleIndexFlush();
+  });
+}
+
+/**
+ * Mark a cached entry as used now
+ */
+async function touchEntry(cacheName, url) {
+  if (!CACHE_BUDGET.managed.includes(cacheName)) return;
+
+  const { entries } = await loadCacheIndex();
+  const key = entryKey(cacheName, url);
+  const entry = entries.get(key);
+  if (entry) {
+    entry.lastAccess = Date.now();
+    dirtyEntries.add(key);
+    await scheduleIndexFlush();
+  }
+}
+
+/**
+ * Put a response in a runtime cache and record its size, then bring the
+ * runtime caches back under budget
+ */
+async function storeResponse(cacheName, request, response, strategy) {
+  try {
+    const body = await response.blob();
+    const cache = await caches.open(cacheName);
+    await cache.put(request, new Response(body, {
+      status: response.status,
+      statusText: response.statusText,
+      headers: response.headers
+    }));
+
+    const { entries } = await loadCacheIndex();
+    const key = entryKey(cacheName, request.url);
+    const now = Date.now();
+    entries.set(key, {
+      key,
+      url: request.url,
+      cacheName,
+      strategy,
+      size: body.size,
+      storedAt: now,
+      lastAccess: now
+    });
+    dirtyEntries.add(key);
+    removedEntries.delete(key);
+
+    await enforceCacheBudget();
+    await scheduleIndexFlush();
+  } catch (error) {
+    console.warn('[SW] Failed to cache:', request.url, error.message);
+  }
+}
+
+/**
+ * Byte budget for the runtime caches, derived from the storage quota
+ * @returns {Promise<{bytes: number, quota: number|null, usage: number|null}>}
+ */
+async function getCacheBudget(managedBytes) {
+  if (!budgetEstimate || Date.now() - budgetEstimate.at > CACHE_BUDGET.estimateTTL) {
+    let estimate = {};
+    try {
+      estimate = await navigator.storage?.estimate?.() || {};
+    } catch (error) {
+      // Unsupported: use the fallback budget
+    }
+    budgetEstimate = { at: Date.now(), quota: estimate.quota || null, usage: estimate.usage || null };
+  }
+
+  const { quota, usage } = budgetEstimate;
+  if (!quota) {
+    return { bytes: CACHE_BUDGET.fallback, quota: null, usage: null };
+  }
+
+  let bytes = Math.min(Math.max(quota * CACHE_BUDGET.quotaShare, CACHE_BUDGET.min), CACHE_BUDGET.max);
+
+  // Near the quota, give back what the rest of the origin needs
+  const headroom = quota * CACHE_BUDGET.pressure - (usage || 0);
+  if (headroom < 0) {
+    bytes = Math.min(bytes, Math.max(0, managedBytes + headroom));
+  }
+
+  return { bytes: Math.floor(bytes), quota, usage };
+}
+
+/**
+ * Drop expired entries, then evict least-recently-used entries until every
+ * cache is under its share and the runtime caches are under the budget.
+ * Runs are serialized so concurrent stores don't evict the same entry twice.
+ * @returns {Promise<number>} Entries evicted
+ */
+function enforceCacheBudget() {
+  budgetRun = budgetRun.catch(() => 0).then(evictOverBudget);
+  return budgetRun;
+}
+
+async function evictOverBudget() {
+  const { entries, telemetry } = await loadCacheIndex();
+  const now = Date.now();
+  const lru = [...entries.values()].sort((a, b) => a.lastAccess - b.lastAccess);
+  const bytesByCache = {};
+  let total = 0;
+
+  for (const entry of lru) {
+    bytesByCache[entry.cacheName] = (bytesByCache[entry.cacheName] || 0) + entry.size;
+    total += entry.size;
+  }
+
+  const budget = await getCacheBudget(total);
+  const victims = [];
+
+  for (const entry of lru) {
+    const maxShare = CACHE_BUDGET.cacheShare[entry.cacheName] ?? 1;
+    const expired = now - entry.lastAccess > (CACHE_DURATIONS[entry.cacheName] ?? Infinity);
+    const overCache = bytesByCache[entry.cacheName] > budget.bytes * maxShare;
+
+    if (expired || overCache || total > budget.bytes) {
+      victims.push({ entry, expired });
+      bytesByCache[entry.cacheName] -= entry.size;
+      total -= entry.size;
+    }
+  }
+
+  if (!victims.length) {
+    scheduleIndexFlush();
+    return 0;
+  }
+
+  await Promise.all(victims.map(async ({ entry, expired }) => {
+    const cache = await caches.open(entry.cacheName);
+    await cache.delete(entry.url);
+
+    entries.delete(entry.key);
+    dirtyEntries.delete(entry.key);
+    removedEntries.add(entry.key);
+
+    const evictions = telemetry.evictions;
+    evictions.count++;
+    evictions.bytes += entry.size;
+    if (expired) {
+      evictions.expired++;
+    }
+    evictions.byCache[entry.cacheName] = (evictions.byCache[entry.cacheName] || 0) + 1;
+  }));
+
+  scheduleIndexFlush();
+  return victims.length;
+}
+
+/**
+ * Bring the index in line with the runtime caches: index entries cached
+ * without metadata and forget entries that are no longer cached
+ */
+async function reconcileCacheIndex() {
+  const { entries } = await loadCacheIndex();
+  const seen = new Set();
+  const now = Date.now();
+
+  for (const cacheName of CACHE_BUDGET.managed) {
+    const cache = await caches.open(cacheName);
+    for (const request of await cache.keys()) {
+      const key = entryKey(cacheName, request.url);
+      seen.add(key);
+      if (entries.has(key)) continue;
+
+      const response = await cache.match(request);
+      const size = response ? (await response.blob()).size : 0;
+      entries.set(key, {
+        key,
+        url: request.url,
+        cacheName,
+        strategy: null,
+        size,
+        storedAt: now,
+        lastAccess: now
+      });
+      dirtyEntries.add(key);
+    }
+  }
+
+  for (const key of entries.keys()) {
+    if (!seen.has(key)) {
+      entries.delete(key);
+      dirtyEntries.delete(key);
+      removedEntries.add(key);
+    }
+  }
+
+  await enforceCacheBudget();
+}
+
+/**
+ * Summarise the index and telemetry for GET_CACHE_STATUS
+ */
+async function getCacheTelemetry() {
+  const { entries, telemetry } = await loadCacheIndex();
+  const bytesByCache = {};
+  let used = 0;
+
+  for (const entry of entries.values()) {
+    bytesByCache[entry.cacheName] = (bytesByCache[entry.cacheName] || 0) + entry.size;
+    used += entry.size;
+  }
+
+  const budget = await getCacheBudget(used);
+  const percentile = (sorted, p) => (sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))] : 0);
+
+  const strategies = {};
+  for (const [name, stats] of Object.entries(telemetry.strategies)) {
+    const requests = stats.hits + stats.misses;
+    const sorted = [...stats.samples].sort((a, b) => a - b);
+    strategies[name] = {
+      requests,
+      hits: stats.hits,
+      misses: stats.misses,
+      hitRate: requests ? Math.round((stats.hits / requests) * 100) : 0,
+      avgMs: requests ? Math.round((stats.totalMs / requests) * 10) / 10 : 0,
+      p50Ms: percentile(sorted, 0.5),
+      p95Ms: percentile(sorted, 0.95),
+      maxMs: Math.round(stats.maxMs * 10) / 10
+    };
+  }
+
+  return {
+    budget: {
+      bytes: budget.bytes,
+      used,
+      entries: entries.size,
+      bytesByCache
+    },
+    telemetry: {
+      since: telemetry.since,
+      strategies,
+      evictions: telemetry.evictions
+    }
+  };
+}
+
+/* ============================================
+   OFFLINE TILE PACK
+   ============================================ */
+
+const TILE_PACK_HEADER_SIZE = 16;
+const TILE_PACK_ENTRY_SIZE = 20;
+
+// Parsed pack index (Promise), reset when the pack is re-downloaded
+let tilePackIndex = null;
+
+/**
+ * Cache key for the tile pack listed in a precache manifest. The pack hash is
+ * part of the key, so a pack from another build is never mistaken for this
+ * one and can be replaced without touching the pack in use.
+ * @returns {string|null} null when the build ships no pack
+ */
+function tilePackKey(manifest) {
+  return manifest.tilePack ? `${TILE_PACK.url}?hash=${manifest.tilePack.hash}` : null;
+}
+
+/**
+ * Cache key for the tile pack of the stored precache manifest
+ * @returns {Promise<string|null>}
+ */
+async function getTilePackKey() {
+  return tilePackKey(await getStoredManifest(await caches.open(CACHES.precache)));
+}
+
+/**
+ * Whether this build ships a tile pack (listed in the precache manifest by
+ * hooks/precache_manifest.py). Builds without a pack never probe for it, and
+ * the map keeps using the live tile server.
+ * @returns {Promise<boolean>}
+ */
+async function isTilePackAvailable() {
+  return Boolean(await getTilePackKey());
+}
+
+/**
+ * Downloaded tile packs (any hash) in the tiles cache
+ * @returns {Promise<Request[]>}
+ */
+async function getCachedTilePacks(tiles) {
+  const requests = await tiles.keys();
+  return requests.filter(request => new URL(request.url).pathname === TILE_PACK.url);
+}
+
+/**
+ * Read a byte range [start, end) of the tile pack.
+ * Uses the single cached pack file when downloaded, HTTP Range otherwise.
+ */
+async function readTilePackRange(source, start, end) {
+  if (!source.blob && !source.download) {
+    const response = await fetch(TILE_PACK.url, {
+      headers: { Range: `bytes=${start}-${end - 1}` }
+    });
+    if (response.status === 206) {
+      return response.arrayBuffer();
+    }
+    if (!response.ok) {
+      throw new Error(`Tile pack HTTP ${response.status}`);
+    }
+
+    // Server ignored the Range header and sent the whole pack: keep it and
+    // read every later range from the cached copy instead of downloading
+    // the pack again per tile
+    if (!source.download) {
+      source.download = storeTilePack(response, source.key).then((blob) => {
+        source.blob = blob;
+        return blob;
+      });
+    }
+  }
+
+  const blob = source.blob || await source.download;
+  return blob.slice(start, end).arrayBuffer();
+}
+
+/**
+ * Store a full tile pack response in the tiles cache under its key
+ * @returns {Promise<Blob>}
+ */
+async function storeTilePack(response, key) {
+  const blob = await response.blob();
+  const cache = await caches.open(CACHES.tiles);
+  await cache.put(key, new Response(blob, {
+    headers: { 'Content-Type': 'application/octet-stream' }
+  }));
+  return blob;
+}
+
+/**
+ * Load the pack header, metadata and tile index
+ * @returns {Promise<Object|null>}
+ */
+function loadTilePackIndex() {
+  if (!tilePackIndex) {
+    tilePackIndex = (async () => {
+      const key = await getTilePackKey();
+      if (!key) {
+        return null;
+      }
+
+      const cache = await caches.open(CACHES.tiles);
+      const cached = await cache.match(key);
+      const source = cached ? { key, blob: await cached.blob() } : { key };
+
+      const header = new DataView(await readTilePackRange(source, 0, TILE_PACK_HEADER_SIZE));
+      const magic = String.fromCharCode(...new Uint8Array(header.buffer, 0, 4));
+      if (magic !== 'T9TP') {
+        throw new Error('Invalid tile pack');
+      }
+
+      const count = header.getUint32(8, true);
+      const metadataLength = header.getUint32(12, true);
+      const indexStart = TILE_PACK_HEADER_SIZE + metadataLength;
+      const dataStart = indexStart + count * TILE_PACK_ENTRY_SIZE;
+
+      const body = await readTilePackRange(source, TILE_PACK_HEADER_SIZE, dataStart);
+      const metadata = JSON.parse(new TextDecoder().decode(new Uint8Array(body, 0, metadataLength)));
+      if (metadata.missing) {
+        // Partial pack (hooks/tile_pack.py could not fetch every tile);
+        // those tiles fall back to the live tile server
+        console.warn(`[SW] Tile pack is missing ${metadata.missing} tiles`);
+      }
+
+      return {
+        source,
+        metadata,
+        count,
+        dataStart,
+        entries: new DataView(body, metadataLength)
+      };
+    })().catch((error) => {
+      console.warn('[SW] Tile pack unavailable:', error.message);
+      // Don't re-probe the pack on every tile request; retry in a few minutes
+      setTimeout(() => { tilePackIndex = null; }, 5 * 60 * 1000);
+      return null;
+    });
+  }
+  return tilePackIndex;
+}
+
+/**
+ * Binary search the (z, x, y)-sorted index
+ * @returns {{offset: number, length: number}|null}
+ */
+function findTile(pack, z, x, y) {
+  let low = 0;
+  let high = pack.count - 1;
+
+  while (low <= high) {
+    const mid = (low + high) >>> 1;
+    const base = mid * TILE_PACK_ENTRY_SIZE;
+    const cmp = (pack.entries.getUint32(base, true) - z) ||
+                (pack.entries.getUint32(base + 4, true) - x) ||
+                (pack.entries.getUint32(base + 8, true) - y);
+
+    if (cmp === 0) {
+      return {
+        offset: pack.entries.getUint32(base + 12, true),
+        length: pack.entries.getUint32(base + 16, true)
+      };
+    }
+    if (cmp < 0) {
+      low = mid + 1;
+    } else {
+      high = mid - 1;
+    }
+  }
+  return null;
+}
+
+/**
+ * Serve a map tile from the pack, falling back to the live tile server
+ */
+async function serveTile(url) {
+  const [, z, x, y] = url.pathname.match(TILE_PACK.pattern).map(Number);
+
+  try {
+    const pack = await loadTilePackIndex();
+    const entry = pack && findTile(pack, z, x, y);
+
+    if (entry) {
+      const start = pack.dataStart + entry.offset;
+      const body = await readTilePackRange(pack.source, start, start + entry.length);
+      return new Response(body, {
+        headers: {
+          'Content-Type': pack.metadata.format === 'png' ? 'image/png' : `image/${pack.metadata.format}`,
+          'Cache-Control': 'no-store'
+        }
+      });
+    }
+  } catch (error) {
+    console.warn('[SW] Tile pack read failed:', error.message);
+  }
+
+  try {
+    return await fetch(TILE_PACK.fallbackUrl.replace('{z}', z).replace('{x}', x).replace('{y}', y));
+  } catch (error) {
+    return new Response('', { status: 404, statusText: 'Tile not available offline' });
+  }
+}
+
+/**
+ * Download the whole tile pack as a single cache entry under its key
+ * @returns {Promise<string>} 'cached' or 'failed'
+ */
+async function downloadTilePack(key) {
+  try {
+    const response = await fetch(TILE_PACK.url, { cache: 'no-cache' });
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+    const cache = await caches.open(CACHES.tiles);
+    await cache.put(key, response);
+    tilePackIndex = null;
+    return 'cached';
+  } catch (error) {
+    console.warn('[SW] Failed to cache tile pack:', error.message);
+    return 'failed';
+  }
+}
+
+/**
+ * Download the tile pack of the current build on request from the page
+ * @returns {Promise<{status: string}>} status is 'cached', 'failed' or 'unavailable'
+ */
+async function cacheTilePack() {
+  let status = 'unavailable';
+
+  try {
+    const key = await getTilePackKey();
+    if (key) {
+      const cache = await caches.open(CACHES.tiles);
+      status = await cache.match(key) ? 'cached' : await downloadTilePack(key);
+    }
+  } catch (error) {
+    console.warn('[SW] Failed to cache tile pack:', error.message);
+    status = 'failed';
+  }
+
+  const clients = await self.clients.matchAll();
+  clients.forEach(client => {
+    client.postMessage({ type: 'TILE_PACK_COMPLETE', status });
+  });
+  return { status };
+}
+
+/**
+ * After a precache sync: if the user downloaded a tile pack and the manifest
+ * now lists a different one, download the new pack. It is stored under its
+ * own key next to the old one, which activate drops.
+ * @returns {Promise<string|null>} download status, or null when nothing to do
+ */
+async function refreshTilePack(manifest) {
+  const key = tilePackKey(manifest);
+  if (!key) {
+    return null;
+  }
+
+  const cache = await caches.open(CACHES.tiles);
+  const packs = await getCachedTilePacks(cache);
+  const current = new URL(key, self.location.origin).href;
+  if (!packs.length || packs.some(request => request.url === current)) {
+    return null;
+  }
+  return downloadTilePack(key);
+}
+
+/**
+ * Delete downloaded tile packs that the current manifest no longer lists.
+ * While the current pack failed to download an old one is kept, so the next
+ * precache sync still knows to retry it.
+ */
+async function dropStaleTilePacks() {
+  const key = await getTilePackKey();
+  const current = key && new URL(key, self.location.origin).href;
+  const cache = await caches.open(CACHES.tiles);
+  const packs = await getCachedTilePacks(cache);
+  if (current && !packs.some(request => request.url === current)) {
+    return;
+  }
+  const stale = packs.filter(request => request.url !== current);
+
+  await Promise.all(stale.map(request => cache.delete(request)));
+  if (stale.length) {
+    tilePackIndex = null;
+  }
+}
+
 /* ============================================
    OFFLINE FALLBACK
    ============================================ */
@@ -406,7 +1278,32 @@ self.addEventListener('message', (event) => {
       break;
 
     case 'CACHE_URLS':
-      cacheUrls(payload?.urls || []);
+      event.waitUntil(cacheUrls(payload?.urls || []));
+      break;
+
+    case 'UPDATE_PRECACHE':
+      event.waitUntil(
+        syncPrecache({ live: true })
+          .catch(error => ({ error: error.message }))
+          .then(async (result) => {
+            const clients = await self.clients.matchAll();
+            clients.forEach(client => {
+              client.postMessage({ type: 'PRECACHE_COMPLETE', ...result });
+            });
+          })
+      );
+      break;
+
+    case 'CACHE_TILE_PACK':
+      event.waitUntil(
+        cacheTilePack().then(result => event.ports[0]?.postMessage(result))
+      );
+      break;
+
+    case 'GET_TILE_PACK_STATUS':
+      isTilePackAvailable()
+        .catch(() => false)
+        .then(available => event.ports[0]?.postMessage({ available }));
       break;
 
     case 'CLEAR_CACHE':
@@ -425,13 +1322,11 @@ self.addEventListener('message', (event) => {
  * Cache specific URLs on demand
  */
 async function cacheUrls(urls) {
-  const cache = await caches.open(CACHES.runtime);
-
   for (const url of urls) {
     try {
       const response = await fetch(url);
       if (response.ok) {
-        await cache.put(url, response);
+        await storeResponse(CACHES.runtime, new Request(url), response, 'networkFirst');
       }
     } catch (error) {
       console.warn('[SW] Failed to cache:', url);
@@ -452,12 +1347,16 @@ async function cacheUrls(urls) {
  * Clear specific cache or all caches
  */
 async function clearCache(cacheName) {
+  tilePackIndex = null;
+
   if (cacheName) {
     await caches.delete(cacheName);
   } else {
     const names = await caches.keys();
     await Promise.all(names.map(name => caches.delete(name)));
   }
+
+  await reconcileCacheIndex().catch(() => {});
 }
 
 /**
@@ -467,9 +1366,12 @@ async function getCacheStatus() {
   const cacheNames = await caches.keys();
   const status = {
     version: SW_VERSION,
+    precacheRevision: PRECACHE_REVISION,
     caches: {}
   };
 
+  const { budget, telemetry } = await getCacheTelemetry();
+
   for (const name of cacheNames) {
     const cache = await caches.open(name);
     const keys = await cache.keys();
@@ -477,8 +1379,14 @@ async function getCacheStatus() {
       count: keys.length,
       urls: keys.map(r => r.url)
     };
+    if (CACHE_BUDGET.managed.includes(name)) {
+      status.caches[name].bytes = budget.bytesByCache[name] || 0;
+    }
   }
 
+  status.budget = budget;
+  status.telemetry = telemetry;
+
   // Get storage estimate if available
   if (navigator.storage && navigator.storage.estimate) {
     const estimate = await navigator.storage.estimate();
@@ -489,6 +1397,11 @@ async function getCacheStatus() {
     };
   }
 
+  // persist() itself is only exposed to pages (see pwa/manager.js)
+  if (navigator.storage && navigator.storage.persisted) {
+    status.persisted = await navigator.storage.persisted();
+  }
+
   return status;
 }
 
@@ -516,23 +1429,8 @@ async function processSyncQueue() {
 
 self.addEventListener('periodicsync', (event) => {
   if (event.tag === 'update-content') {
-    event.waitUntil(updatePrecachedContent());
+    event.waitUntil(syncPrecache().catch(() => {}));
   }
 });
 
-async function updatePrecachedContent() {
-  const cache = await caches.open(CACHES.precache);
-
-  for (const url of PRECACHE_ASSETS) {
-    try {
-      const response = await fetch(url);
-      if (response.ok) {
-        await cache.put(url, response);
-      }
-    } catch (error) {
-      // Continue with other assets
-    }
-  }
-}
-
 console.log('[SW] Service Worker loaded, version:', SW_VERSION);
@@ -0,0 +1,297 @@
+"""
+Tiger 900 - GPX Route Compiler (MkDocs hook)
+
+Parses every GPX file under ``docs/`` once at build time and writes compact
+route geometry for the map module:
+
+- Splits each track into days using the ``Dia N`` trkpt names
+- Simplifies each day with Douglas-Peucker to a configurable tolerance
+- Encodes coordinates as Google encoded polylines (precision 5)
+- Records bounding boxes and distances per route and per day, and the
+  endpoints of each day
+
+Output (relative to ``site_dir``)::
+
+    assets/data/routes/index.json         # route list with bboxes
+    assets/data/routes/<gpx-stem>.json    # per-day encoded geometry
+
+Configuration lives under ``extra.gpx_routes`` in ``mkdocs.yml``::
+
+    extra:
+      gpx_routes:
+        tolerance: 25              # metres
+        output: assets/data/routes
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+log = logging.getLogger("mkdocs.hooks.gpx_routes")
+
+DEFAULTS = {
+    "tolerance": 25,
+    "output": "assets/data/routes",
+}
+
+DAY_PATTERN = re.compile(r"^\s*Dia\s+(\d+)\s*(?:[-–:]\s*)?(.*)$", re.IGNORECASE)
+
+EARTH_RADIUS_KM = 6371.0
+
+
+# ============================================
+# GPX PARSING
+# ============================================
+
+def _local(tag: str) -> str:
+    """Strip the XML namespace from a tag name."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> str | None:
+    for child in element:
+        if _local(child.tag) == name:
+            return (child.text or "").strip()
+    return None
+
+
+def parse_gpx(path: Path) -> dict:
+    """
+    Parse a GPX file into a name and an ordered list of points.
+
+    Track points are preferred; route points are used when the file has no
+    track (e.g. ``00_Rota_Dream.gpx``).
+    """
+    root = ET.parse(path).getroot()
+
+    name = None
+    points: list[dict] = []
+
+    for kind in ("trk", "rte"):
+        point_tag = "trkpt" if kind == "trk" else "rtept"
+        for container in (el for el in root.iter() if _local(el.tag) == kind):
+            name = name or _child_text(container, "name")
+            for pt in (el for el in container.iter() if _local(el.tag) == point_tag):
+                points.append({
+                    "lat": float(pt.get("lat")),
+                    "lon": float(pt.get("lon")),
+                    "name": _child_text(pt, "name") or "",
+                })
+        if points:
+            break
+
+    if not name:
+        metadata = next((el for el in root if _local(el.tag) == "metadata"), None)
+        name = _child_text(metadata, "name") if metadata is not None else None
+
+    return {"name": name or path.stem, "points": points}
+
+
+def split_by_day(points: list[dict]) -> list[dict]:
+    """
+    Split points into day segments using ``Dia N`` point names.
+
+    Unlabelled points (stops, passages) are listed in the GPX before the
+    ``Dia N`` point they lead to, so they join the next labelled day; trailing
+    unlabelled points stay with the last day. Each day starts at the previous
+    day's last point so the drawn segments connect. Files without day labels
+    yield a single segment with ``day`` set to ``None``.
+    """
+    segments: list[dict] = []
+    pending: list[dict] = []
+
+    for point in points:
+        match = DAY_PATTERN.match(point["name"])
+        if not match:
+            pending.append({**point, "label": point["name"]})
+            continue
+
+        day = int(match.group(1))
+        labelled = {**point, "label": match.group(2).strip() or point["name"]}
+
+        if not segments or segments[-1]["day"] != day:
+            seed = [segments[-1]["points"][-1]] if segments else []
+            segments.append({"day": day, "points": seed})
+
+        segments[-1]["points"].extend(pending)
+        segments[-1]["points"].append(labelled)
+        pending = []
+
+    if pending:
+        if segments:
+            segments[-1]["points"].extend(pending)
+        else:
+            segments.append({"day": None, "points": pending})
+
+    return segments
+
+
+# ============================================
+# GEOMETRY
+# ============================================
+
+def haversine_km(a: dict, b: dict) -> float:
+    """Great-circle distance between two points in kilometres."""
+    lat1, lat2 = math.radians(a["lat"]), math.radians(b["lat"])
+    d_lat = lat2 - lat1
+    d_lon = math.radians(b["lon"] - a["lon"])
+    h = math.sin(d_lat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(h), math.sqrt(1 - h))
+
+
+def bounding_box(points: list[dict]) -> list[float]:
+    """Return ``[minLat, minLon, maxLat, maxLon]``."""
+    lats = [p["lat"] for p in points]
+    lons = [p["lon"] for p in points]
+    return [min(lats), min(lons), max(lats), max(lons)]
+
+
+def simplify(points: list[dict], tolerance_m: float) -> list[dict]:
+    """
+    Douglas-Peucker simplification with a tolerance in metres.
+
+    Coordinates are projected onto a local equirectangular plane, which is
+    accurate enough at route scale and avoids a projection dependency.
+    """
+    if len(points) < 3 or tolerance_m <= 0:
+        return list(points)
+
+    lat0 = math.radians(sum(p["lat"] for p in points) / len(points))
+    kx = 111_320 * math.cos(lat0)
+    ky = 110_540
+    xy = [(p["lon"] * kx, p["lat"] * ky) for p in points]
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = xy[first], xy[last]
+        dx, dy = x2 - x1, y2 - y1
+        seg_len_sq = dx * dx + dy * dy
+
+        max_dist, index = 0.0, first
+        for i in range(first + 1, last):
+            px, py = xy[i]
+            if seg_len_sq == 0:
+                dist = math.hypot(px - x1, py - y1)
+            else:
+                t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / seg_len_sq))
+                dist = math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+            if dist > max_dist:
+                max_dist, index = dist, i
+
+        if max_dist > tolerance_m:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [p for p, kept in zip(points, keep) if kept]
+
+
+def encode_polyline(points: list[dict], precision: int = 5) -> str:
+    """Encode points with the Google encoded polyline algorithm."""
+    factor = 10 ** precision
+    output: list[str] = []
+    prev_lat = prev_lon = 0
+
+    for point in points:
+        lat = round(point["lat"] * factor)
+        lon = round(point["lon"] * factor)
+        for delta in (lat - prev_lat, lon - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                output.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            output.append(chr(value + 63))
+        prev_lat, prev_lon = lat, lon
+
+    return "".join(output)
+
+
+# ============================================
+# COMPILATION
+# ============================================
+
+def compile_route(path: Path, tolerance_m: float) -> dict | None:
+    """Compile one GPX file into the compact route document."""
+    gpx = parse_gpx(path)
+    if not gpx["points"]:
+        return None
+
+    days = []
+    for segment in split_by_day(gpx["points"]):
+        raw = segment["points"]
+        simplified = simplify(raw, tolerance_m)
+        days.append({
+            "day": segment["day"],
+            "start": raw[0]["label"],
+            "end": raw[-1]["label"],
+            # GPX days carry no dates; the map matches them to trip days by
+            # these endpoints
+            "from": [round(raw[0]["lat"], 5), round(raw[0]["lon"], 5)],
+            "to": [round(raw[-1]["lat"], 5), round(raw[-1]["lon"], 5)],
+            "bbox": [round(v, 5) for v in bounding_box(raw)],
+            "distanceKm": round(sum(haversine_km(a, b) for a, b in zip(raw, raw[1:])), 1),
+            "points": len(simplified),
+            "polyline": encode_polyline(simplified),
+        })
+
+    return {
+        "id": path.stem,
+        "name": gpx["name"],
+        "source": path.name,
+        "bbox": [round(v, 5) for v in bounding_box(gpx["points"])],
+        "distanceKm": round(sum(d["distanceKm"] for d in days), 1),
+        "days": days,
+    }
+
+
+def get_settings(config) -> dict:
+    return {**DEFAULTS, **(config.get("extra", {}).get("gpx_routes") or {})}
+
+
+def on_post_build(config, **kwargs) -> None:
+    settings = get_settings(config)
+    docs_dir = Path(config["docs_dir"])
+    output_dir = Path(config["site_dir"]) / settings["output"]
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    index = {"tolerance": settings["tolerance"], "routes": []}
+
+    for path in sorted(docs_dir.rglob("*.gpx")):
+        try:
+            route = compile_route(path, float(settings["tolerance"]))
+        except ET.ParseError as error:
+            log.warning("Skipping invalid GPX '%s': %s", path.relative_to(docs_dir), error)
+            continue
+
+        if route is None:
+            continue
+
+        filename = f"{route['id']}.json"
+        (output_dir / filename).write_text(
+            json.dumps(route, ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+
+        index["routes"].append({
+            "id": route["id"],
+            "name": route["name"],
+            "url": filename,
+            "bbox": route["bbox"],
+            "distanceKm": route["distanceKm"],
+            "days": [d["day"] for d in route["days"] if d["day"] is not None],
+        })
+
+    (output_dir / "index.json").write_text(
+        json.dumps(index, ensure_ascii=False, separators=(",", ":")),
+        encoding="utf-8",
+    )
+    log.info("Compiled %d GPX routes to %s", len(index["routes"]), settings["output"])
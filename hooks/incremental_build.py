@@ -0,0 +1,565 @@
+"""
+Tiger 900 - Incremental Build Cache and Timing Report (MkDocs hook)
+
+Keeps two on-disk caches under ``cache_dir`` so rebuilds only pay for what
+changed:
+
+- **Git dates**: the creation/revision commits that
+  ``git-revision-date-localized`` looks up per page are stored with the
+  ``HEAD`` they were read at. On the next build only files touched by commits
+  since then (``git log <old>..HEAD``) are asked again; a rewritten history
+  or a changed plugin configuration drops the cache.
+- **Rendered pages**: the HTML, table of contents, title, anchors and the
+  warnings emitted while rendering are keyed by the page source, the list of
+  site files, the build inputs (``mkdocs.yml``, ``main.py``, the hooks and
+  the theme overrides) and the installed package versions. On a hit,
+  the ``page_markdown`` events (macros) and the Markdown conversion are
+  skipped; the warnings are replayed so ``--strict`` still fails. Plugins in
+  ``replay`` keep running on hits because they only fill ``page.meta`` from
+  the (cached) git dates. Pages containing Jinja markup are always rendered,
+  since macros output can depend on state outside the page.
+
+Both caches patch private internals (``Page.render`` and the attributes it
+fills; the git plugin's commit lookup and tables), so each one only runs on
+the MkDocs / plugin version listed in ``VERIFIED_VERSIONS`` and is disabled,
+with a log message, on any other version until it has been checked again.
+
+Every build also writes a timing report (milliseconds per plugin and event,
+per page, and the slowest pages) to ``report``.
+
+Configuration lives under ``extra.incremental`` in ``mkdocs.yml``::
+
+    extra:
+      incremental:
+        enabled: true
+        cache_dir: .cache/incremental
+        report: .cache/build-report.json
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import pickle
+import subprocess
+import time
+from importlib import metadata
+from pathlib import Path
+
+from mkdocs.plugins import event_priority
+
+log = logging.getLogger("mkdocs.hooks.incremental_build")
+
+DEFAULTS = {
+    "enabled": True,
+    "cache_dir": ".cache/incremental",
+    "report": ".cache/build-report.json",
+    "slowest": 10,
+    # Files or globs (relative to mkdocs.yml) whose content invalidates every page
+    "inputs": ["mkdocs.yml", "main.py", "hooks/*.py", "overrides/**/*"],
+    # page_markdown handlers that still run for cached pages
+    "replay": ["git-revision-date-localized"],
+}
+
+# Bump when the cached entry layout changes
+CACHE_VERSION = 1
+
+PACKAGES = (
+    "mkdocs",
+    "markdown",
+    "pymdown-extensions",
+    "mkdocs-material",
+    "mkdocs-macros-plugin",
+    "mkdocs-glightbox",
+    "mkdocs-git-revision-date-localized-plugin",
+)
+
+GIT_PLUGIN = "git-revision-date-localized"
+
+# Versions whose private internals the caches were written against
+VERIFIED_VERSIONS = {
+    "mkdocs": "1.6.1",
+    "mkdocs-git-revision-date-localized-plugin": "1.6.0",
+}
+
+# Events that run before hooks are loaded or outside a build
+UNTIMED_EVENTS = {"startup", "shutdown", "serve", "config", "build_error"}
+
+JINJA_MARKERS = ("{{", "{%", "{#")
+
+_state: dict = {}
+
+
+# ============================================
+# CACHE FILES
+# ============================================
+
+def _load_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_pickle(path: Path) -> dict:
+    try:
+        with path.open("rb") as handle:
+            return pickle.load(handle)
+    except Exception:  # Corrupt or written by an incompatible version
+        return {}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _input_files(root: Path, patterns: list[str]) -> list[tuple[str, bytes]]:
+    """Path and content of every build input; missing plain paths hash as empty."""
+    inputs = []
+    for pattern in patterns:
+        if any(char in pattern for char in "*?["):
+            paths = sorted(p for p in root.glob(pattern) if p.is_file())
+            inputs += [(p.relative_to(root).as_posix(), p.read_bytes()) for p in paths]
+        else:
+            path = root / pattern
+            inputs.append((pattern, path.read_bytes() if path.is_file() else b""))
+    return inputs
+
+
+def _verified(package: str, versions: dict, cache: str) -> bool:
+    """Whether ``package`` is the version a cache's patches were written against."""
+    if versions.get(package) == VERIFIED_VERSIONS[package]:
+        return True
+    log.info(
+        "%s %s is not the verified version (%s); %s disabled",
+        package, versions.get(package), VERIFIED_VERSIONS[package], cache,
+    )
+    return False
+
+
+def _package_versions() -> dict:
+    versions = {}
+    for name in PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+# ============================================
+# GIT DATES
+# ============================================
+
+def _git(root: Path, *args: str) -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "-c", "core.quotePath=false", *args],
+            cwd=root, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout
+
+
+def _touched_since(root: Path, old_head: str, head: str) -> set[str] | None:
+    """Paths changed by any commit in ``old_head..head``; ``None`` if history diverged."""
+    if _git(root, "merge-base", "--is-ancestor", old_head, head) is None:
+        return None
+    output = _git(root, "log", "--name-only", "--format=", f"{old_head}..{head}")
+    if output is None:
+        return None
+    return {line.strip() for line in output.splitlines() if line.strip()}
+
+
+def _load_git_cache(path: Path, root: Path | None, fingerprint: str) -> dict:
+    """Load cached commits, dropping entries touched since the cached ``HEAD``."""
+    empty = {"head": None, "created": {}, "revised": {}}
+    output = _git(root, "rev-parse", "HEAD") if root else None
+    if not output:
+        return empty
+    head = output.strip()
+
+    cache = _load_json(path)
+    if cache.get("version") != CACHE_VERSION or cache.get("fingerprint") != fingerprint:
+        return {**empty, "head": head}
+
+    if cache.get("head") != head:
+        touched = _touched_since(root, cache.get("head") or "", head)
+        if touched is None:
+            return {**empty, "head": head}
+        for kind in ("created", "revised"):
+            cache[kind] = {k: v for k, v in cache.get(kind, {}).items() if k not in touched}
+
+    return {
+        "head": head,
+        "created": cache.get("created", {}),
+        "revised": cache.get("revised", {}),
+    }
+
+
+def _attach_git_cache(plugin, files, root: Path, cache: dict) -> None:
+    """
+    Serve ``git-revision-date-localized`` commit lookups from the cache and
+    record the ones it still has to ask git for.
+    """
+    original = getattr(plugin, "_get_commit", None)
+    if original is None or not hasattr(plugin, "created_commits"):
+        log.info("git-revision-date-localized internals changed; git date cache disabled")
+        return
+
+    def relative(abs_src_path: str) -> str | None:
+        try:
+            return Path(abs_src_path).resolve().relative_to(root).as_posix()
+        except ValueError:
+            return None
+
+    # Pre-filling the plugin's own lookup tables stops it from spawning a
+    # process pool to read the history of every file again
+    for file in files.documentation_pages():
+        key = relative(file.abs_src_path) if file.abs_src_path else None
+        absolute = str(Path(file.abs_src_path).absolute()) if file.abs_src_path else None
+        if key in cache["revised"]:
+            plugin.last_revision_commits[absolute] = tuple(cache["revised"][key])
+        if key in cache["created"]:
+            plugin.created_commits[absolute] = tuple(cache["created"][key])
+
+    stats = _state["stats"]
+
+    def get_commit(page, is_first_commit):
+        key = relative(page.file.abs_src_path) if page.file.abs_src_path else None
+        table = cache["created" if is_first_commit else "revised"]
+        if key in table:
+            stats["git_hits"] += 1
+            return tuple(table[key])
+
+        stats["git_misses"] += 1
+        commit_hash, timestamp = original(page, is_first_commit)
+        # Build-date fallbacks (uncommitted files) have no hash; never cache them
+        if key and commit_hash:
+            table[key] = [commit_hash, timestamp]
+        return commit_hash, timestamp
+
+    plugin._get_commit = get_commit
+
+
+# ============================================
+# PAGE CACHE
+# ============================================
+
+def _page_key(page) -> str | None:
+    """Cache key for a page, or ``None`` when the page must always render."""
+    if not page.file.abs_src_path:
+        return None
+    try:
+        source = Path(page.file.abs_src_path).read_bytes()
+    except OSError:
+        return None
+    text = source.decode("utf-8", errors="replace")
+    if any(marker in text for marker in JINJA_MARKERS):
+        return None
+    return _digest(_state["fingerprint"], page.file.src_uri, source)
+
+
+class _WarningCollector(logging.Handler):
+    """Collect warnings logged while a page renders so hits can replay them."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.WARNING)
+        self.records: list[tuple[str, int, str]] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append((record.name, record.levelno, record.getMessage()))
+
+
+def _restore_render(page, entry: dict):
+    """Replacement for ``page.render`` that restores a cached render."""
+
+    def render(config, files) -> None:
+        page.content = entry["content"]
+        page.toc = entry["toc"]
+        page._title_from_render = entry["title"]
+        page.present_anchor_ids = set(entry["anchors"])
+        if entry["links"] is not None:
+            page.links_to_anchors = {
+                target: links
+                for uri, links in entry["links"].items()
+                if (target := files.get_file_from_path(uri)) is not None
+            }
+        for name, value in entry["meta"].items():
+            page.meta.setdefault(name, value)
+        for name, level, message in entry["warnings"]:
+            logging.getLogger(name).log(level, message)
+
+    return render
+
+
+# ============================================
+# TIMING
+# ============================================
+
+def _page_timings(page) -> dict:
+    return _state["pages"].setdefault(page.file.src_uri, {
+        "page": page.file.src_uri,
+        "cached": False,
+        "renderMs": 0.0,
+        "templateMs": 0.0,
+        "pluginsMs": 0.0,
+    })
+
+
+def _timed_event(method, plugin: str, event: str, replay: bool):
+    """Wrap a plugin event handler to record its duration (and skip it on hits)."""
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        page = kwargs.get("page")
+        if page is None and event == "pre_page" and args:
+            page = args[0]
+
+        if event == "page_markdown" and not replay and page is not None \
+                and page.file.src_uri in _state["hits"]:
+            return args[0] if args else kwargs.get("markdown")
+
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            timing = _state["events"].setdefault(plugin, {}).setdefault(event, {"calls": 0, "ms": 0.0})
+            timing["calls"] += 1
+            timing["ms"] += elapsed
+            if page is not None:
+                _page_timings(page)["pluginsMs"] += elapsed
+
+    return wrapper
+
+
+def _wrap_events(plugins, replay: list[str]) -> None:
+    origins = getattr(plugins, "_event_origins", {})
+    for event, methods in plugins.events.items():
+        if event in UNTIMED_EVENTS:
+            continue
+        for index, method in enumerate(methods):
+            if getattr(method, "__globals__", None) is globals():
+                continue
+            plugin = origins.get(method, "<unknown>")
+            wrapped = _timed_event(method, plugin, event, plugin in replay)
+            origins[wrapped] = plugin
+            methods[index] = wrapped
+
+
+def _write_report(path: Path, total_ms: float, slowest: int) -> list[dict]:
+    pages = sorted(_state["pages"].values(), key=lambda p: p["renderMs"] + p["templateMs"] + p["pluginsMs"], reverse=True)
+    for page in pages:
+        page["totalMs"] = page["renderMs"] + page["templateMs"] + page["pluginsMs"]
+        for field in ("renderMs", "templateMs", "pluginsMs", "totalMs"):
+            page[field] = round(page[field], 2)
+
+    events = {
+        plugin: {event: {"calls": t["calls"], "ms": round(t["ms"], 2)} for event, t in timings.items()}
+        for plugin, timings in _state["events"].items()
+    }
+    stats = _state["stats"]
+    report = {
+        "totalMs": round(total_ms, 1),
+        "pages": {"total": len(pages), "cached": stats["page_hits"], "rendered": len(pages) - stats["page_hits"]},
+        "gitDates": {"cached": stats["git_hits"], "looked_up": stats["git_misses"]},
+        "plugins": events,
+        "slowest": [p["page"] for p in pages[:slowest]],
+        "perPage": pages,
+    }
+    _write_atomic(path, json.dumps(report, indent=2, ensure_ascii=False).encode("utf-8"))
+    return pages[:slowest]
+
+
+# ============================================
+# MKDOCS HOOK
+# ============================================
+
+def get_settings(config) -> dict:
+    return {**DEFAULTS, **(config.get("extra", {}).get("incremental") or {})}
+
+
+def on_config(config, **kwargs):
+    settings = get_settings(config)
+    root = Path(config["config_file_path"]).parent
+
+    _state.clear()
+    _state.update({
+        "start": time.perf_counter(),
+        "settings": settings,
+        "root": root,
+        "cache_dir": root / settings["cache_dir"],
+        "events": {},
+        "pages": {},
+        "hits": set(),
+        "page_cache": {},
+        "page_entries": {},
+        "git_cache": None,
+        "cache_pages": False,
+        "stats": {"page_hits": 0, "git_hits": 0, "git_misses": 0},
+    })
+    _wrap_events(config.plugins, settings["replay"])
+    return config
+
+
+@event_priority(100)
+def on_files(files, config, **kwargs):
+    settings = _state["settings"]
+    if not settings["enabled"]:
+        return files
+
+    root = _state["root"]
+    versions = _package_versions()
+    inputs = _input_files(root, settings["inputs"])
+    site_files = sorted((f.src_uri, f.url) for f in files)
+    _state["fingerprint"] = _digest(CACHE_VERSION, versions, inputs, site_files)
+
+    _state["cache_pages"] = _verified("mkdocs", versions, "page cache")
+    if _state["cache_pages"]:
+        cache = _load_pickle(_state["cache_dir"] / "pages.pickle")
+        _state["page_cache"] = cache.get("entries", {}) if cache.get("version") == CACHE_VERSION else {}
+
+    plugin = config.plugins.get(GIT_PLUGIN)
+    if plugin is not None and plugin.config.get("enabled") \
+            and _verified("mkdocs-git-revision-date-localized-plugin", versions, "git date cache"):
+        top = _git(root, "rev-parse", "--show-toplevel")
+        git_root = Path(top.strip()).resolve() if top else None
+        fingerprint = _digest(sorted(plugin.config.items()), versions[
+            "mkdocs-git-revision-date-localized-plugin"])
+        _state["git_cache"] = _load_git_cache(_state["cache_dir"] / "git-dates.json", git_root, fingerprint)
+        _state["git_fingerprint"] = fingerprint
+        if git_root and _state["git_cache"]["head"]:
+            _attach_git_cache(plugin, files, git_root, _state["git_cache"])
+
+    return files
+
+
+@event_priority(100)
+def on_pre_page(page, config, files, **kwargs):
+    timings = _page_timings(page)
+    _state["page_start"] = time.perf_counter()
+
+    if _state["cache_pages"]:
+        key = _page_key(page)
+        entry = _state["page_cache"].get(key) if key else None
+        _state.setdefault("keys", {})[page.file.src_uri] = key
+
+        if entry is not None:
+            _state["hits"].add(page.file.src_uri)
+            _state["page_entries"][key] = entry
+            _state["stats"]["page_hits"] += 1
+            timings["cached"] = True
+            page.render = _restore_render(page, entry)
+            return page
+
+        if key is not None:
+            collector = _WarningCollector()
+            logging.getLogger("mkdocs").addHandler(collector)
+            _state["collector"] = collector
+
+    render = page.render
+
+    def timed_render(config, files) -> None:
+        start = time.perf_counter()
+        try:
+            render(config, files)
+        finally:
+            timings["renderMs"] += (time.perf_counter() - start) * 1000
+
+    page.render = timed_render
+    return page
+
+
+@event_priority(100)
+def on_page_content(html, page, config, files, **kwargs):
+    collector = _state.pop("collector", None)
+    if collector is None:
+        return html
+
+    logging.getLogger("mkdocs").removeHandler(collector)
+    key = _state["keys"].get(page.file.src_uri)
+    links = getattr(page, "links_to_anchors", None)
+    entry = {
+        "content": html,
+        "toc": page.toc,
+        "title": getattr(page, "_title_from_render", None),
+        "anchors": sorted(page.present_anchor_ids or ()),
+        "links": None if links is None else {f.src_uri: dict(v) for f, v in links.items()},
+        "meta": dict(page.meta),
+        "warnings": collector.records,
+    }
+    try:
+        pickle.dumps(entry)
+    except Exception:  # Plugins may leave unpicklable objects in page.meta
+        log.debug("Not caching '%s': render result is not picklable", page.file.src_uri)
+        return html
+
+    _state["page_entries"][key] = entry
+    return html
+
+
+@event_priority(-100)
+def on_page_context(context, page, config, nav, **kwargs):
+    _state["template_start"] = time.perf_counter()
+    return context
+
+
+@event_priority(100)
+def on_post_page(output, page, config, **kwargs):
+    start = _state.pop("template_start", None)
+    if start is not None:
+        _page_timings(page)["templateMs"] += (time.perf_counter() - start) * 1000
+    return output
+
+
+@event_priority(-100)
+def on_post_build(config, **kwargs) -> None:
+    settings = _state["settings"]
+    cache_dir = _state["cache_dir"]
+
+    if settings["enabled"]:
+        # Only entries used by this build are kept, so the cache never outgrows the site
+        if _state["cache_pages"]:
+            _write_atomic(cache_dir / "pages.pickle", pickle.dumps({
+                "version": CACHE_VERSION,
+                "entries": _state["page_entries"],
+            }))
+        git_cache = _state["git_cache"]
+        if git_cache and git_cache["head"]:
+            _write_atomic(cache_dir / "git-dates.json", json.dumps({
+                "version": CACHE_VERSION,
+                "fingerprint": _state["git_fingerprint"],
+                **git_cache,
+            }, separators=(",", ":")).encode("utf-8"))
+
+        stats = _state["stats"]
+        log.info(
+            "Incremental build: %d/%d pages from cache, %d/%d git dates from cache",
+            stats["page_hits"], len(_state["pages"]),
+            stats["git_hits"], stats["git_hits"] + stats["git_misses"],
+        )
+
+    total_ms = (time.perf_counter() - _state["start"]) * 1000
+    if settings["report"]:
+        slowest = _write_report(_state["root"] / settings["report"], total_ms, int(settings["slowest"]))
+        log.info(
+            "Build timings: %.0f ms total; slowest pages: %s (report: %s)",
+            total_ms,
+            ", ".join(f"{p['page']} {p['totalMs']:.0f} ms" for p in slowest[:3]) or "none",
+            settings["report"],
+        )
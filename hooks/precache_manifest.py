@@ -0,0 +1,156 @@
+"""
+Tiger 900 - Precache Manifest Generator (MkDocs hook)
+
+Walks the built site after every build and writes ``precache-manifest.json``
+with the URL, content hash and byte size of every asset the service worker
+should keep offline. The service worker compares it with the manifest it
+stored last time and re-downloads only the entries whose hash changed, so a
+small fix no longer costs a full re-download.
+
+The manifest revision is also injected into the built ``service-worker.js``
+(``PRECACHE_REVISION``) so browsers see a byte-different worker, and run the
+update, whenever any precached content changes. The offline tile pack is
+not precached, but when the build produced one it is listed under
+``tilePack`` so the worker only routes map tiles to it when it exists.
+
+Configuration lives under ``extra.precache`` in ``mkdocs.yml``. Patterns are
+``fnmatch`` globs matched against site-relative paths (``*`` also matches
+``/``)::
+
+    extra:
+      precache:
+        include: ['*.html', 'assets/js/*']
+        exclude: ['404.html']
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+log = logging.getLogger("mkdocs.hooks.precache_manifest")
+
+DEFAULTS = {
+    "manifest": "precache-manifest.json",
+    "service_worker": "service-worker.js",
+    "include": [
+        "*.html",
+        "manifest.json",
+        "assets/js/*",
+        "assets/css/*",
+        "assets/javascripts/bundle.*.js",
+        "assets/javascripts/workers/*.js",
+        "assets/stylesheets/*.css",
+        "assets/icons/icon-192x192.png",
+        "assets/icons/icon-512x512.png",
+        "assets/data/routes/*.json",
+        "search/search_index.json",
+    ],
+    "exclude": [
+        "404.html",
+    ],
+    # Offline tile pack (hooks/tile_pack.py); not precached, but listed so
+    # the service worker knows whether the build has one
+    "tile_pack": "assets/data/tiles/corridor.pack",
+}
+
+REVISION_PATTERN = re.compile(r"const PRECACHE_REVISION = '[^']*';")
+
+
+def get_settings(config) -> dict:
+    return {**DEFAULTS, **(config.get("extra", {}).get("precache") or {})}
+
+
+def base_path(config) -> str:
+    """URL path the site is served under (e.g. ``/tiger-900/``)."""
+    path = urlsplit(config.get("site_url") or "/").path or "/"
+    return path if path.endswith("/") else f"{path}/"
+
+
+def page_url(relative: str, base: str) -> str:
+    """Map a site-relative file to the URL the browser requests."""
+    if relative == "index.html":
+        return base
+    if relative.endswith("/index.html"):
+        return base + relative[: -len("index.html")]
+    return base + relative
+
+
+def matches(relative: str, patterns: list[str]) -> bool:
+    return any(fnmatch.fnmatch(relative, pattern) for pattern in patterns)
+
+
+def build_manifest(site_dir: Path, base: str, settings: dict) -> dict:
+    """Hash every included file under ``site_dir``."""
+    skip = {settings["manifest"], settings["service_worker"]}
+    assets = {}
+
+    for path in sorted(p for p in site_dir.rglob("*") if p.is_file()):
+        relative = path.relative_to(site_dir).as_posix()
+        if relative in skip or not matches(relative, settings["include"]):
+            continue
+        if matches(relative, settings["exclude"]):
+            continue
+
+        content = path.read_bytes()
+        assets[page_url(relative, base)] = {
+            "hash": hashlib.sha256(content).hexdigest()[:16],
+            "size": len(content),
+        }
+
+    tile_pack = None
+    pack_path = site_dir / settings["tile_pack"]
+    if settings["tile_pack"] and pack_path.is_file():
+        content = pack_path.read_bytes()
+        tile_pack = {
+            "url": base + settings["tile_pack"],
+            "hash": hashlib.sha256(content).hexdigest()[:16],
+            "size": len(content),
+        }
+
+    revision = hashlib.sha256(
+        json.dumps({"assets": assets, "tilePack": tile_pack}, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+
+    return {
+        "revision": revision,
+        "totalBytes": sum(entry["size"] for entry in assets.values()),
+        "assets": assets,
+        "tilePack": tile_pack,
+    }
+
+
+def inject_revision(service_worker: Path, revision: str) -> bool:
+    """Replace the ``PRECACHE_REVISION`` placeholder in the built worker."""
+    if not service_worker.is_file():
+        return False
+
+    source = service_worker.read_text(encoding="utf-8")
+    updated, count = REVISION_PATTERN.subn(f"const PRECACHE_REVISION = '{revision}';", source)
+    if count:
+        service_worker.write_text(updated, encoding="utf-8")
+    return bool(count)
+
+
+def on_post_build(config, **kwargs) -> None:
+    settings = get_settings(config)
+    site_dir = Path(config["site_dir"])
+
+    manifest = build_manifest(site_dir, base_path(config), settings)
+    (site_dir / settings["manifest"]).write_text(
+        json.dumps(manifest, ensure_ascii=False, separators=(",", ":")),
+        encoding="utf-8",
+    )
+
+    if not inject_revision(site_dir / settings["service_worker"], manifest["revision"]):
+        log.warning("PRECACHE_REVISION not found in %s", settings["service_worker"])
+
+    log.info(
+        "Precache manifest: %d assets, %.1f KB (revision %s)",
+        len(manifest["assets"]), manifest["totalBytes"] / 1024, manifest["revision"],
+    )
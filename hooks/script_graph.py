@@ -0,0 +1,261 @@
+"""
+Tiger 900 - Per-page Script Graph (MkDocs hook)
+
+Looks at each rendered page and only ships the JavaScript that page uses:
+
+- Classic scripts from ``extra_javascript`` listed under ``scripts`` are
+  dropped from pages whose markup has none of their markers (e.g.
+  ``roteiro-interativo.js`` only where the itinerary table, timeline or a
+  checklist is present).
+- ``loader.js`` is replaced by a direct ``<script type="module">`` for
+  ``main.js``, removing one hop from the startup waterfall.
+- ``<link rel="modulepreload">`` is added for the static import graph of
+  ``main.js`` and of every feature module the page needs, so the browser
+  fetches the whole graph in parallel instead of discovering it one
+  ``import`` at a time.
+- Third-party resources a feature loads at runtime (Leaflet for the map)
+  get a ``preconnect`` and a ``preload``.
+
+Markers use a small selector syntax matched against the rendered page
+content: ``#id``, ``.class``, ``[attribute]``, ``custom-element``,
+``path:<substring of the page URL>`` and ``homepage``. The ``features``
+markers mirror ``autoInitFeatures()`` in ``main.js``, which still makes the
+final decision at runtime; a mismatch only costs a preload.
+
+Configuration lives under ``extra.script_graph`` in ``mkdocs.yml``::
+
+    extra:
+      script_graph:
+        enabled: true
+        scripts:
+          assets/js/previsao-tempo.js: ['#resumo-tabela', '.day-dot']
+"""
+
+from __future__ import annotations
+
+import logging
+import posixpath
+import re
+from pathlib import Path
+
+from mkdocs.utils import get_relative_url
+
+log = logging.getLogger("mkdocs.hooks.script_graph")
+
+DEFAULTS = {
+    "enabled": True,
+    "entry": "assets/js/main.js",
+    "loader": "assets/js/loader.js",
+    "features_dir": "assets/js/features",
+    # Classic scripts and the markup that needs them; extra_javascript
+    # entries not listed here stay on every page
+    "scripts": {
+        "assets/js/roteiro-interativo.js": [
+            "homepage", "#viagem-timeline", "#resumo-tabela", ".dia-link",
+            ".task-list", "[data-preview-img]",
+        ],
+        "assets/js/previsao-tempo.js": ["#resumo-tabela", ".day-dot"],
+    },
+    # Feature modules (features/<name>.js) and the markup that loads them
+    "features": {
+        "weather": ["path:/viagens/", "[data-weather]", "weather-widget", "weather-overview"],
+        "timeline": [
+            "path:/roteiro", "[data-itinerary]", "trip-timeline",
+            "day-cards-accordion", "#viagem-timeline",
+        ],
+        "gallery": ["[data-gallery]", ".photo-gallery", "photo-upload", "photo-grid"],
+        "map": ["[data-map]", ".route-map", "route-map", "mini-map"],
+        "integration": [
+            "path:/viagens/", "photo-editor", "sync-status", "trip-progress",
+            "media-carousel", "warning-badge",
+        ],
+    },
+    # Third-party resources a feature loads at runtime
+    "external": {
+        "map": [
+            "https://unpkg.com/leaflet@1.9.4/dist/leaflet.css",
+            "https://unpkg.com/leaflet@1.9.4/dist/leaflet.js",
+        ],
+    },
+}
+
+# Static imports and re-exports; dynamic import() is left to runtime
+IMPORT_PATTERN = re.compile(
+    r"""^\s*(?:import|export)\b[^;'"]*?\bfrom\s*['"]([^'"]+)['"]"""
+    r"""|^\s*import\s*['"]([^'"]+)['"]""",
+    re.MULTILINE,
+)
+
+# Per-build state: JS sources by site path, resolved graphs and counters
+_state: dict = {}
+
+
+def get_settings(config) -> dict:
+    return {**DEFAULTS, **(config.get("extra", {}).get("script_graph") or {})}
+
+
+# ============================================
+# MARKERS
+# ============================================
+
+def compile_marker(marker: str):
+    """Turn a marker into a predicate over (content, page)."""
+    if marker == "homepage":
+        return lambda content, page: page.is_homepage
+    if marker.startswith("path:"):
+        fragment = marker[len("path:"):]
+        return lambda content, page: fragment in f"/{page.url}"
+
+    if marker.startswith("#"):
+        pattern = rf'\sid="{re.escape(marker[1:])}"'
+    elif marker.startswith("."):
+        pattern = rf'\sclass="[^"]*(?<![\w-]){re.escape(marker[1:])}(?![\w-])[^"]*"'
+    elif marker.startswith("[") and marker.endswith("]"):
+        pattern = rf"\s{re.escape(marker[1:-1])}(?=[\s=>/])"
+    else:
+        pattern = rf"<{re.escape(marker)}(?=[\s>/])"
+
+    regex = re.compile(pattern)
+    return lambda content, page: regex.search(content) is not None
+
+
+def compile_rules(rules: dict) -> dict:
+    return {name: [compile_marker(m) for m in markers] for name, markers in rules.items()}
+
+
+def needed(rules: dict, content: str, page) -> list[str]:
+    return [name for name, tests in rules.items() if any(test(content, page) for test in tests)]
+
+
+# ============================================
+# MODULE GRAPH
+# ============================================
+
+def static_imports(path: str, sources: dict) -> list[str]:
+    """Site paths of the relative modules ``path`` imports statically."""
+    source = sources.get(path)
+    if source is None:
+        return []
+
+    text = Path(source).read_text(encoding="utf-8")
+    base = posixpath.dirname(path)
+    imports = []
+    for match in IMPORT_PATTERN.finditer(text):
+        specifier = match.group(1) or match.group(2)
+        if specifier.startswith(("./", "../")):
+            imports.append(posixpath.normpath(posixpath.join(base, specifier)))
+    return imports
+
+
+def module_graph(roots: list[str], sources: dict, cache: dict) -> list[str]:
+    """Every module reachable from ``roots``, dependencies first."""
+    ordered: list[str] = []
+    seen: set[str] = set()
+
+    def visit(path: str) -> None:
+        if path in seen or path not in sources:
+            return
+        seen.add(path)
+        if path not in cache:
+            cache[path] = static_imports(path, sources)
+        for dependency in cache[path]:
+            visit(dependency)
+        ordered.append(path)
+
+    for root in roots:
+        visit(root)
+    return ordered
+
+
+# ============================================
+# HTML REWRITING
+# ============================================
+
+def script_tag_pattern(src: str) -> re.Pattern:
+    return re.compile(rf'\s*<script\b[^>]*\ssrc="{re.escape(src)}"[^>]*>\s*</script>')
+
+
+def preload_links(modules: list[str], external: list[str], page) -> list[str]:
+    links = [
+        f'<link rel="modulepreload" href="{get_relative_url(path, page.url)}">'
+        for path in modules
+    ]
+
+    origins = []
+    for url in external:
+        origin = "/".join(url.split("/")[:3])
+        if origin not in origins:
+            origins.append(origin)
+    links += [f'<link rel="preconnect" href="{origin}">' for origin in origins]
+    links += [
+        f'<link rel="preload" href="{url}" as="{"style" if url.endswith(".css") else "script"}">'
+        for url in external
+    ]
+    return links
+
+
+def on_files(files, config, **kwargs):
+    settings = get_settings(config)
+    _state.clear()
+    _state.update({
+        "sources": {
+            f.dest_uri: f.abs_src_path
+            for f in files
+            if f.dest_uri.endswith(".js") and f.abs_src_path
+        },
+        "graph": {},
+        "scripts": compile_rules(settings["scripts"]),
+        "features": compile_rules(settings["features"]),
+        "pages": 0,
+        "dropped": 0,
+        "preloads": 0,
+    })
+    return files
+
+
+def on_post_page(output: str, page, config, **kwargs) -> str:
+    settings = get_settings(config)
+    if not settings["enabled"] or "sources" not in _state:
+        return output
+
+    content = page.content or output
+
+    # Drop classic scripts the page doesn't use
+    used = set(needed(_state["scripts"], content, page))
+    for script in settings["scripts"]:
+        if script in used:
+            continue
+        output, count = script_tag_pattern(get_relative_url(script, page.url)).subn("", output)
+        _state["dropped"] += count
+
+    # Load main.js directly instead of through loader.js
+    entry = get_relative_url(settings["entry"], page.url)
+    loader = script_tag_pattern(get_relative_url(settings["loader"], page.url))
+    output, swapped = loader.subn(f'\n<script type="module" src="{entry}"></script>', output, count=1)
+    if not swapped:
+        return output
+
+    features = needed(_state["features"], content, page)
+    roots = [settings["entry"]] + [
+        f"{settings['features_dir']}/{name}.js" for name in features
+    ]
+    modules = module_graph(roots, _state["sources"], _state["graph"])
+    external = [url for name in features for url in settings["external"].get(name, [])]
+
+    links = preload_links(modules, external, page)
+    if links:
+        output = output.replace("</head>", "\n".join(links) + "\n</head>", 1)
+
+    _state["pages"] += 1
+    _state["preloads"] += len(modules)
+    return output
+
+
+def on_post_build(config, **kwargs) -> None:
+    if not _state.get("pages"):
+        return
+
+    log.info(
+        "Script graph: %d pages, %d unused script tags dropped, %.1f modulepreloads per page",
+        _state["pages"], _state["dropped"], _state["preloads"] / _state["pages"],
+    )
@@ -0,0 +1,388 @@
+"""
+Tiger 900 - Offline Tile Pack Builder (MkDocs hook + CLI)
+
+Builds a single-file raster tile archive covering the trip corridor so the
+service worker can serve map tiles offline without one Cache API entry per
+tile:
+
+- Buffers every GPX route under ``docs/`` by ``buffer_km``
+- Collects the tiles touching that corridor for each zoom in the range
+- Fetches them from a tile source (URL template or local directory)
+- Writes one archive with a sorted index; identical tiles are stored once
+
+Archive layout (little-endian)::
+
+    0   magic   b"T9TP"
+    4   u16     format version (1)
+    6   u8      min zoom
+    7   u8      max zoom
+    8   u32     tile count
+    12  u32     metadata length (bytes of UTF-8 JSON that follow)
+    16  ...     metadata JSON
+    ..  ...     index, 20 bytes per tile: u32 z, x, y, offset, length
+    ..  ...     tile data (offsets are relative to the start of this section)
+
+Configuration lives under ``extra.tile_pack`` in ``mkdocs.yml``. The hook is
+a no-op while ``source`` is empty. Bulk downloads from tile.openstreetmap.org
+are not allowed by its usage policy, so point ``source`` at a provider that
+permits it or at a local tile directory. Complete packs are kept in
+``cache_dir`` and reused while the corridor and settings are unchanged;
+a pack with tiles that failed to download records ``missing`` in its
+metadata and is rebuilt on the next run.
+
+The builder can also run on its own::
+
+    python hooks/tile_pack.py --source ./tiles --output corridor.pack
+"""
+
+from __future__ import annotations
+
+import argparse
+import email.utils
+import hashlib
+import json
+import logging
+import math
+import shutil
+import struct
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from gpx_routes import haversine_km, parse_gpx
+
+log = logging.getLogger("mkdocs.hooks.tile_pack")
+
+DEFAULTS = {
+    "source": "",
+    "min_zoom": 6,
+    "max_zoom": 12,
+    "buffer_km": 5,
+    "routes": [],
+    "output": "assets/data/tiles/corridor.pack",
+    "cache_dir": ".cache/tile-pack",
+    "workers": 4,
+    "user_agent": "tiger-900-tile-pack/1.0 (+https://github.com/julianobarbosa/tiger-900)",
+}
+
+MAGIC = b"T9TP"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBII")
+ENTRY = struct.Struct("<IIIII")
+
+# Retries for 429/5xx and network errors: exponential backoff from
+# RETRY_BACKOFF seconds, stretched to Retry-After but capped at RETRY_MAX_DELAY
+RETRIES = 5
+RETRY_BACKOFF = 1.0
+RETRY_MAX_DELAY = 60.0
+
+FORMATS = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+# ============================================
+# CORRIDOR
+# ============================================
+
+def tile_xy(lat: float, lon: float, zoom: int) -> tuple[int, int]:
+    """Web Mercator tile containing a coordinate."""
+    n = 2 ** zoom
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def densify(points: list[dict], step_km: float) -> list[dict]:
+    """Interpolate points so consecutive samples are at most ``step_km`` apart."""
+    if not points:
+        return []
+
+    samples = [points[0]]
+    for a, b in zip(points, points[1:]):
+        steps = max(1, math.ceil(haversine_km(a, b) / step_km))
+        for i in range(1, steps + 1):
+            t = i / steps
+            samples.append({
+                "lat": a["lat"] + (b["lat"] - a["lat"]) * t,
+                "lon": a["lon"] + (b["lon"] - a["lon"]) * t,
+            })
+    return samples
+
+
+def corridor_tiles(tracks: list[list[dict]], buffer_km: float,
+                   min_zoom: int, max_zoom: int) -> list[tuple[int, int, int]]:
+    """All tiles within ``buffer_km`` of any track, sorted by (z, x, y)."""
+    step = max(buffer_km, 0.5)
+    samples = [s for track in tracks for s in densify(track, step)]
+    tiles: set[tuple[int, int, int]] = set()
+
+    for sample in samples:
+        d_lat = buffer_km / 110.574
+        d_lon = buffer_km / (111.320 * max(math.cos(math.radians(sample["lat"])), 0.01))
+        for zoom in range(min_zoom, max_zoom + 1):
+            x0, y0 = tile_xy(sample["lat"] + d_lat, sample["lon"] - d_lon, zoom)
+            x1, y1 = tile_xy(sample["lat"] - d_lat, sample["lon"] + d_lon, zoom)
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    tiles.add((zoom, x, y))
+
+    return sorted(tiles)
+
+
+def load_tracks(docs_dir: Path, routes: list[str]) -> list[list[dict]]:
+    """Route points of every GPX file (or only the ``routes`` stems, if given)."""
+    tracks = []
+    for path in sorted(docs_dir.rglob("*.gpx")):
+        if routes and path.stem not in routes:
+            continue
+        points = parse_gpx(path)["points"]
+        if points:
+            tracks.append(points)
+    return tracks
+
+
+# ============================================
+# TILE SOURCES
+# ============================================
+
+def retry_after(value: str | None) -> float:
+    """Seconds to wait according to a ``Retry-After`` header (delta or HTTP date)."""
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def tile_format(source: str) -> str:
+    suffix = source.rsplit(".", 1)[-1].lower() if "." in source.rsplit("/", 1)[-1] else "png"
+    return suffix if suffix in FORMATS else "png"
+
+
+def make_fetcher(source: str, user_agent: str):
+    """
+    Return ``fetch(z, x, y) -> bytes | None`` for a tile source.
+
+    ``source`` is either an http(s) URL template with ``{z}``, ``{x}`` and
+    ``{y}`` placeholders, or a local directory (optionally a path template)
+    laid out as ``{z}/{x}/{y}.png``.
+    """
+    if source.startswith(("http://", "https://")):
+        def fetch_http(z: int, x: int, y: int) -> bytes | None:
+            url = source.format(z=z, x=x, y=y, s="a")
+            request = urllib.request.Request(url, headers={"User-Agent": user_agent})
+            reason = "no response"
+            for attempt in range(RETRIES):
+                delay = RETRY_BACKOFF * 2 ** attempt
+                try:
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        return response.read()
+                except urllib.error.HTTPError as error:
+                    if error.code == 404:
+                        return None
+                    reason = f"HTTP {error.code}"
+                    if error.code != 429 and error.code < 500:
+                        break
+                    delay = max(delay, retry_after(error.headers.get("Retry-After")))
+                except (urllib.error.URLError, TimeoutError) as error:
+                    reason = str(getattr(error, "reason", error))
+                if attempt < RETRIES - 1:
+                    time.sleep(min(delay, RETRY_MAX_DELAY))
+            log.warning("Tile %d/%d/%d failed (%s): %s", z, x, y, reason, url)
+            return None
+
+        return fetch_http
+
+    template = source.removeprefix("file://")
+    if "{z}" not in template:
+        template = str(Path(template) / "{z}" / "{x}" / "{y}.png")
+
+    def fetch_file(z: int, x: int, y: int) -> bytes | None:
+        path = Path(template.format(z=z, x=x, y=y))
+        return path.read_bytes() if path.is_file() else None
+
+    return fetch_file
+
+
+# ============================================
+# ARCHIVE
+# ============================================
+
+def write_pack(path: Path, tiles: list[tuple[tuple[int, int, int], bytes]],
+               metadata: dict) -> dict:
+    """Write tiles (sorted by z, x, y) to a pack file; returns stats."""
+    offsets: dict[bytes, tuple[int, int]] = {}
+    entries = []
+    blobs = []
+    data_length = 0
+
+    for (z, x, y), content in tiles:
+        digest = hashlib.sha256(content).digest()
+        if digest not in offsets:
+            offsets[digest] = (data_length, len(content))
+            blobs.append(content)
+            data_length += len(content)
+        offset, length = offsets[digest]
+        entries.append(ENTRY.pack(z, x, y, offset, length))
+
+    zooms = [z for (z, _, _), _ in tiles] or [0]
+    meta = json.dumps(metadata, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, min(zooms), max(zooms), len(entries), len(meta)))
+        handle.write(meta)
+        handle.writelines(entries)
+        handle.writelines(blobs)
+
+    return {"tiles": len(entries), "unique": len(blobs), "bytes": path.stat().st_size}
+
+
+def read_metadata(path: Path) -> tuple[int, dict]:
+    """Return ``(tile count, metadata)`` from a pack header."""
+    with path.open("rb") as handle:
+        header = HEADER.unpack(handle.read(HEADER.size))
+        return header[4], json.loads(handle.read(header[5]).decode("utf-8"))
+
+
+def build_pack(docs_dir: Path, output: Path, settings: dict) -> dict | None:
+    """
+    Build (or reuse from ``cache_dir``) the corridor tile pack at ``output``.
+    Returns pack stats, or ``None`` when there is nothing to pack.
+
+    Only complete packs are cached: when tiles could not be fetched the pack
+    is still written (with ``missing`` in its metadata) but rebuilt next time.
+    """
+    min_zoom, max_zoom = int(settings["min_zoom"]), int(settings["max_zoom"])
+    tracks = load_tracks(docs_dir, settings["routes"])
+    wanted = corridor_tiles(tracks, float(settings["buffer_km"]), min_zoom, max_zoom)
+    if not wanted:
+        return None
+
+    key_source = json.dumps({
+        "version": VERSION,
+        "source": settings["source"],
+        "bufferKm": settings["buffer_km"],
+        "attribution": settings.get("attribution", ""),
+        "tiles": wanted,
+    }, separators=(",", ":"))
+    key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:16]
+
+    cache_dir = Path(settings["cache_dir"])
+    cached = cache_dir / f"{key}.pack"
+    if cached.is_file():
+        count, cached_meta = read_metadata(cached)
+        if cached_meta.get("missing") == 0:
+            log.info("Tile pack unchanged, reusing %s", cached)
+            output.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(cached, output)
+            return {"tiles": count, "bytes": output.stat().st_size, "missing": 0, "cached": True}
+        cached.unlink()
+
+    fetch = make_fetcher(settings["source"], settings["user_agent"])
+    with ThreadPoolExecutor(max_workers=int(settings["workers"])) as pool:
+        contents = list(pool.map(lambda tile: fetch(*tile), wanted))
+
+    tiles = [(tile, content) for tile, content in zip(wanted, contents) if content]
+    missing = len(wanted) - len(tiles)
+
+    all_points = [p for track in tracks for p in track]
+    metadata = {
+        "format": tile_format(settings["source"]),
+        "minZoom": min_zoom,
+        "maxZoom": max_zoom,
+        "bufferKm": settings["buffer_km"],
+        "bounds": [
+            min(p["lon"] for p in all_points), min(p["lat"] for p in all_points),
+            max(p["lon"] for p in all_points), max(p["lat"] for p in all_points),
+        ],
+        "attribution": settings.get("attribution", ""),
+        "key": key,
+        "missing": missing,
+    }
+
+    if missing:
+        stats = write_pack(output, tiles, metadata)
+        log.warning(
+            "Tile pack is partial: %d of %d tiles missing; not caching it so the "
+            "next build retries them", missing, len(wanted),
+        )
+    else:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        stats = write_pack(cached, tiles, metadata)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, output)
+
+    log.info(
+        "Tile pack: %d tiles (%d unique, %d missing) in %.1f MB",
+        stats["tiles"], stats["unique"], missing, stats["bytes"] / 1024 / 1024,
+    )
+    return {**stats, "missing": missing}
+
+
+# ============================================
+# MKDOCS HOOK
+# ============================================
+
+def get_settings(config) -> dict:
+    return {**DEFAULTS, **(config.get("extra", {}).get("tile_pack") or {})}
+
+
+def on_post_build(config, **kwargs) -> None:
+    settings = get_settings(config)
+    if not settings["source"]:
+        log.debug("Tile pack disabled (extra.tile_pack.source is empty)")
+        return
+
+    # Keep the pack cache next to mkdocs.yml regardless of the working directory
+    settings["cache_dir"] = Path(config["config_file_path"]).parent / settings["cache_dir"]
+    build_pack(Path(config["docs_dir"]), Path(config["site_dir"]) / settings["output"], settings)
+
+
+# ============================================
+# CLI
+# ============================================
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the offline corridor tile pack.")
+    parser.add_argument("--source", required=True, help="URL template or local tile directory")
+    parser.add_argument("--output", required=True, type=Path, help="Pack file to write")
+    parser.add_argument("--docs-dir", default="docs", type=Path)
+    parser.add_argument("--min-zoom", type=int, default=DEFAULTS["min_zoom"])
+    parser.add_argument("--max-zoom", type=int, default=DEFAULTS["max_zoom"])
+    parser.add_argument("--buffer-km", type=float, default=DEFAULTS["buffer_km"])
+    parser.add_argument("--route", action="append", default=[], help="GPX stem to include (repeatable)")
+    parser.add_argument("--cache-dir", default=DEFAULTS["cache_dir"])
+    parser.add_argument("--workers", type=int, default=DEFAULTS["workers"])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    settings = {
+        **DEFAULTS,
+        "source": args.source,
+        "min_zoom": args.min_zoom,
+        "max_zoom": args.max_zoom,
+        "buffer_km": args.buffer_km,
+        "routes": args.route,
+        "cache_dir": args.cache_dir,
+        "workers": args.workers,
+    }
+    stats = build_pack(args.docs_dir, args.output, settings)
+    if stats is None:
+        log.error("No GPX routes found under %s", args.docs_dir)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())